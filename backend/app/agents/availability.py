@@ -0,0 +1,255 @@
+from itertools import repeat
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .participant_agent import TimeSlot
+from .timegrid import MINUTES_PER_DAY, SLOT_MINUTES, range_mask, slot_cells, to_hours, to_minutes
+
+WORKDAY_START = 9          # Working hours: meetings start at or after this hour
+WORKDAY_END = 17           # and end by this hour
+SEARCH_STEP = 0.5          # Hours between candidate start times
+PROBE_RATIO = 3            # Probe every start of a date once a third as many invitees are free on it
+
+
+def mask_runs(mask: int) -> Iterator[Tuple[int, int]]:
+    """Yield ``(first, end)`` for each run of set bits in a mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        # Adding the lowest bit carries through the run to the first clear bit above it
+        above = (mask + low) & ~mask
+        yield low.bit_length() - 1, above.bit_length() - 1
+        mask &= ~(above - low)
+
+
+class AvailabilityBitmap:
+    """
+    Availability of many participants stored as fixed-resolution bitsets.
+
+    For every date the day is split into cells of ``resolution`` minutes, and
+    each cell holds an ``int`` whose bit ``i`` is set when participant ``i`` is
+    free for the whole cell. Checking a candidate start for any group of
+    participants is an AND over the cells it covers followed by a popcount.
+
+    Each participant's free cells per date are also kept as one mask, whose
+    runs are the free intervals that candidate searches sweep over.
+    """
+
+    def __init__(self, resolution: int = SLOT_MINUTES):
+        if MINUTES_PER_DAY % resolution:
+            raise ValueError("Resolution must divide a day evenly")
+        self.resolution = resolution
+        self.cells_per_day = MINUTES_PER_DAY // resolution
+        self.participants: List[str] = []
+        self._bits: Dict[str, int] = {}
+        self._cells: Dict[str, List[int]] = {}
+        self._free: Dict[str, Dict[int, int]] = {}    # date -> bit -> free cells
+        self._runs: Dict[Tuple[str, int], List[Tuple[int, int]]] = {}
+
+    def add_participant(self, name: str, slots: Iterable[TimeSlot] = ()) -> int:
+        """Register a participant and their free slots, returning their bit index."""
+        bit = self._bits.get(name)
+        if bit is None:
+            bit = len(self.participants)
+            self._bits[name] = bit
+            self.participants.append(name)
+        for slot in slots:
+            self.add_slot(name, slot)
+        return bit
+
+    def add_slot(self, name: str, slot: TimeSlot):
+        """Mark a participant as free for the cells covered by a slot."""
+        index = self.add_participant(name)
+        bit = 1 << index
+        cells = self._day(slot.date)
+        covered = slot_cells(slot, self.resolution)
+        for cell in covered:
+            cells[cell] |= bit
+        free = self._free.setdefault(slot.date, {})
+        free[index] = free.get(index, 0) | range_mask(covered)
+        self._runs.pop((slot.date, index), None)
+
+    def set_free_cells(self, name: str, date: str, mask: int):
+        """Mark a participant as free for every cell whose bit is set in ``mask``."""
+        index = self.add_participant(name)
+        bit = 1 << index
+        free = self._free.setdefault(date, {})
+        free[index] = free.get(index, 0) | mask
+        self._runs.pop((date, index), None)
+        cells = self._day(date)
+        while mask:
+            low = mask & -mask
+            cells[low.bit_length() - 1] |= bit
+            mask ^= low
+
+    def free_runs(self, date: str, index: int) -> List[Tuple[int, int]]:
+        """Return a participant's free intervals on a date in minutes, computed once per change."""
+        runs = self._runs.get((date, index))
+        if runs is None:
+            mask = self._free.get(date, {}).get(index, 0)
+            runs = self._runs[(date, index)] = [
+                (first * self.resolution, end * self.resolution) for first, end in mask_runs(mask)
+            ]
+        return runs
+
+    def _day(self, date: str) -> List[int]:
+        cells = self._cells.get(date)
+        if cells is None:
+            cells = self._cells[date] = [0] * self.cells_per_day
+        return cells
+
+    def mask_for(self, names: Optional[Iterable[str]] = None) -> int:
+        """Return the bitset for the given participants (all participants if None)."""
+        if names is None:
+            return (1 << len(self.participants)) - 1
+        mask = 0
+        for name in names:
+            bit = self._bits.get(name)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def names_for(self, mask: int) -> List[str]:
+        """Return the participant names whose bits are set in a mask."""
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.participants[low.bit_length() - 1])
+            mask ^= low
+        return names
+
+    def free_mask(self, date: str, start_minute: int, duration_minutes: int, mask: int = -1) -> int:
+        """Return the subset of ``mask`` free for the whole interval."""
+        cells = self._cells.get(date)
+        if cells is None:
+            return 0
+        first = start_minute // self.resolution
+        last = -(-(start_minute + duration_minutes) // self.resolution)
+        if first < 0 or last > self.cells_per_day:
+            return 0
+        for cell in cells[first:last]:
+            mask &= cell
+            if not mask:
+                break
+        return mask
+
+    def window_candidates(self, dates: Union[str, Iterable[str]], duration: float, invited: int,
+                          minimum_participants: int = 1,
+                          window_start: float = WORKDAY_START,
+                          window_end: float = WORKDAY_END,
+                          step: float = SEARCH_STEP) -> List[Tuple[str, int, int]]:
+        """
+        Return ``(date, start_minute, free_mask)`` for every start enough invitees can attend.
+
+        Meetings must lie within the working hours of one date. Each
+        invitee's free run on a date becomes the range of starts it allows,
+        and a sweep over those ranges visits only the points where the set of
+        free invitees changes, so a date costs a sort of its intervals
+        rather than a probe per start time. Once many invitees are free on a
+        date the sort costs more than the probes, so that date is probed
+        instead; both give the same candidates. Starts lie on the ``step``
+        grid from ``window_start`` and are ordered by date, then time.
+        """
+        if isinstance(dates, str):
+            dates = [dates]
+        duration_minutes = to_minutes(duration)
+        step_minutes = to_minutes(step)
+        first_start = to_minutes(window_start)
+        last_end = to_minutes(window_end)
+        if any(minutes % self.resolution for minutes in (first_start, last_end, step_minutes)):
+            raise ValueError(f"Window and step must fall on the {self.resolution} minute grid")
+
+        invitees = [index for first, end in mask_runs(invited) for index in range(first, end)]
+        starts = (last_end - duration_minutes - first_start) // step_minutes + 1
+
+        candidates = []
+        for date in dates:
+            free = self._free.get(date)
+            if not free:
+                continue
+            present = [index for index in invitees if index in free]
+            if len(present) < minimum_participants:
+                continue
+            if len(present) * PROBE_RATIO >= starts:
+                self._probe_date(candidates, date, duration_minutes, invited, minimum_participants,
+                                 first_start, last_end, step_minutes)
+            else:
+                self._sweep_date(candidates, date, duration_minutes, present, minimum_participants,
+                                 first_start, last_end, step_minutes)
+        return candidates
+
+    def _sweep_date(self, candidates: List[Tuple[str, int, int]], date: str, duration_minutes: int,
+                    present: List[int], minimum_participants: int,
+                    first_start: int, last_end: int, step_minutes: int):
+        # Grid starts in [start, end) let the participant attend the whole meeting
+        events = []
+        for index in present:
+            bit = 1 << index
+            for start, end in self.free_runs(date, index):
+                start = first_start if start < first_start else start
+                end = (last_end if end > last_end else end) - duration_minutes + 1
+                start = first_start - (first_start - start) // step_minutes * step_minutes
+                end = first_start - (first_start - end) // step_minutes * step_minutes
+                if end > start:
+                    events.append((start, bit))
+                    events.append((end, bit))
+        events.sort()
+
+        # Each participant's runs are disjoint, so their bit toggles on and off
+        active = 0
+        last = len(events) - 1
+        for i, (position, bit) in enumerate(events):
+            active ^= bit
+            if i == last:
+                break
+            following = events[i + 1][0]
+            if following != position and active.bit_count() >= minimum_participants:
+                candidates.extend(zip(repeat(date), range(position, following, step_minutes), repeat(active)))
+
+    def _probe_date(self, candidates: List[Tuple[str, int, int]], date: str, duration_minutes: int,
+                    invited: int, minimum_participants: int,
+                    first_start: int, last_end: int, step_minutes: int):
+        for start in range(first_start, last_end - duration_minutes + 1, step_minutes):
+            free = self.free_mask(date, start, duration_minutes, invited)
+            if free and free.bit_count() >= minimum_participants:
+                candidates.append((date, start, free))
+
+    def candidate_masks(self, date: str, duration: float, invited: int,
+                        minimum_participants: int = 1,
+                        window_start: float = WORKDAY_START,
+                        window_end: float = WORKDAY_END,
+                        step: float = SEARCH_STEP) -> List[Tuple[int, int]]:
+        """Return ``(start_minute, free_mask)`` for every start enough invitees can attend on a date."""
+        return [
+            (start, free)
+            for _, start, free in self.window_candidates(
+                date, duration, invited, minimum_participants, window_start, window_end, step
+            )
+        ]
+
+    def feasible_starts(self, dates: Union[str, Iterable[str]], duration: float,
+                        participants: Optional[Iterable[str]] = None,
+                        minimum_participants: int = 1,
+                        window_start: float = WORKDAY_START,
+                        window_end: float = WORKDAY_END,
+                        step: float = SEARCH_STEP) -> List[Tuple[TimeSlot, List[str]]]:
+        """
+        Return every candidate slot in the window that enough participants can attend.
+
+        Candidates are ordered by date and start time and paired with the
+        names of the participants that are free for them.
+        """
+        duration_minutes = to_minutes(duration)
+        candidates = self.window_candidates(
+            dates, duration, self.mask_for(participants), minimum_participants,
+            window_start, window_end, step
+        )
+        return [
+            (
+                TimeSlot(
+                    date=date,
+                    start_time=to_hours(start),
+                    end_time=to_hours(start + duration_minutes)
+                ),
+                self.names_for(free)
+            )
+            for date, start, free in candidates
+        ]
@@ -0,0 +1,292 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+import time
+
+from .availability import AvailabilityBitmap
+from .participant_agent import TimeSlot
+from .timegrid import to_hours, to_minutes
+
+SOLVER_GREEDY = "greedy"
+SOLVER_EXACT = "exact"
+EXACT_MAX_MEETINGS = 12    # Larger instances fall back to greedy with repair
+EXACT_MAX_NODES = 20000    # Search nodes the exact solver may visit before falling back too
+
+logger = logging.getLogger("ceylon")
+
+
+class _SearchBudgetExceeded(Exception):
+    pass
+
+
+@dataclass
+class Assignment:
+    meeting_id: str
+    time_slot: TimeSlot
+    participants: List[str]
+
+
+@dataclass
+class SolveResult:
+    assignments: Dict[str, Assignment] = field(default_factory=dict)
+    unscheduled: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+    mode: str = SOLVER_GREEDY
+
+    @property
+    def meetings_per_second(self) -> float:
+        if self.elapsed <= 0:
+            return float(len(self.assignments))
+        return len(self.assignments) / self.elapsed
+
+
+@dataclass
+class _Candidate:
+    date: str
+    start: int      # minutes since midnight
+    end: int
+    free: int       # bitset of invitees free for the whole slot
+
+
+class BatchSolver:
+    """
+    Assign slots to many meetings at once without double-booking anyone.
+
+    Meetings that share invitees on a date both may use form a conflict graph.
+    Slots are assigned in one pass, most constrained meeting first, against a
+    per-cell bitset of participants that are already booked. Meetings left
+    over are repaired by moving a single blocking meeting to another of its
+    candidates. Small instances can be solved exactly by backtracking.
+    """
+
+    def __init__(self, availability: AvailabilityBitmap, exact_max_meetings: int = EXACT_MAX_MEETINGS,
+                 exact_max_nodes: int = EXACT_MAX_NODES):
+        self.availability = availability
+        self.exact_max_meetings = exact_max_meetings
+        self.exact_max_nodes = exact_max_nodes
+        self.meetings: Dict[str, object] = {}
+        self.candidates: Dict[str, List[_Candidate]] = {}
+        self.conflicts: Dict[str, Set[str]] = {}
+        self._busy: Dict[str, List[int]] = {}
+        self._assigned: Dict[str, Tuple[_Candidate, int]] = {}
+
+    def solve(self, meetings: Dict[str, object], invitees: Dict[str, Set[str]],
+              mode: str = SOLVER_GREEDY) -> SolveResult:
+        """
+        Schedule playground meetings keyed by meeting id.
+
+        ``invitees`` maps each meeting id to the names of its invited
+        participants; only they are considered as attendees.
+        """
+        started = time.perf_counter()
+        self._prepare(meetings, invitees)
+
+        if mode == SOLVER_EXACT and len(meetings) > self.exact_max_meetings:
+            logger.warning(f"{len(meetings)} meetings exceed the exact solver limit, using greedy")
+            mode = SOLVER_GREEDY
+
+        if mode == SOLVER_EXACT and not self._solve_exact():
+            logger.warning(f"Exact solver gave up after {self.exact_max_nodes} nodes, using greedy")
+            mode = SOLVER_GREEDY
+            exact = dict(self._assigned)
+            self._clear()
+            self._solve_greedy()
+            self._repair()
+            if len(exact) > len(self._assigned):
+                self._restore(exact)
+        elif mode != SOLVER_EXACT:
+            self._solve_greedy()
+            self._repair()
+
+        result = SolveResult(mode=mode)
+        for meeting_id in self.meetings:
+            if meeting_id in self._assigned:
+                result.assignments[meeting_id] = self._assignment(meeting_id)
+            else:
+                result.unscheduled.append(meeting_id)
+        result.elapsed = time.perf_counter() - started
+
+        logger.info(
+            f"Batch solver ({mode}) scheduled {len(result.assignments)}/{len(self.meetings)} meetings "
+            f"in {result.elapsed * 1000:.1f} ms ({result.meetings_per_second:.0f} meetings/s)"
+        )
+        return result
+
+    def _prepare(self, meetings: Dict[str, object], invitees: Dict[str, Set[str]]):
+        self.meetings = meetings
+        self.candidates = {}
+        self._clear()
+
+        for meeting_id, meeting in meetings.items():
+            duration = to_minutes(meeting.duration)
+            self.candidates[meeting_id] = [
+                _Candidate(date=date, start=start, end=start + duration, free=free)
+                for date, start, free in self.availability.window_candidates(
+                    meeting.dates(),
+                    meeting.duration,
+                    self.availability.mask_for(invitees.get(meeting_id, ())),
+                    meeting.minimum_participants,
+                    meeting.window_start,
+                    meeting.window_end
+                )
+            ]
+
+        # Conflict graph: meetings sharing at least one invitee on a date they both have candidates on
+        by_participant: Dict[Tuple[str, str], Set[str]] = {}
+        for meeting_id, meeting in meetings.items():
+            dates = {candidate.date for candidate in self.candidates[meeting_id]}
+            for name in invitees.get(meeting_id, ()):
+                for date in dates:
+                    by_participant.setdefault((date, name), set()).add(meeting_id)
+        self.conflicts = {meeting_id: set() for meeting_id in meetings}
+        for group in by_participant.values():
+            for meeting_id in group:
+                self.conflicts[meeting_id] |= group - {meeting_id}
+
+    def _cells(self, candidate: _Candidate) -> range:
+        resolution = self.availability.resolution
+        return range(candidate.start // resolution, -(-candidate.end // resolution))
+
+    def _available(self, candidate: _Candidate) -> int:
+        """Return the invitees free for a candidate and not booked elsewhere."""
+        busy = self._busy.get(candidate.date)
+        if busy is None:
+            return candidate.free
+        booked = 0
+        for cell in self._cells(candidate):
+            booked |= busy[cell]
+        return candidate.free & ~booked
+
+    def _fits(self, meeting_id: str, candidate: _Candidate) -> int:
+        attendees = self._available(candidate)
+        if attendees.bit_count() >= self.meetings[meeting_id].minimum_participants:
+            return attendees
+        return 0
+
+    def _assign(self, meeting_id: str, candidate: _Candidate, attendees: int):
+        busy = self._busy.get(candidate.date)
+        if busy is None:
+            busy = self._busy[candidate.date] = [0] * self.availability.cells_per_day
+        for cell in self._cells(candidate):
+            busy[cell] |= attendees
+        self._assigned[meeting_id] = (candidate, attendees)
+
+    def _unassign(self, meeting_id: str):
+        candidate, attendees = self._assigned.pop(meeting_id)
+        busy = self._busy[candidate.date]
+        for cell in self._cells(candidate):
+            busy[cell] &= ~attendees
+
+    def _clear(self):
+        self._busy = {}
+        self._assigned = {}
+
+    def _restore(self, assigned: Dict[str, Tuple[_Candidate, int]]):
+        self._clear()
+        for meeting_id, (candidate, attendees) in assigned.items():
+            self._assign(meeting_id, candidate, attendees)
+
+    def _place(self, meeting_id: str, skip: Optional[_Candidate] = None) -> bool:
+        """Assign the earliest candidate that still has enough attendees."""
+        for candidate in self.candidates[meeting_id]:
+            if candidate is skip:
+                continue
+            attendees = self._fits(meeting_id, candidate)
+            if attendees:
+                self._assign(meeting_id, candidate, attendees)
+                return True
+        return False
+
+    def _order(self) -> List[str]:
+        # Most constrained first: fewest candidates, then most conflicts
+        return sorted(
+            self.meetings,
+            key=lambda meeting_id: (len(self.candidates[meeting_id]), -len(self.conflicts[meeting_id]))
+        )
+
+    def _solve_greedy(self):
+        for meeting_id in self._order():
+            self._place(meeting_id)
+
+    def _repair(self):
+        """Try to fit each unscheduled meeting by moving one blocking meeting."""
+        for meeting_id in self._order():
+            if meeting_id in self._assigned:
+                continue
+            for candidate in self.candidates[meeting_id]:
+                if self._move_blocker(meeting_id, candidate):
+                    break
+
+    def _move_blocker(self, meeting_id: str, candidate: _Candidate) -> bool:
+        for blocker in sorted(self.conflicts[meeting_id]):
+            if blocker not in self._assigned:
+                continue
+            blocker_candidate, blocker_attendees = self._assigned[blocker]
+            if blocker_candidate.date != candidate.date:
+                continue
+            if blocker_candidate.end <= candidate.start or candidate.end <= blocker_candidate.start:
+                continue
+            if not blocker_attendees & candidate.free:
+                continue
+
+            self._unassign(blocker)
+            attendees = self._fits(meeting_id, candidate)
+            if attendees:
+                self._assign(meeting_id, candidate, attendees)
+                if self._place(blocker, skip=blocker_candidate):
+                    return True
+                self._unassign(meeting_id)
+            self._assign(blocker, blocker_candidate, blocker_attendees)
+        return False
+
+    def _solve_exact(self) -> bool:
+        """
+        Backtracking search for the largest set of meetings that fit together.
+
+        Returns False when the search runs out of its node budget, leaving
+        the best assignment found until then in place.
+        """
+        order = self._order()
+        best: Dict[str, Tuple[_Candidate, int]] = {}
+        nodes = 0
+
+        def search(index: int):
+            nonlocal best, nodes
+            nodes += 1
+            if nodes > self.exact_max_nodes:
+                raise _SearchBudgetExceeded()
+            if len(self._assigned) + len(order) - index <= len(best):
+                return
+            if index == len(order):
+                best = dict(self._assigned)
+                return
+            meeting_id = order[index]
+            for candidate in self.candidates[meeting_id]:
+                attendees = self._fits(meeting_id, candidate)
+                if attendees:
+                    self._assign(meeting_id, candidate, attendees)
+                    search(index + 1)
+                    self._unassign(meeting_id)
+                    if len(best) == len(order):
+                        return
+            search(index + 1)
+
+        try:
+            search(0)
+            complete = True
+        except _SearchBudgetExceeded:
+            complete = False
+        self._restore(best)
+        return complete
+
+    def _assignment(self, meeting_id: str) -> Assignment:
+        candidate, attendees = self._assigned[meeting_id]
+        return Assignment(
+            meeting_id=meeting_id,
+            time_slot=TimeSlot(
+                date=candidate.date,
+                start_time=to_hours(candidate.start),
+                end_time=to_hours(candidate.end)
+            ),
+            participants=self.availability.names_for(attendees)
+        )
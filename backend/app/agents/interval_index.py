@@ -0,0 +1,142 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from .timegrid import MINUTES_PER_DAY, SLOT_MINUTES, range_mask, to_minutes
+
+
+class IntervalIndex:
+    """
+    Free time of one participant as sorted, merged intervals per date.
+
+    Intervals are kept in minutes since midnight in two parallel lists
+    (starts and ends) so overlap queries are a bisect plus a short walk
+    instead of a scan over every slot.
+    """
+
+    def __init__(self, slots: Iterable = ()):
+        self._starts: Dict[str, List[int]] = {}
+        self._ends: Dict[str, List[int]] = {}
+        self.build(slots)
+
+    @classmethod
+    def from_intervals(cls, intervals: Iterable[Tuple[str, int, int]]) -> "IntervalIndex":
+        """Create an index from ``(date, start, end)`` tuples given in minutes."""
+        index = cls()
+        index.build_intervals(intervals)
+        return index
+
+    def build(self, slots: Iterable):
+        """Replace the index contents with the given slots."""
+        self.build_intervals(
+            (slot.date, to_minutes(slot.start_time), to_minutes(slot.end_time))
+            for slot in slots
+        )
+
+    def build_intervals(self, intervals: Iterable[Tuple[str, int, int]]):
+        """Replace the index contents with ``(date, start, end)`` tuples in minutes."""
+        by_date: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for date, start, end in intervals:
+            if end > start:
+                by_date[date].append((start, end))
+
+        self._starts, self._ends = {}, {}
+        for date, intervals in by_date.items():
+            intervals.sort()
+            starts, ends = [], []
+            for start, end in intervals:
+                if ends and start <= ends[-1]:
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            self._starts[date] = starts
+            self._ends[date] = ends
+
+    def add(self, date: str, start: int, end: int):
+        """Insert a free interval, merging it with any interval it touches."""
+        if end <= start:
+            return
+        starts = self._starts.setdefault(date, [])
+        ends = self._ends.setdefault(date, [])
+
+        # Intervals [lo, hi) overlap or touch the new one
+        lo = bisect_left(ends, start)
+        hi = bisect_right(starts, end)
+        if lo < hi:
+            start = min(start, starts[lo])
+            end = max(end, ends[hi - 1])
+        starts[lo:hi] = [start]
+        ends[lo:hi] = [end]
+
+    def remove(self, date: str, start: int, end: int):
+        """Remove [start, end) from the free time, splitting intervals as needed."""
+        starts = self._starts.get(date)
+        if not starts or end <= start:
+            return
+        ends = self._ends[date]
+
+        # Intervals [lo, hi) overlap the removed range
+        lo = bisect_right(ends, start)
+        hi = bisect_left(starts, end)
+        if lo >= hi:
+            return
+        kept_starts, kept_ends = [], []
+        if starts[lo] < start:
+            kept_starts.append(starts[lo])
+            kept_ends.append(start)
+        if ends[hi - 1] > end:
+            kept_starts.append(end)
+            kept_ends.append(ends[hi - 1])
+        starts[lo:hi] = kept_starts
+        ends[lo:hi] = kept_ends
+
+    def copy(self) -> "IntervalIndex":
+        index = IntervalIndex()
+        index._starts = {date: list(starts) for date, starts in self._starts.items()}
+        index._ends = {date: list(ends) for date, ends in self._ends.items()}
+        return index
+
+    def dates(self) -> List[str]:
+        """Return the dates that have free intervals."""
+        return [date for date, starts in self._starts.items() if starts]
+
+    def add_slot(self, slot):
+        """Insert a free time slot given in hours."""
+        self.add(slot.date, to_minutes(slot.start_time), to_minutes(slot.end_time))
+
+    def intervals(self, date: str) -> List[Tuple[int, int]]:
+        """Return the merged free intervals of a date in minutes."""
+        return list(zip(self._starts.get(date, ()), self._ends.get(date, ())))
+
+    def has_overlap(self, date: str, start: int, end: int, duration: int) -> bool:
+        """Check whether some free interval shares at least ``duration`` minutes with [start, end)."""
+        starts = self._starts.get(date)
+        if not starts:
+            return False
+        ends = self._ends[date]
+
+        i = max(bisect_right(starts, start) - 1, 0)
+        while i < len(starts) and starts[i] < end:
+            if min(ends[i], end) - max(starts[i], start) >= duration:
+                return True
+            i += 1
+        return False
+
+    def contains(self, date: str, start: int, end: int) -> bool:
+        """Check whether [start, end) lies inside a single free interval."""
+        starts = self._starts.get(date)
+        if not starts:
+            return False
+        i = bisect_right(starts, start) - 1
+        return i >= 0 and self._ends[date][i] >= end
+
+    def free_cells(self, date: str, resolution: int = SLOT_MINUTES) -> int:
+        """Return the cells fully covered by free intervals as a bitmask."""
+        mask = 0
+        for start, end in self.intervals(date):
+            first = -(-start // resolution)
+            last = min(end // resolution, MINUTES_PER_DAY // resolution)
+            if last > first:
+                mask |= range_mask(range(first, last))
+        return mask
@@ -0,0 +1,110 @@
+"""
+In-process message delivery between a playground and its agents.
+
+Ceylon always routes agent messages through its networking stack on a TCP
+port, pickling each one, even when every agent lives in the same process.
+The local transport hands messages to the recipient's ``@on`` handlers
+through asyncio queues instead. Each agent gets an inbox served by its own
+task, so handlers run one message at a time per agent, after the sender's
+call has returned, as they do over Ceylon.
+
+Messages are delivered as the same objects that were sent, not copies, so
+handlers must not modify a message they receive.
+"""
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import inspect
+import logging
+import time
+
+from ceylon import AgentDetail, BaseAgent
+from ceylon.base.support import message_handlers
+
+TRANSPORT_CEYLON = "ceylon"  # Ceylon networking on the playground's port
+TRANSPORT_LOCAL = "local"    # Asyncio queues inside this process, no port
+TRANSPORTS = (TRANSPORT_CEYLON, TRANSPORT_LOCAL)
+
+logger = logging.getLogger("ceylon")
+
+
+@lru_cache(maxsize=None)
+def find_handler(agent_class: type, message_type: type) -> Optional[Tuple[Callable, bool, bool]]:
+    """
+    Return the ``@on`` handler an agent class has for a message type.
+
+    Resolved the way Ceylon does it, walking the class's MRO, together with
+    whether the handler takes the ``agent`` and ``time`` arguments.
+    """
+    for cls in inspect.getmro(agent_class):
+        handler = message_handlers.get(f"{cls.__name__}.{message_type}")
+        if handler is not None:
+            parameters = inspect.signature(handler).parameters
+            return handler, "agent" in parameters, "time" in parameters
+    return None
+
+
+class LocalTransport:
+    """Delivers messages between agents attached to it without opening a port."""
+
+    def __init__(self):
+        self._inboxes: Dict[str, asyncio.Queue] = {}
+        self._details: Dict[str, AgentDetail] = {}  # By agent name
+        self._agents: List[BaseAgent] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def attach(self, agent: BaseAgent) -> AgentDetail:
+        """Start delivering messages addressed to an agent and return its details."""
+        detail = agent.details()
+        inbox = asyncio.Queue()
+        self._inboxes[detail.id] = inbox
+        self._details[agent.name] = detail
+        self._agents.append(agent)
+        self._tasks.append(asyncio.create_task(self._serve(agent, inbox)))
+        agent.local_transport = self
+        return detail
+
+    async def send(self, sender: BaseAgent, peer_id: str, message):
+        """Queue a message for the attached agent with the given id."""
+        inbox = self._inboxes.get(peer_id)
+        if inbox is None:
+            logger.warning(f"No local agent with id {peer_id}")
+            return
+        inbox.put_nowait((self._details[sender.name], message))
+
+    async def _serve(self, agent: BaseAgent, inbox: asyncio.Queue):
+        while True:
+            sender, message = await inbox.get()
+            try:
+                found = find_handler(type(agent), type(message))
+                if found is not None:
+                    handler, wants_agent, wants_time = found
+                    kwargs = {}
+                    if wants_agent:
+                        kwargs["agent"] = sender
+                    if wants_time:
+                        kwargs["time"] = int(time.time())
+                    await handler(agent, message, **kwargs)
+            except Exception as e:
+                # Ceylon logs handler errors and carries on with the next message
+                logger.error(f"Error processing message: {e}")
+            finally:
+                inbox.task_done()
+
+    async def close(self, timeout: float = 10.0):
+        """Deliver the messages still queued, then detach every agent."""
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(inbox.join() for inbox in self._inboxes.values())), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Local transport closed with messages still queued")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for agent in self._agents:
+            agent.local_transport = None
+        self._agents = []
+        self._tasks = []
+        self._inboxes = {}
+        self._details = {}
@@ -1,10 +1,40 @@
 from ceylon import BaseAgent, PeerMode, on
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import asyncio
+import struct
 
-@dataclass
-class TimeSlot:
+from . import wire
+from .. import metrics
+from .interval_index import IntervalIndex
+from .local_transport import LocalTransport
+from .timegrid import SLOT_MINUTES, cell_range, range_mask, to_hours, to_minutes
+from .wire import WireMessage, pack_date, unpack_date
+
+# Messages pickle through their packed encoding (see wire.py). Meeting ids
+# are numeric strings, participants are referred to by integer id, dates
+# travel as days since 1970 and times as minutes since midnight.
+_SLOT = struct.Struct("<HHH")
+_REQUEST = struct.Struct("<IIHHH")
+_RESPONSE = struct.Struct("<IIi?HHH")
+_WINDOW = struct.Struct("<IHHH")
+_COUNT = struct.Struct("<HI")
+_MASKS = struct.Struct("<iH")
+_MASK = struct.Struct("<HB")
+_SCHEDULED = struct.Struct("<IHHHH")
+
+
+def _pack_slot(slot: "TimeSlot") -> Tuple[int, int, int]:
+    return pack_date(slot.date), to_minutes(slot.start_time), to_minutes(slot.end_time)
+
+
+def _unpack_slot(date: int, start: int, end: int) -> "TimeSlot":
+    return TimeSlot(unpack_date(date), to_hours(start), to_hours(end))
+
+
+@wire.register(1)
+@dataclass(slots=True)
+class TimeSlot(WireMessage):
     date: str
     start_time: int
     end_time: int
@@ -13,33 +43,179 @@ class TimeSlot:
     def duration(self):
         return self.end_time - self.start_time
 
-@dataclass
-class AvailabilityRequest:
+    def pack(self) -> bytes:
+        return _SLOT.pack(*_pack_slot(self))
+
+    @classmethod
+    def unpack(cls, data: memoryview) -> "TimeSlot":
+        return _unpack_slot(*_SLOT.unpack(data))
+
+@wire.register(2)
+@dataclass(slots=True)
+class AvailabilityRequest(WireMessage):
     meeting_id: str
     time_slot: TimeSlot
+    request_id: int = 0  # Echoed in the responses so they are matched to this proposal
+
+    def pack(self) -> bytes:
+        return _REQUEST.pack(int(self.meeting_id), self.request_id, *_pack_slot(self.time_slot))
 
-@dataclass
-class AvailabilityResponse:
+    @classmethod
+    def unpack(cls, data: memoryview) -> "AvailabilityRequest":
+        meeting_id, request_id, *slot = _REQUEST.unpack(data)
+        return cls(str(meeting_id), _unpack_slot(*slot), request_id)
+
+@wire.register(3)
+@dataclass(slots=True)
+class AvailabilityResponse(WireMessage):
     meeting_id: str
-    participant: str
+    participant_id: int
     time_slot: TimeSlot
     available: bool
+    request_id: int = 0
+
+    def pack(self) -> bytes:
+        return _RESPONSE.pack(int(self.meeting_id), self.request_id, self.participant_id, self.available,
+                              *_pack_slot(self.time_slot))
+
+    @classmethod
+    def unpack(cls, data: memoryview) -> "AvailabilityResponse":
+        meeting_id, request_id, participant_id, available, *slot = _RESPONSE.unpack(data)
+        return cls(str(meeting_id), participant_id, _unpack_slot(*slot), available, request_id)
 
-@dataclass
-class MeetingScheduled:
+@dataclass(slots=True)
+class CandidateWindow:
+    meeting_id: str
+    date: str
+    start_time: float
+    end_time: float
+
+@wire.register(4)
+@dataclass(slots=True)
+class BatchAvailabilityRequest(WireMessage):
+    windows: List[CandidateWindow]
+    resolution: int = SLOT_MINUTES
+
+    def pack(self) -> bytes:
+        return _COUNT.pack(self.resolution, len(self.windows)) + b"".join(
+            _WINDOW.pack(int(window.meeting_id), pack_date(window.date),
+                         to_minutes(window.start_time), to_minutes(window.end_time))
+            for window in self.windows
+        )
+
+    @classmethod
+    def unpack(cls, data: memoryview) -> "BatchAvailabilityRequest":
+        resolution, _ = _COUNT.unpack_from(data)
+        windows = [
+            CandidateWindow(str(meeting_id), unpack_date(date), to_hours(start), to_hours(end))
+            for meeting_id, date, start, end in _WINDOW.iter_unpack(data[_COUNT.size:])
+        ]
+        return cls(windows, resolution)
+
+@wire.register(5)
+@dataclass(slots=True)
+class BatchAvailabilityResponse(WireMessage):
+    participant_id: int
+    masks: Dict[str, int]  # date -> free cells within the requested windows
+
+    def pack(self) -> bytes:
+        parts = [_MASKS.pack(self.participant_id, len(self.masks))]
+        for date, mask in self.masks.items():
+            cells = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+            parts.append(_MASK.pack(pack_date(date), len(cells)))
+            parts.append(cells)
+        return b"".join(parts)
+
+    @classmethod
+    def unpack(cls, data: memoryview) -> "BatchAvailabilityResponse":
+        participant_id, count = _MASKS.unpack_from(data)
+        offset = _MASKS.size
+        masks = {}
+        for _ in range(count):
+            date, length = _MASK.unpack_from(data, offset)
+            offset += _MASK.size
+            masks[unpack_date(date)] = int.from_bytes(data[offset:offset + length], "little")
+            offset += length
+        return cls(participant_id, masks)
+
+@wire.register(6)
+@dataclass(slots=True)
+class MeetingScheduled(WireMessage):
     meeting_id: str
     time_slot: TimeSlot
-    participants: List[str]
+    participants: List[int]  # Ids of the attending participants
+
+    def pack(self) -> bytes:
+        count = len(self.participants)
+        return (_SCHEDULED.pack(int(self.meeting_id), *_pack_slot(self.time_slot), count)
+                + struct.pack(f"<{count}i", *self.participants))
+
+    @classmethod
+    def unpack(cls, data: memoryview) -> "MeetingScheduled":
+        meeting_id, date, start, end, count = _SCHEDULED.unpack_from(data)
+        participants = list(struct.unpack_from(f"<{count}i", data, _SCHEDULED.size))
+        return cls(str(meeting_id), _unpack_slot(date, start, end), participants)
 
 class ParticipantAgent(BaseAgent):
-    def __init__(self, name: str, available_slots: List[TimeSlot]):
+    def __init__(self, name: str, available_slots: List[TimeSlot] = (),
+                 free_time: Optional[IntervalIndex] = None, participant_id: Optional[int] = None):
         super().__init__(
             name=name,
             mode=PeerMode.CLIENT,
             role="participant"
         )
-        self.available_slots = available_slots
+        # Id the agent answers under; the playground assigns one if left unset
+        self.participant_id = participant_id
+        # Free time as loaded, and what is left of it after booked meetings
+        self.free_time = free_time if free_time is not None else IntervalIndex(available_slots)
+        self.availability = self.free_time.copy()
         self.scheduled_meetings: Dict[str, TimeSlot] = {}
+        # Set while the agent is attached to an in-process transport
+        self.local_transport: Optional[LocalTransport] = None
+
+    async def send_message(self, peer_id: str, message):
+        if self.local_transport is not None:
+            await self.local_transport.send(self, peer_id, message)
+        else:
+            await super().send_message(peer_id, message)
+
+    def _block_booked(self, date: Optional[str] = None):
+        for slot in self.scheduled_meetings.values():
+            if date is None or slot.date == date:
+                self.availability.remove(slot.date, to_minutes(slot.start_time), to_minutes(slot.end_time))
+
+    def set_available_slots(self, available_slots: List[TimeSlot]):
+        """Replace this participant's free slots, keeping booked meetings blocked."""
+        self.set_free_time(IntervalIndex(available_slots))
+
+    def set_free_time(self, free_time: IntervalIndex):
+        """Replace this participant's free time with an already built index."""
+        self.free_time = free_time
+        self.availability = self.free_time.copy()
+        self._block_booked()
+
+    def set_bookings(self, bookings: Dict[str, TimeSlot]):
+        """Replace the meetings this participant is booked for, by meeting id."""
+        self.scheduled_meetings = dict(bookings)
+        self.availability = self.free_time.copy()
+        self._block_booked()
+
+    def book(self, meeting_id: str, slot: TimeSlot):
+        """Block the time of a meeting this participant attends."""
+        self.scheduled_meetings[meeting_id] = slot
+        self.availability.remove(slot.date, to_minutes(slot.start_time), to_minutes(slot.end_time))
+
+    def add_available_slot(self, slot: TimeSlot):
+        """Record a new free slot without rebuilding the interval index."""
+        self.free_time.add_slot(slot)
+        self.availability.add_slot(slot)
+        self._block_booked(slot.date)
+
+    def release_meeting(self, meeting_id: str):
+        """Forget a booked meeting and make its time free again."""
+        if self.scheduled_meetings.pop(meeting_id, None) is not None:
+            self.availability = self.free_time.copy()
+            self._block_booked()
 
     @staticmethod
     def has_overlap(slot1: TimeSlot, slot2: TimeSlot, duration: int) -> bool:
@@ -49,17 +225,55 @@ class ParticipantAgent(BaseAgent):
 
     @on(AvailabilityRequest)
     async def handle_request(self, request: AvailabilityRequest, time: int, agent):
+        metrics.MESSAGES_RECEIVED.inc(role="participant", type="AvailabilityRequest")
         # Check availability and respond
-        is_available = any(
-            self.has_overlap(slot, request.time_slot, request.time_slot.duration)
-            for slot in self.available_slots
+        requested = request.time_slot
+        is_available = self.availability.has_overlap(
+            requested.date,
+            to_minutes(requested.start_time),
+            to_minutes(requested.end_time),
+            to_minutes(requested.duration)
         )
         
         response = AvailabilityResponse(
             meeting_id=request.meeting_id,
-            participant=self.name,
+            participant_id=self.participant_id,
             time_slot=request.time_slot,
-            available=is_available
+            available=is_available,
+            request_id=request.request_id
         )
         
-        await self.broadcast_message(response)
\ No newline at end of file
+        await self.send_message(agent.id, response)
+        metrics.MESSAGES_SENT.inc(role="participant", type="AvailabilityResponse")
+
+    def free_cells(self, date: str, resolution: int = SLOT_MINUTES) -> int:
+        """Return this participant's free cells on a date as a bitmask."""
+        return self.availability.free_cells(date, resolution)
+
+    @on(BatchAvailabilityRequest)
+    async def handle_batch_request(self, request: BatchAvailabilityRequest, time: int, agent):
+        metrics.MESSAGES_RECEIVED.inc(role="participant", type="BatchAvailabilityRequest")
+        # Answer every requested window with a single mask per date
+        free_by_date: Dict[str, int] = {}
+        masks: Dict[str, int] = {}
+        for window in request.windows:
+            if window.date not in free_by_date:
+                free_by_date[window.date] = self.free_cells(window.date, request.resolution)
+            window_mask = range_mask(cell_range(window.start_time, window.end_time, request.resolution))
+            masks[window.date] = masks.get(window.date, 0) | (free_by_date[window.date] & window_mask)
+
+        response = BatchAvailabilityResponse(
+            participant_id=self.participant_id,
+            masks=masks
+        )
+
+        await self.send_message(agent.id, response)
+        metrics.MESSAGES_SENT.inc(role="participant", type="BatchAvailabilityResponse")
+
+    @on(MeetingScheduled)
+    async def handle_scheduled(self, scheduled: MeetingScheduled, time: int, agent):
+        metrics.MESSAGES_RECEIVED.inc(role="participant", type="MeetingScheduled")
+        # Booked time is no longer free for other meetings
+        if self.participant_id not in scheduled.participants:
+            return
+        self.book(scheduled.meeting_id, scheduled.time_slot)
@@ -0,0 +1,155 @@
+"""
+Solve independent clusters of meetings in parallel worker processes.
+
+Meetings that share no invitee, directly or through other meetings, can
+never compete for the same person, so each connected component of the
+meeting-participant graph can be solved on its own. Components are packed
+into chunks of similar size, and each chunk is solved by the batch solver
+in a worker process from the slice of the availability snapshot that
+covers its invitees. Solving a chunk gives every component in it the same
+slots as solving the whole batch at once.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set
+import asyncio
+import heapq
+import logging
+import multiprocessing
+
+from .. import metrics
+from .batch_solver import BatchSolver, SOLVER_GREEDY, SolveResult
+from .scheduling_playground import Meeting, MeetingOutput
+from .snapshot import AvailabilitySnapshot
+
+logger = logging.getLogger("ceylon")
+
+
+def connected_components(invitees: Dict[str, Set[str]]) -> List[List[str]]:
+    """Group meeting ids that are linked through shared invitees, keeping their order."""
+    parent: Dict[str, str] = {}
+
+    def find(name: str) -> str:
+        root = parent.setdefault(name, name)
+        while root != parent[root]:
+            root = parent[root]
+        while name != root:
+            parent[name], name = root, parent[name]
+        return root
+
+    for names in invitees.values():
+        names = iter(names)
+        first = next(names, None)
+        for name in names:
+            parent[find(name)] = find(first)
+
+    components: Dict[str, List[str]] = {}
+    for meeting_id, names in invitees.items():
+        # Meetings nobody can attend form components of their own
+        key = find(next(iter(names))) if names else f"meeting:{meeting_id}"
+        components.setdefault(key, []).append(meeting_id)
+    return list(components.values())
+
+
+def pack_components(components: List[List[str]], chunks: int) -> List[List[str]]:
+    """Spread components over at most ``chunks`` lists, largest first onto the lightest."""
+    heap = [(0, i, []) for i in range(min(chunks, len(components)))]
+    for component in sorted(components, key=len, reverse=True):
+        size, i, chunk = heapq.heappop(heap)
+        chunk.extend(component)
+        heapq.heappush(heap, (size + len(component), i, chunk))
+    return [chunk for _, _, chunk in sorted(heap, key=lambda entry: entry[1]) if chunk]
+
+
+def solve_chunk(meetings: Dict[str, Meeting], invitees: Dict[str, Set[str]],
+                snapshot: AvailabilitySnapshot, mode: str = SOLVER_GREEDY) -> SolveResult:
+    """Solve one chunk of meetings; runs in a worker process."""
+    return BatchSolver(snapshot.availability()).solve(meetings, invitees, mode=mode)
+
+
+class PartitionedSolver:
+    """Runs the batch solver over independent meeting clusters in a process pool."""
+
+    def __init__(self, processes: int, chunks_per_process: int = 4):
+        self.processes = processes
+        self.chunks_per_process = chunks_per_process  # More chunks than workers evens out their load
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.processes > 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Forking would copy the event loop and Ceylon's threads into the workers
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def solve(self, meetings: List[Meeting], meeting_ids: List[str], snapshot: AvailabilitySnapshot,
+                    mode: str = SOLVER_GREEDY, timeout: Optional[float] = None) -> Dict[str, MeetingOutput]:
+        """
+        Schedule meetings against a snapshot, one pool task per chunk of components.
+
+        Chunks still running after ``timeout`` seconds are abandoned and
+        their meetings returned as timed out.
+        """
+        by_id = dict(zip(meeting_ids, meetings))
+        positions = {name: i for i, name in enumerate(snapshot.names)}
+        invitees = {
+            meeting_id: {
+                name
+                for name in (snapshot.names if meeting.participants is None else meeting.participants)
+                if name in positions
+            }
+            for meeting_id, meeting in by_id.items()
+        }
+        components = connected_components(invitees)
+        chunks = pack_components(components, self.processes * self.chunks_per_process)
+
+        loop = asyncio.get_running_loop()
+        tasks = {}
+        for chunk in chunks:
+            names = set().union(*(invitees[meeting_id] for meeting_id in chunk))
+            task = loop.run_in_executor(
+                self._pool(), solve_chunk,
+                {meeting_id: by_id[meeting_id] for meeting_id in chunk},
+                {meeting_id: invitees[meeting_id] for meeting_id in chunk},
+                snapshot.select(sorted(positions[name] for name in names)),
+                mode
+            )
+            tasks[task] = chunk
+        logger.info(f"Solving {len(by_id)} meetings in {len(components)} clusters as {len(chunks)} pool tasks")
+
+        results: Dict[str, MeetingOutput] = {}
+        done, pending = await asyncio.wait(tasks, timeout=timeout) if tasks else (set(), set())
+        for task in pending:
+            task.cancel()
+            for meeting_id in tasks[task]:
+                results[meeting_id] = MeetingOutput(
+                    meeting_id=meeting_id, name=by_id[meeting_id].name, scheduled=False,
+                    error="Scheduling timed out", timed_out=True
+                )
+        for task in done:
+            solved = task.result()
+            for meeting_id, assignment in solved.assignments.items():
+                results[meeting_id] = MeetingOutput(
+                    meeting_id=meeting_id, name=by_id[meeting_id].name, scheduled=True,
+                    time_slot=assignment.time_slot, participants=assignment.participants
+                )
+            for meeting_id in solved.unscheduled:
+                results[meeting_id] = MeetingOutput(
+                    meeting_id=meeting_id, name=by_id[meeting_id].name, scheduled=False,
+                    error="No conflict-free time slot found"
+                )
+
+        for result in results.values():
+            metrics.MEETINGS_COMPLETED.inc(
+                outcome="scheduled" if result.scheduled else "timed_out" if result.timed_out else "unscheduled"
+            )
+        return {meeting_id: results[meeting_id] for meeting_id in meeting_ids}
@@ -1,22 +1,52 @@
+from collections import deque
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import Deque, Iterable, List, Dict, Optional, Set, Tuple
 import asyncio
+import datetime
 import logging
+from time import perf_counter
 
 from ceylon import on
-from ceylon.base.playground import BasePlayGround
+from ceylon.base.playground import AgentConnectedStatus, BasePlayGround
 
+from .. import metrics
+from .availability import AvailabilityBitmap, WORKDAY_END, WORKDAY_START
+from .batch_solver import BatchSolver, SOLVER_EXACT, SOLVER_GREEDY, SolveResult
+from .interval_index import IntervalIndex
+from .local_transport import LocalTransport, TRANSPORT_CEYLON, TRANSPORTS
 from .participant_agent import (
     TimeSlot, AvailabilityRequest, AvailabilityResponse, MeetingScheduled, 
-    ParticipantAgent
+    ParticipantAgent, CandidateWindow, BatchAvailabilityRequest, BatchAvailabilityResponse
 )
 
+class PlaygroundStopped(RuntimeError):
+    """A batch was submitted to a resident playground that is not running."""
+
 @dataclass
 class Meeting:
     name: str
     date: str
     duration: int
     minimum_participants: int
+    participants: Optional[List[str]] = None  # Invited agent names, None invites everyone
+    date_to: Optional[str] = None             # Last date of a multi-day search window
+    window_start: float = WORKDAY_START       # Working hours the meeting must fit in
+    window_end: float = WORKDAY_END
+    business_days: bool = False               # Skip Saturdays and Sundays
+
+    def dates(self) -> List[str]:
+        """Return the dates the meeting may be scheduled on, in order."""
+        if self.date_to is None and not self.business_days:
+            return [self.date]
+        first = datetime.date.fromisoformat(self.date)
+        last = datetime.date.fromisoformat(self.date_to) if self.date_to else first
+        dates = []
+        while first <= last:
+            if not self.business_days or first.weekday() < 5:
+                dates.append(first.isoformat())
+            first += datetime.timedelta(days=1)
+        return dates
 
 @dataclass
 class MeetingOutput:
@@ -26,76 +56,538 @@ class MeetingOutput:
     time_slot: Optional[TimeSlot] = None
     participants: List[str] = field(default_factory=list)
     error: Optional[str] = None
+    rounds: int = 0                                 # Slots proposed to participants
+    first_feasible_seconds: Optional[float] = None  # From batch start to a confirmed slot
+    timed_out: bool = False                         # Still open when its deadline passed
+
+@dataclass
+class SlotPoll:
+    """Responses to one proposed slot, collected until the slot is decided."""
+    request_id: int
+    time_slot: TimeSlot
+    pending: Set[str]  # Participants asked who have not answered yet
+    timer: Optional[asyncio.Task] = None  # Gives up on the pending answers after the response timeout
 
 logger = logging.getLogger("ceylon")
 
+# Solver mode in which the participants' agents confirm each proposed slot
+SOLVER_NEGOTIATE = "negotiate"
+SOLVER_MODES = (SOLVER_GREEDY, SOLVER_EXACT, SOLVER_NEGOTIATE)
+
 class SchedulingPlayground(BasePlayGround):
-    def __init__(self, name="meeting_scheduler", port=8888):
+    def __init__(self, name="meeting_scheduler", port=8888, batch_requests=True, solver_mode=None,
+                 transport=TRANSPORT_CEYLON, response_timeout=None, meeting_timeout=None):
         super().__init__(name=name, port=port)
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unknown transport: {transport}")
+        if solver_mode is not None and solver_mode not in SOLVER_MODES:
+            raise ValueError(f"Unknown solver mode: {solver_mode}")
+        if solver_mode == SOLVER_NEGOTIATE:
+            # Proposals are checked against the agents' own free time
+            solver_mode, batch_requests = None, False
+        self.batch_requests = batch_requests
+        self.solver_mode = solver_mode  # None negotiates each meeting on its own
+        self.transport = transport      # TRANSPORT_LOCAL keeps messages in process, without a port
+        self.local_transport: Optional[LocalTransport] = None
+        # Agents that take longer than response_timeout to answer count as
+        # unavailable, and meetings still open meeting_timeout seconds into
+        # negotiation time out. None waits indefinitely.
+        self.response_timeout: Optional[float] = response_timeout
+        self.meeting_timeout: Optional[float] = meeting_timeout
+        self._deadline: Optional[float] = None  # Event loop time by which the batch must end
+        self.last_solve: Optional[SolveResult] = None
         self.meetings: Dict[str, Meeting] = {}
         self.current_slots: Dict[str, TimeSlot] = {}
         self.responses: Dict[str, Dict[str, List[str]]] = {}
         self.scheduled_meetings: Dict[str, MeetingScheduled] = {}
         self._meeting_completed_events: Dict[str, asyncio.Event] = {}
         self._completed_meetings: Dict[str, MeetingOutput] = {}
+        self.availability = AvailabilityBitmap()
+        self.candidates: Dict[str, Deque[Tuple[TimeSlot, List[str]]]] = {}
+        self.polls: Dict[str, SlotPoll] = {}
+        self.unresponsive: Set[str] = set()  # Participants that let a request time out this batch
+        self.booked: Dict[str, List[TimeSlot]] = {}  # Slots each participant was booked for this batch
+        self._last_request_id = 0
+        self._pending_availability: Set[str] = set()
+        self._availability_received: Optional[asyncio.Event] = None
+        self.invitees: Dict[str, Set[str]] = {}
+        self.participant_ids: Dict[str, int] = {}
+        self.participant_names: Dict[int, str] = {}
+        self._last_local_id = 0
+        self._batch_started = 0.0
+        self.rounds: Dict[str, int] = {}
+        self.resident_agents: Dict[str, ParticipantAgent] = {}
+        self._resident_task: Optional[asyncio.Task] = None
+        self._resident_ready: Optional[asyncio.Event] = None
+        self._resident_stop: Optional[asyncio.Event] = None
+        self._batch_lock = asyncio.Lock()
+
+    async def schedule_meetings(self, meetings: List[Meeting], participants: List[ParticipantAgent],
+                                meeting_ids: Optional[List[str]] = None, timeout: Optional[float] = None):
+        deadline = self._deadline_after(timeout)
+        self.prepare_batch(meetings, participants, meeting_ids)
+        self._deadline = deadline
+
+        # Without any agents there is nobody to negotiate with
+        if not participants:
+            for meeting_id in self.meetings:
+                self._complete_meeting(meeting_id, False, error="No participants available")
+            return self.get_completed_meetings()
+
+        # Start scheduling process
+        async with self.connect(participants):
+            await self.run_batch(participants)
+        return self.get_completed_meetings()
+
+    @asynccontextmanager
+    async def connect(self, participants: List[ParticipantAgent]):
+        """Connect the participant agents over the playground's transport."""
+        if self.transport == TRANSPORT_CEYLON:
+            async with self.play(workers=participants) as active_playground:
+                yield self
+                await self.finish()
+            return
+
+        self.local_transport = LocalTransport()
+        self.local_transport.attach(self)
+        for participant in participants:
+            detail = self.local_transport.attach(participant)
+            self.llm_agents[participant.name] = AgentConnectedStatus(agent=detail, connected=True)
+        try:
+            yield self
+        finally:
+            await self.local_transport.close()
+            self.local_transport = None
+            self.llm_agents = {}
+
+    async def send_message(self, peer_id: str, message):
+        if self.local_transport is not None:
+            await self.local_transport.send(self, peer_id, message)
+        else:
+            await super().send_message(peer_id, message)
+
+    async def start_resident(self, participants: List[ParticipantAgent], timeout: float = 30.0):
+        """Start the playground once and keep its agents connected for later batches."""
+        self.resident_agents = {participant.name: participant for participant in participants}
+        self._resident_ready = asyncio.Event()
+        self._resident_stop = asyncio.Event()
+        self._resident_task = asyncio.create_task(self._serve_resident(participants))
+        await asyncio.wait_for(self._resident_ready.wait(), timeout=timeout)
+
+    async def _serve_resident(self, participants: List[ParticipantAgent]):
+        async with self.connect(participants):
+            self._resident_ready.set()
+            await self._resident_stop.wait()
+
+    async def stop_resident(self):
+        """Let the running batch finish, then disconnect the resident agents and stop the playground."""
+        if self._resident_task is None:
+            return
+        async with self._batch_lock:
+            self._resident_stop.set()
+            try:
+                await asyncio.wait_for(self._resident_task, timeout=10.0)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            except Exception as e:
+                # A playground whose agents never connected ends with its error
+                logger.warning(f"Resident playground stopped with error: {e}")
+            self._resident_task = None
+            self.resident_agents = {}
+
+    def covers(self, names: Iterable[str]) -> bool:
+        """Check whether every named participant has a resident agent."""
+        return all(name in self.resident_agents for name in names)
+
+    def update_participant(self, name: str, free_time: IntervalIndex, bookings: Dict[str, TimeSlot]) -> bool:
+        """Refresh a resident agent's free time and booked meetings in place."""
+        agent = self.resident_agents.get(name)
+        if agent is None:
+            return False
+        agent.set_free_time(free_time)
+        agent.set_bookings(bookings)
+        return True
+
+    def add_participant(self, participant: ParticipantAgent) -> bool:
+        """
+        Add an agent to the running resident playground.
+
+        Only the local transport can attach agents after the start; over
+        Ceylon the playground has to be restarted with the agent instead.
+        """
+        if self.local_transport is None or self._resident_task is None:
+            return False
+        detail = self.local_transport.attach(participant)
+        self.llm_agents[participant.name] = AgentConnectedStatus(agent=detail, connected=True)
+        self.resident_agents[participant.name] = participant
+        return True
+
+    def add_available_slot(self, name: str, slot: TimeSlot) -> bool:
+        """Add one free slot to a resident agent."""
+        agent = self.resident_agents.get(name)
+        if agent is None:
+            return False
+        agent.add_available_slot(slot)
+        return True
+
+    def remove_participant(self, name: str):
+        """Stop using a resident agent for new batches."""
+        self.resident_agents.pop(name, None)
+
+    def book_meeting(self, meeting_id: str, time_slot: TimeSlot, names: Iterable[str]):
+        """Block a meeting scheduled outside this playground on the named resident agents."""
+        for name in names:
+            agent = self.resident_agents.get(name)
+            if agent is not None:
+                agent.book(meeting_id, time_slot)
+
+    def release_meeting(self, meeting_id: str):
+        """Free the time resident agents booked for a meeting."""
+        for agent in self.resident_agents.values():
+            agent.release_meeting(meeting_id)
+
+    async def submit(self, meetings: List[Meeting], meeting_ids: Optional[List[str]] = None,
+                     timeout: Optional[float] = None) -> Dict[str, MeetingOutput]:
+        """
+        Schedule a batch of meetings on the resident agents.
+
+        With a timeout, the batch ends that many seconds after submission,
+        waiting for earlier batches included, and meetings still open are
+        returned as timed out. Raises PlaygroundStopped if the playground
+        is not running, or was stopped while the batch waited its turn.
+        """
+        if self._resident_task is None:
+            raise PlaygroundStopped("Resident playground is not running")
+        deadline = self._deadline_after(timeout)
+
+        # Batches share per-batch state, so they run one at a time
+        async with self._batch_lock:
+            if self._resident_task is None:
+                raise PlaygroundStopped("Resident playground was stopped")
+            participants = list(self.resident_agents.values())
+            self.prepare_batch(meetings, participants, meeting_ids)
+            self._deadline = deadline
+            await self.run_batch(participants)
+            return dict(self.get_completed_meetings())
+
+    @staticmethod
+    def _deadline_after(timeout: Optional[float]) -> Optional[float]:
+        return None if timeout is None else asyncio.get_running_loop().time() + timeout
+
+    def _time_left(self, timeout: Optional[float] = None) -> Optional[float]:
+        """Return the given timeout, cut short by the batch deadline."""
+        if self._deadline is not None:
+            left = max(self._deadline - asyncio.get_running_loop().time(), 0)
+            timeout = left if timeout is None else min(timeout, left)
+        return timeout
+
+    def prepare_batch(self, meetings: List[Meeting], participants: List[ParticipantAgent],
+                      meeting_ids: Optional[List[str]] = None):
+        """Reset per-batch state for a new list of meetings."""
+        if meeting_ids is None:
+            meeting_ids = [str(i) for i in range(len(meetings))]
+        self._close_polls()
+        self._deadline = None
 
-    async def schedule_meetings(self, meetings: List[Meeting], participants: List[ParticipantAgent]):
         # Store meetings and create completion events
-        self.meetings = {str(i): meeting for i, meeting in enumerate(meetings)}
+        self.meetings = dict(zip(meeting_ids, meetings))
+        self.current_slots = {}
+        self.responses = {}
+        self.candidates = {}
+        self.unresponsive = set()
+        self.booked = {}
+        self.invitees = {}
+        self.rounds = dict.fromkeys(meeting_ids, 0)
+        self._batch_started = perf_counter()
+        self._meeting_completed_events = {}
+        self._completed_meetings = {}
         for meeting_id in self.meetings:
             self._meeting_completed_events[meeting_id] = asyncio.Event()
             self.responses[meeting_id] = {}
 
-        # Start scheduling process
-        async with self.play(workers=participants) as active_playground:
+        # Messages refer to participants by id. Agents created without a
+        # database id get a negative local one that stays with the agent.
+        for participant in participants:
+            if participant.participant_id is None:
+                self._last_local_id -= 1
+                participant.participant_id = self._last_local_id
+        self.participant_ids = {participant.name: participant.participant_id for participant in participants}
+        if len(self.participant_ids) < len(participants):
+            # Agents are addressed by name, so a shared name would merge two participants
+            raise ValueError("Participant agents must have unique names")
+        self.participant_names = {participant_id: name for name, participant_id in self.participant_ids.items()}
+
+        # Resolve who is invited to each meeting among the running agents
+        names = {participant.name for participant in participants}
+        for meeting_id, meeting in self.meetings.items():
+            invited = names if meeting.participants is None else names.intersection(meeting.participants)
+            self.invitees[meeting_id] = set(invited)
+
+    async def run_batch(self, participants: List[ParticipantAgent]):
+        """Schedule the prepared meetings with agents that are already connected."""
+        # Find every feasible slot up front instead of probing slot by slot
+        if self.batch_requests:
+            await self.request_availability(participants)
+        else:
+            self.load_availability(participants)
+
+        if self.solver_mode:
+            await self.solve_all()
+        else:
+            self.find_candidates()
+
             # Initialize scheduling for each meeting
             for meeting_id, meeting in self.meetings.items():
                 await self.start_scheduling(meeting_id, meeting)
 
-            # Wait for completion
-            await self.wait_for_completion()
-            return self.get_completed_meetings()
+        # Wait for completion
+        await self.wait_for_completion()
+
+    def load_availability(self, participants: List[ParticipantAgent]):
+        """Build the availability bitmap from the participants' interval indexes."""
+        self.availability = AvailabilityBitmap()
+        for participant in participants:
+            self.availability.add_participant(participant.name)
+            for date in participant.availability.dates():
+                self.availability.set_free_cells(
+                    participant.name, date, participant.free_cells(date, self.availability.resolution)
+                )
+
+    async def request_availability(self, participants: List[ParticipantAgent]):
+        """Collect one availability mask per invitee covering all their meetings."""
+        self.availability = AvailabilityBitmap()
+        windows: Dict[str, List[CandidateWindow]] = {}
+        for meeting_id, meeting in self.meetings.items():
+            meeting_windows = [
+                CandidateWindow(
+                    meeting_id=meeting_id,
+                    date=date,
+                    start_time=meeting.window_start,
+                    end_time=meeting.window_end
+                )
+                for date in meeting.dates()
+            ]
+            for name in self.invitees[meeting_id]:
+                windows.setdefault(name, []).extend(meeting_windows)
+
+        self._pending_availability = set(windows)
+        self._availability_received = asyncio.Event()
+        if not self._pending_availability:
+            return
+
+        for name, participant_windows in windows.items():
+            request = BatchAvailabilityRequest(
+                windows=participant_windows,
+                resolution=self.availability.resolution
+            )
+            await self.send_to([name], request)
+        try:
+            await asyncio.wait_for(self._availability_received.wait(), self._time_left(self.response_timeout))
+        except asyncio.TimeoutError:
+            # Participants that never answered have no free time in the bitmap
+            logger.warning(f"No availability in time from: {', '.join(sorted(self._pending_availability))}")
+            self.unresponsive.update(self._pending_availability)
+            self._pending_availability = set()
+
+    @on(BatchAvailabilityResponse)
+    async def handle_batch_response(self, response: BatchAvailabilityResponse, time: int, agent):
+        """Merge a participant's availability masks into the bitmap."""
+        metrics.MESSAGES_RECEIVED.inc(role="playground", type="BatchAvailabilityResponse")
+        name = self.participant_names.get(response.participant_id)
+        if name not in self._pending_availability:
+            return
+
+        self.availability.add_participant(name)
+        for date, mask in response.masks.items():
+            self.availability.set_free_cells(name, date, mask)
+
+        self._pending_availability.discard(name)
+        if not self._pending_availability and self._availability_received:
+            self._availability_received.set()
+
+    def find_candidates(self):
+        """Compute the feasible slots of every meeting from the bitmap."""
+        for meeting_id, meeting in self.meetings.items():
+            self.candidates[meeting_id] = deque(self.availability.feasible_starts(
+                meeting.dates(),
+                meeting.duration,
+                participants=self.invitees[meeting_id],
+                minimum_participants=meeting.minimum_participants,
+                window_start=meeting.window_start,
+                window_end=meeting.window_end
+            ))
+
+    async def send_to(self, names: Iterable[str], message) -> List[str]:
+        """Send a message directly to the named participant agents and return who it was sent to."""
+        sent = []
+        for name in names:
+            status = self.llm_agents.get(name)
+            if status is None:
+                logger.warning(f"Participant {name} is not connected")
+                continue
+            await self.send_message(status.agent.id, message)
+            metrics.MESSAGES_SENT.inc(role="playground", type=type(message).__name__)
+            sent.append(name)
+        return sent
+
+    async def solve_all(self):
+        """Assign every meeting in one conflict-free pass of the batch solver."""
+        solver = BatchSolver(self.availability)
+        self.last_solve = solver.solve(self.meetings, self.invitees, mode=self.solver_mode)
+
+        for meeting_id, assignment in self.last_solve.assignments.items():
+            slot = assignment.time_slot
+            self.current_slots[meeting_id] = slot
+            self.responses[meeting_id][f"{slot.date}_{slot.start_time}"] = assignment.participants
+            await self.schedule_meeting(meeting_id)
+
+        for meeting_id in self.last_solve.unscheduled:
+            self._complete_meeting(meeting_id, False, error="No conflict-free time slot found")
 
     async def start_scheduling(self, meeting_id: str, meeting: Meeting):
         """Start scheduling a specific meeting."""
         logger.info(f"Starting scheduling for meeting: {meeting.name}")
-        
-        # Start with a default time slot for the meeting's date
-        initial_slot = TimeSlot(
-            date=meeting.date,
-            start_time=9,  # Start at 9 AM
-            end_time=9 + meeting.duration
-        )
-        
-        self.current_slots[meeting_id] = initial_slot
-        
-        # Send availability request to all participants
+        if self.batch_requests:
+            await self.schedule_first_candidate(meeting_id)
+        else:
+            await self.propose_next_slot(meeting_id)
+
+    async def schedule_first_candidate(self, meeting_id: str):
+        """Schedule a meeting directly from the participants' reported masks."""
+        candidates = self.candidates.get(meeting_id)
+        minimum = self.meetings[meeting_id].minimum_participants
+
+        # The masks predate this batch's bookings, so skip slots that
+        # meetings scheduled before this one have taken
+        while candidates and len(self._still_free(*candidates[0])) < minimum:
+            candidates.popleft()
+        if not candidates:
+            logger.info(f"No slots available for meeting {meeting_id}")
+            self._complete_meeting(meeting_id, False, error="No suitable time slot found")
+            return
+
+        slot, free_participants = candidates[0]
+        free_participants = self._still_free(slot, free_participants)
+        self.current_slots[meeting_id] = slot
+        self.responses[meeting_id][f"{slot.date}_{slot.start_time}"] = free_participants
+        await self.schedule_meeting(meeting_id)
+
+    async def propose_next_slot(self, meeting_id: str):
+        """Ask participants to confirm the next feasible slot for a meeting."""
+        candidates = self.candidates.get(meeting_id)
+        minimum = self.meetings[meeting_id].minimum_participants
+
+        # Skip slots that only participants who stopped answering or were
+        # booked by another meeting since could fill
+        while candidates and len(self._still_free(*candidates[0])) < minimum:
+            candidates.popleft()
+        if not candidates:
+            logger.info(f"No more slots available for meeting {meeting_id}")
+            self._complete_meeting(meeting_id, False, error="No suitable time slot found")
+            return
+
+        slot, free_participants = candidates.popleft()
+        free_participants = self._still_free(slot, free_participants)
+        self.current_slots[meeting_id] = slot
+        self.rounds[meeting_id] = self.rounds.get(meeting_id, 0) + 1
+        self._last_request_id += 1
+
+        # Only participants the bitmap counts as free can confirm the slot,
+        # so the others are not asked, and neither is anyone who stopped answering
         request = AvailabilityRequest(
             meeting_id=meeting_id,
-            time_slot=initial_slot
+            time_slot=slot,
+            request_id=self._last_request_id
         )
-        
-        await self.broadcast_message(request)
+        poll = SlotPoll(request_id=request.request_id, time_slot=slot, pending=set(free_participants))
+        self.polls[meeting_id] = poll
+        sent = await self.send_to(free_participants, request)
+
+        # Answers may already have arrived; whoever was not reached never will
+        if self.polls.get(meeting_id) is poll:
+            poll.pending.intersection_update(sent)
+            if poll.pending and self.response_timeout is not None:
+                poll.timer = asyncio.create_task(self._expire_poll(meeting_id, poll, self.response_timeout))
+            await self.decide_slot(meeting_id)
+
+    def _booked_over(self, name: str, slot: TimeSlot) -> bool:
+        """Return whether a participant was booked this batch for time overlapping the slot."""
+        return any(
+            booked.date == slot.date and booked.start_time < slot.end_time and slot.start_time < booked.end_time
+            for booked in self.booked.get(name, ())
+        )
+
+    def _still_free(self, slot: TimeSlot, names: Iterable[str]) -> List[str]:
+        """Return the participants who still answer and have not been booked over the slot."""
+        return [name for name in names if name not in self.unresponsive and not self._booked_over(name, slot)]
+
+    def _drop_booked(self, meeting_id: str):
+        """Forget confirmations of the current slot from participants booked over it since."""
+        slot = self.current_slots[meeting_id]
+        confirmed = self.responses[meeting_id].get(f"{slot.date}_{slot.start_time}")
+        if confirmed:
+            confirmed[:] = [name for name in confirmed if not self._booked_over(name, slot)]
+
+    async def _expire_poll(self, meeting_id: str, poll: SlotPoll, timeout: float):
+        """Count participants that have not answered a proposal in time as unavailable."""
+        await asyncio.sleep(timeout)
+        if self.polls.get(meeting_id) is not poll:
+            return
+        logger.warning(f"No answer in time for meeting {meeting_id} from: {', '.join(sorted(poll.pending))}")
+        self.unresponsive.update(poll.pending)
+        poll.pending.clear()
+        await self.decide_slot(meeting_id)
+
+    def _close_polls(self):
+        """Stop waiting on every open proposal."""
+        for poll in self.polls.values():
+            if poll.timer is not None:
+                poll.timer.cancel()
+        self.polls = {}
 
     @on(AvailabilityResponse)
     async def handle_response(self, response: AvailabilityResponse, time: int, agent):
         """Handle availability responses from participants."""
+        metrics.MESSAGES_RECEIVED.inc(role="playground", type="AvailabilityResponse")
         meeting_id = response.meeting_id
-        
-        # Handle unavailable time slots
-        if not response.available:
-            if meeting_id in self.current_slots:
-                await self.try_next_slot(meeting_id)
+        poll = self.polls.get(meeting_id)
+        name = self.participant_names.get(response.participant_id)
+
+        # Answers to an earlier proposal, or repeated ones, are dropped
+        if poll is None or response.request_id != poll.request_id or name not in poll.pending:
             return
-        
+        poll.pending.discard(name)
+
         # Track response
-        self.track_response(response)
-        
-        # Check if we can schedule the meeting now
+        self.track_response(response, name)
+        await self.decide_slot(meeting_id)
+
+    async def decide_slot(self, meeting_id: str):
+        """
+        Settle the current slot once everyone asked has answered or too few
+        can still accept it.
+
+        Each proposal is decided exactly once, so a slot that several
+        participants decline only moves the meeting on to the next one.
+        """
+        poll = self.polls[meeting_id]
+        available = len(self.get_available_participants(meeting_id))
+        quorum_lost = available + len(poll.pending) < self.meetings[meeting_id].minimum_participants
+        if poll.pending and not quorum_lost:
+            return
+
+        del self.polls[meeting_id]
+        # The poll's own timer may be the one deciding it
+        if poll.timer is not None and poll.timer is not asyncio.current_task():
+            poll.timer.cancel()
+        # Meetings negotiated side by side may have taken some of them meanwhile
+        self._drop_booked(meeting_id)
         if self.can_schedule(meeting_id):
             await self.schedule_meeting(meeting_id)
+        else:
+            await self.try_next_slot(meeting_id)
     
-    def track_response(self, response: AvailabilityResponse):
+    def track_response(self, response: AvailabilityResponse, name: str):
         """Track participant responses for a meeting."""
         meeting_id = response.meeting_id
         slot_key = f"{response.time_slot.date}_{response.time_slot.start_time}"
@@ -106,8 +598,8 @@ class SchedulingPlayground(BasePlayGround):
         if slot_key not in self.responses[meeting_id]:
             self.responses[meeting_id][slot_key] = []
             
-        if response.available and response.participant not in self.responses[meeting_id][slot_key]:
-            self.responses[meeting_id][slot_key].append(response.participant)
+        if response.available and name not in self.responses[meeting_id][slot_key]:
+            self.responses[meeting_id][slot_key].append(name)
     
     def can_schedule(self, meeting_id: str) -> bool:
         """Check if a meeting can be scheduled with current responses."""
@@ -134,36 +626,12 @@ class SchedulingPlayground(BasePlayGround):
         return []
     
     async def try_next_slot(self, meeting_id: str):
-        """Try the next time slot for a meeting."""
+        """Try the next feasible time slot for a meeting."""
         if meeting_id not in self.current_slots or meeting_id not in self.meetings:
             logger.warning(f"Invalid meeting ID in try_next_slot: {meeting_id}")
             return
-            
-        current_slot = self.current_slots[meeting_id]
-        
-        # Calculate next slot (move 30 minutes forward)
-        next_start = current_slot.start_time + 0.5
-        if next_start >= 17:  # Don't schedule past 5 PM
-            logger.info(f"No more slots available for meeting {meeting_id}")
-            self._complete_meeting(meeting_id, False, error="No suitable time slot found")
-            return
-            
-        meeting = self.meetings[meeting_id]
-        next_slot = TimeSlot(
-            date=current_slot.date,
-            start_time=next_start,
-            end_time=next_start + meeting.duration
-        )
-        
-        self.current_slots[meeting_id] = next_slot
-        
-        # Send new availability request
-        request = AvailabilityRequest(
-            meeting_id=meeting_id,
-            time_slot=next_slot
-        )
-        
-        await self.broadcast_message(request)
+
+        await self.propose_next_slot(meeting_id)
     
     async def schedule_meeting(self, meeting_id: str):
         """Schedule a meeting with the current time slot."""
@@ -172,27 +640,29 @@ class SchedulingPlayground(BasePlayGround):
             
         current_slot = self.current_slots[meeting_id]
         available_participants = self.get_available_participants(meeting_id)
+        for name in available_participants:
+            self.booked.setdefault(name, []).append(current_slot)
         
         # Create scheduled meeting
         scheduled = MeetingScheduled(
             meeting_id=meeting_id,
             time_slot=current_slot,
-            participants=available_participants
+            participants=[self.participant_ids[name] for name in available_participants]
         )
         
         self.scheduled_meetings[meeting_id] = scheduled
         
-        # Notify participants
-        await self.broadcast_message(scheduled)
+        # Notify invited participants
+        await self.send_to(self.invitees[meeting_id], scheduled)
         
         # Mark meeting as completed
         self._complete_meeting(meeting_id, True, scheduled)
     
     def _complete_meeting(self, meeting_id: str, success: bool, 
                          scheduled: Optional[MeetingScheduled] = None,
-                         error: Optional[str] = None):
+                         error: Optional[str] = None, timed_out: bool = False):
         """Record meeting completion status."""
-        if meeting_id not in self.meetings:
+        if meeting_id not in self.meetings or meeting_id in self._completed_meetings:
             return
             
         logger.info(f"Completing meeting {meeting_id}")
@@ -206,12 +676,20 @@ class SchedulingPlayground(BasePlayGround):
             meeting_id=meeting_id,
             name=self.meetings[meeting_id].name,
             scheduled=success,
-            error=error
+            error=error,
+            rounds=self.rounds.get(meeting_id, 0),
+            timed_out=timed_out
         )
         
         if success and scheduled:
             output.time_slot = scheduled.time_slot
-            output.participants = scheduled.participants
+            output.participants = [self.participant_names[i] for i in scheduled.participants]
+            output.first_feasible_seconds = perf_counter() - self._batch_started
+            metrics.FIRST_FEASIBLE_SECONDS.observe(output.first_feasible_seconds)
+        metrics.NEGOTIATION_ROUNDS.observe(output.rounds)
+        metrics.MEETINGS_COMPLETED.inc(
+            outcome="scheduled" if success else "timed_out" if timed_out else "unscheduled"
+        )
         
         self._completed_meetings[meeting_id] = output
         
@@ -220,10 +698,23 @@ class SchedulingPlayground(BasePlayGround):
             self._meeting_completed_events[meeting_id].set()
     
     async def wait_for_completion(self):
-        """Wait for all meetings to be scheduled or failed."""
+        """Wait for all meetings to be scheduled or failed, timing out those still open at the deadline."""
         waiting_events = [event.wait() for event in self._meeting_completed_events.values()]
-        if waiting_events:
-            await asyncio.gather(*waiting_events)
+        if not waiting_events:
+            return
+        try:
+            await asyncio.wait_for(asyncio.gather(*waiting_events), self._time_left(self.meeting_timeout))
+        except asyncio.TimeoutError:
+            # Proposals already confirmed by enough participants still count;
+            # late answers must not reopen meetings that are already reported
+            polls = self.polls
+            self._close_polls()
+            for meeting_id in polls:
+                self._drop_booked(meeting_id)
+                if self.can_schedule(meeting_id):
+                    await self.schedule_meeting(meeting_id)
+            for meeting_id in self.meetings:
+                self._complete_meeting(meeting_id, False, error="Scheduling timed out", timed_out=True)
     
     def get_completed_meetings(self) -> Dict[str, MeetingOutput]:
         """Get results of all completed meetings."""
@@ -0,0 +1,80 @@
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+import heapq
+
+from .interval_index import IntervalIndex
+from .timegrid import SLOT_MINUTES
+
+
+@dataclass
+class SlotCandidate:
+    date: str
+    start: int          # Minutes since midnight
+    end: int
+    attendees: List[Hashable] = field(default_factory=list)
+
+    @property
+    def attendee_count(self) -> int:
+        return len(self.attendees)
+
+
+def attendance_segments(indexes: Dict[Hashable, IntervalIndex], date: str, duration: int,
+                        step: int = SLOT_MINUTES,
+                        window: Optional[Tuple[int, int]] = None) -> List[Tuple[int, int, int]]:
+    """
+    Return ``(count, first_start, end_start)`` runs of meeting start times on a date.
+
+    Every start in ``[first_start, end_start)`` on the ``step`` grid lets
+    exactly ``count`` participants attend for ``duration`` minutes. Each
+    free interval becomes one +1/-1 pair of start-time events, so a date
+    costs a sort of its intervals rather than a probe per grid cell.
+    Intervals are clipped to ``window``, in minutes, when one is given.
+    """
+    events = []
+    for index in indexes.values():
+        for start, end in index.intervals(date):
+            if window is not None:
+                start, end = max(start, window[0]), min(end, window[1])
+            first = -(-start // step) * step
+            last = (end - duration) // step * step
+            if last >= first:
+                events.append((first, 1))
+                events.append((last + step, -1))
+    events.sort()
+
+    segments = []
+    count = 0
+    for i, (position, delta) in enumerate(events):
+        count += delta
+        following = events[i + 1][0] if i + 1 < len(events) else position
+        if count > 0 and following > position:
+            segments.append((count, position, following))
+    return segments
+
+
+def suggest_slots(indexes: Dict[Hashable, IntervalIndex], dates: Iterable[str], duration: int,
+                  k: int, step: int = SLOT_MINUTES,
+                  window: Optional[Tuple[int, int]] = None) -> List[SlotCandidate]:
+    """
+    Return the ``k`` best meeting slots across the dates, most attendees first.
+
+    Each run of start times with the same attendance yields one candidate,
+    its earliest start, so suggestions are distinct times rather than the
+    same window shifted by ``step``. Ties go to the earlier slot. Slots lie
+    within ``window``, in minutes since midnight, when one is given.
+    """
+    runs = (
+        (-count, date, first_start)
+        for date in dates
+        for count, first_start, _ in attendance_segments(indexes, date, duration, step, window)
+    )
+    candidates = []
+    for _, date, start in heapq.nsmallest(k, runs):
+        end = start + duration
+        candidates.append(SlotCandidate(
+            date=date,
+            start=start,
+            end=end,
+            attendees=[key for key, index in indexes.items() if index.contains(date, start, end)]
+        ))
+    return candidates
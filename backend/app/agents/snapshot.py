@@ -0,0 +1,103 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .availability import AvailabilityBitmap
+from .interval_index import IntervalIndex
+from .participant_agent import ParticipantAgent
+from .timegrid import SLOT_MINUTES
+
+
+@dataclass
+class AvailabilitySnapshot:
+    """
+    Free time of many participants in parallel integer arrays.
+
+    Participant ``i`` owns the slots ``slot_offsets[i]:slot_offsets[i + 1]``.
+    Each slot is a date index into ``dates`` plus start and end minutes, so
+    the snapshot holds a handful of arrays instead of one object per slot.
+    """
+    participant_ids: array = field(default_factory=lambda: array("l"))
+    names: List[str] = field(default_factory=list)  # Agent names, unique per participant
+    dates: List[str] = field(default_factory=list)
+    slot_offsets: array = field(default_factory=lambda: array("l", [0]))
+    slot_dates: array = field(default_factory=lambda: array("l"))
+    slot_starts: array = field(default_factory=lambda: array("l"))
+    slot_ends: array = field(default_factory=lambda: array("l"))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def slot_count(self) -> int:
+        return len(self.slot_starts)
+
+    def index_of(self) -> Dict[int, int]:
+        """Map participant ids to their position in the snapshot."""
+        return {participant_id: i for i, participant_id in enumerate(self.participant_ids)}
+
+    def intervals(self, i: int) -> Iterator[Tuple[str, int, int]]:
+        """Yield ``(date, start, end)`` in minutes for participant ``i``."""
+        dates = self.dates
+        for j in range(self.slot_offsets[i], self.slot_offsets[i + 1]):
+            yield dates[self.slot_dates[j]], self.slot_starts[j], self.slot_ends[j]
+
+    def interval_index(self, i: int) -> IntervalIndex:
+        return IntervalIndex.from_intervals(self.intervals(i))
+
+    def select(self, positions: Iterable[int]) -> "AvailabilitySnapshot":
+        """Return a snapshot of only the participants at the given positions."""
+        subset = AvailabilitySnapshot(dates=self.dates)
+        for i in positions:
+            start, end = self.slot_offsets[i], self.slot_offsets[i + 1]
+            subset.participant_ids.append(self.participant_ids[i])
+            subset.names.append(self.names[i])
+            subset.slot_dates.extend(self.slot_dates[start:end])
+            subset.slot_starts.extend(self.slot_starts[start:end])
+            subset.slot_ends.extend(self.slot_ends[start:end])
+            subset.slot_offsets.append(len(subset.slot_starts))
+        return subset
+
+    def subtract(self, booked: Dict[int, List[Tuple[str, int, int]]]) -> "AvailabilitySnapshot":
+        """Return a snapshot without the booked ``(date, start, end)`` intervals, keyed by participant id."""
+        result = AvailabilitySnapshot(dates=self.dates)
+        positions = {date: i for i, date in enumerate(self.dates)}
+        for i, participant_id in enumerate(self.participant_ids):
+            result.participant_ids.append(participant_id)
+            result.names.append(self.names[i])
+            intervals = booked.get(participant_id)
+            if not intervals:
+                start, end = self.slot_offsets[i], self.slot_offsets[i + 1]
+                result.slot_dates.extend(self.slot_dates[start:end])
+                result.slot_starts.extend(self.slot_starts[start:end])
+                result.slot_ends.extend(self.slot_ends[start:end])
+            else:
+                index = self.interval_index(i)
+                for date, start, end in intervals:
+                    index.remove(date, start, end)
+                for date in index.dates():
+                    for start, end in index.intervals(date):
+                        result.slot_dates.append(positions[date])
+                        result.slot_starts.append(start)
+                        result.slot_ends.append(end)
+            result.slot_offsets.append(len(result.slot_starts))
+        return result
+
+    def availability(self, resolution: int = SLOT_MINUTES) -> AvailabilityBitmap:
+        """Build the availability bitmap of every participant without creating agents."""
+        bitmap = AvailabilityBitmap(resolution)
+        for i, name in enumerate(self.names):
+            index = self.interval_index(i)
+            bitmap.add_participant(name)
+            for date in index.dates():
+                bitmap.set_free_cells(name, date, index.free_cells(date, resolution))
+        return bitmap
+
+    def build_agents(self) -> List[ParticipantAgent]:
+        """Create one participant agent per participant, indexed straight from the arrays."""
+        return [
+            ParticipantAgent(
+                name=name, free_time=self.interval_index(i), participant_id=self.participant_ids[i]
+            )
+            for i, name in enumerate(self.names)
+        ]
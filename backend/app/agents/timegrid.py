@@ -0,0 +1,33 @@
+SLOT_MINUTES = 15          # Resolution of one availability cell
+MINUTES_PER_DAY = 24 * 60
+
+
+def to_minutes(hour: float) -> int:
+    """Convert an hour value (possibly fractional) to minutes since midnight."""
+    return int(round(hour * 60))
+
+
+def to_hours(minutes: int):
+    """Convert minutes since midnight back to hours, keeping whole hours as ints."""
+    hours = minutes / 60
+    return int(hours) if hours.is_integer() else hours
+
+
+def cell_range(start_time: float, end_time: float, resolution: int = SLOT_MINUTES) -> range:
+    """Return the cells fully covered by the interval between two hour values."""
+    first = -(-to_minutes(start_time) // resolution)
+    last = to_minutes(end_time) // resolution
+    return range(max(first, 0), min(last, MINUTES_PER_DAY // resolution))
+
+
+def slot_cells(slot, resolution: int = SLOT_MINUTES) -> range:
+    """Return the cells fully covered by a free time slot."""
+    return cell_range(slot.start_time, slot.end_time, resolution)
+
+
+def range_mask(cells: range) -> int:
+    """Return a bitmask with one bit set per cell in the range."""
+    if not cells:
+        return 0
+    return ((1 << len(cells)) - 1) << cells.start
+
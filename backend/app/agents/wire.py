@@ -0,0 +1,72 @@
+"""
+Compact binary encoding for agent messages.
+
+Ceylon pickles every message it sends. A plain dataclass pickles as its
+class path, every field name and every value, so a reply repeats strings
+like the participant name and the nested ``TimeSlot`` each time. Message
+classes here pickle as a call to ``load`` with a single bytes argument
+instead: one message tag byte followed by packed integers (numeric ids,
+dates as days since 1970 and times as minutes).
+"""
+from functools import lru_cache
+from typing import Callable, Dict
+import datetime
+
+EPOCH = datetime.date(1970, 1, 1).toordinal()
+# Dates travel as unsigned 16-bit days, so only this range can be sent
+FIRST_DATE = datetime.date.fromordinal(EPOCH)
+LAST_DATE = datetime.date.fromordinal(EPOCH + 0xFFFF)
+
+_decoders: Dict[int, Callable[[memoryview], object]] = {}
+
+
+def register(tag: int):
+    """Class decorator giving a message class its tag on the wire."""
+    def decorator(cls):
+        if tag in _decoders:
+            raise ValueError(f"Wire tag {tag} is already registered")
+        cls.wire_tag = tag
+        _decoders[tag] = cls.unpack
+        return cls
+    return decorator
+
+
+def load(data: bytes):
+    """Rebuild a message from its encoding; every message pickle calls this."""
+    return _decoders[data[0]](memoryview(data)[1:])
+
+
+def check_date(date: datetime.date) -> datetime.date:
+    """Return the date if it can travel on the wire, for schema validators."""
+    if not FIRST_DATE <= date <= LAST_DATE:
+        raise ValueError(f"Dates must be between {FIRST_DATE} and {LAST_DATE}")
+    return date
+
+
+@lru_cache(maxsize=4096)
+def pack_date(date: str) -> int:
+    return datetime.date.fromisoformat(date).toordinal() - EPOCH
+
+
+@lru_cache(maxsize=4096)
+def unpack_date(days: int) -> str:
+    return datetime.date.fromordinal(days + EPOCH).isoformat()
+
+
+class WireMessage:
+    """Base for messages that pickle through their compact encoding."""
+    __slots__ = ()
+    wire_tag = 0
+
+    def pack(self) -> bytes:
+        raise NotImplementedError
+
+    @classmethod
+    def unpack(cls, data: memoryview):
+        raise NotImplementedError
+
+    def encode(self) -> bytes:
+        return bytes((self.wire_tag,)) + self.pack()
+
+    def __reduce__(self):
+        return load, (self.encode(),)
@@ -1,11 +1,19 @@
-from fastapi import FastAPI
+import asyncio
+import time
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.app.database import Base, engine
-from backend.app.routers import participants, meetings, scheduling
+from backend.app.metrics import REQUEST_SECONDS
+from backend.app.migrations import migrate
+from backend.app.routers import participants, meetings, scheduling, metrics
+from backend.app.services.availability_cache import availability_cache
+from backend.app.services.change_events import events
+from backend.app.services.resident_scheduler import resident
+from backend.app.services.scheduling_runs import worker
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables and bring older databases up to date
+migrate()
 
 app = FastAPI(
     title="Meeting Scheduler API",
@@ -22,10 +30,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template so /meetings/1 and /meetings/2 share a series
+    route = request.scope.get("route")
+    REQUEST_SECONDS.observe(
+        time.perf_counter() - started,
+        method=request.method,
+        route=route.path if route is not None else "unmatched",
+        status=response.status_code
+    )
+    return response
+
+@app.on_event("startup")
+async def start_scheduling_worker():
+    events.bind(asyncio.get_running_loop())
+    events.subscribe(availability_cache.handle_change)
+    await resident.start()
+    await worker.start()
+
+@app.on_event("shutdown")
+async def stop_scheduling_worker():
+    await worker.stop()
+    await resident.stop()
+    events.unsubscribe(availability_cache.handle_change)
+    events.bind(None)
+
 # Include routers
 app.include_router(participants.router)
 app.include_router(meetings.router)
 app.include_router(scheduling.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 def read_root():
@@ -35,6 +72,7 @@ def read_root():
         "endpoints": [
             {"path": "/participants", "description": "Manage participants"},
             {"path": "/meetings", "description": "Manage meetings"},
-            {"path": "/scheduling", "description": "Run and check scheduling"}
+            {"path": "/scheduling", "description": "Run and check scheduling"},
+            {"path": "/metrics", "description": "Prometheus metrics"}
         ]
     }
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+Schema migrations for databases created by earlier versions.
+
+New databases get the current schema from ``Base.metadata.create_all``.
+Older databases stored dates as free-form strings and times as integer
+hours; ``migrate`` converts them in place and adds missing columns and
+indexes. It is safe to run on every startup, or by hand:
+
+    python -m backend.app.migrations
+
+Dates are normalized together with the hour columns, as databases of
+that version have both. On SQLite the hour columns are dropped with
+``ALTER TABLE ... DROP COLUMN``, which needs SQLite 3.35 or newer.
+"""
+from datetime import date
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from backend.app.database import Base, engine as default_engine
+from backend.app.models import meeting, participant, schedule_version, scheduling_run, time_slot  # noqa: F401
+
+logger = logging.getLogger("ceylon")
+
+HOUR_TABLES = ("time_slots", "scheduled_slots")   # start_time/end_time hours -> minutes
+DATE_TABLES = ("time_slots", "scheduled_slots", "meetings")
+SQLITE_MIN_VERSION = (3, 35, 0)  # First with ALTER TABLE ... DROP COLUMN
+
+
+def _columns(connection: Connection, table: str):
+    return {column["name"] for column in inspect(connection).get_columns(table)}
+
+
+def _hours_to_minutes(connection: Connection, table: str):
+    # Each step checks the columns first, so an interrupted run can be repeated
+    columns = _columns(connection, table)
+    for name in ("start", "end"):
+        if f"{name}_time" not in columns:
+            continue
+        if f"{name}_minute" not in columns:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name}_minute INTEGER"))
+        connection.execute(text(
+            f"UPDATE {table} SET {name}_minute = CAST(ROUND({name}_time * 60) AS INTEGER)"
+        ))
+        connection.execute(text(f"ALTER TABLE {table} DROP COLUMN {name}_time"))
+        if connection.dialect.name != "sqlite":
+            # SQLite cannot add NOT NULL to an existing column; the ORM always sets it
+            connection.execute(text(f"ALTER TABLE {table} ALTER COLUMN {name}_minute SET NOT NULL"))
+
+
+def _convert_dates(connection: Connection, table: str):
+    if connection.dialect.name != "sqlite":
+        connection.execute(text(f"ALTER TABLE {table} ALTER COLUMN date TYPE DATE USING CAST(date AS DATE)"))
+        return
+
+    # SQLite keeps dates as ISO text, so only normalize the stored values
+    for value, in connection.execute(text(f"SELECT DISTINCT date FROM {table}")).all():
+        try:
+            converted = date.fromisoformat(str(value).strip()).isoformat()
+        except ValueError:
+            raise ValueError(f"Cannot convert date {value!r} in {table} to YYYY-MM-DD")
+        if converted != value:
+            connection.execute(
+                text(f"UPDATE {table} SET date = :converted WHERE date = :value"),
+                {"converted": converted, "value": value}
+            )
+
+
+def _add_missing_columns(connection: Connection):
+    # Only columns that can be filled for existing rows: nullable or with a server default
+    for table in Base.metadata.sorted_tables:
+        existing = _columns(connection, table.name)
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable and column.server_default is None:
+                logger.warning(f"Cannot add required column {table.name}.{column.name} to existing rows")
+                continue
+            definition = f"{column.name} {column.type.compile(dialect=connection.dialect)}"
+            if column.server_default is not None:
+                default = column.server_default.arg.compile(dialect=connection.dialect)
+                definition += f" DEFAULT {default}"
+            if not column.nullable:
+                definition += " NOT NULL"
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {definition}"))
+            logger.info(f"Added column {table.name}.{column.name}")
+
+
+def _create_missing_indexes(connection: Connection):
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(connection)
+                logger.info(f"Created index {index.name}")
+
+
+def migrate(engine: Engine = default_engine):
+    """Create missing tables, convert legacy columns and add missing columns and indexes."""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        legacy = [
+            table for table in HOUR_TABLES
+            if {"start_time", "end_time"} & _columns(connection, table)
+        ]
+        if legacy:
+            version = connection.dialect.server_version_info
+            if connection.dialect.name == "sqlite" and version < SQLITE_MIN_VERSION:
+                raise RuntimeError(
+                    f"Migrating this database needs SQLite {'.'.join(map(str, SQLITE_MIN_VERSION))} or newer, "
+                    f"found {'.'.join(map(str, version))}"
+                )
+            logger.info("Migrating time data to typed dates and minute offsets")
+            for table in DATE_TABLES:
+                _convert_dates(connection, table)
+            for table in legacy:
+                _hours_to_minutes(connection, table)
+        _add_missing_columns(connection)
+        _create_missing_indexes(connection)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate()
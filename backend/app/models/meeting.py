@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Boolean, Column, Date, Integer, String, ForeignKey, false
 from sqlalchemy.orm import relationship
 
+from backend.app.agents.timegrid import to_hours
 from backend.app.database import Base
+from backend.app.models.time_slot import MinuteRange
 
 
 # Base = declarative_base()
@@ -11,30 +13,42 @@ class Meeting(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    date = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
+    date_to = Column(Date, nullable=True)       # Last date of a multi-day search window
     duration = Column(Integer, nullable=False)  # Store duration in hours
     minimum_participants = Column(Integer, default=2)
+    workday_start_minute = Column(Integer, nullable=True)  # Working hours, defaults when null
+    workday_end_minute = Column(Integer, nullable=True)
+    business_days = Column(Boolean, nullable=False, default=False, server_default=false())
     
     participants = relationship("MeetingParticipant", back_populates="meeting")
-    scheduled_slot_id = Column(Integer, ForeignKey("scheduled_slots.id"), nullable=True)
+    scheduled_slot_id = Column(Integer, ForeignKey("scheduled_slots.id"), nullable=True, index=True)
     scheduled_slot = relationship("ScheduledSlot", back_populates="meeting")
 
+    @property
+    def workday_start(self):
+        return None if self.workday_start_minute is None else to_hours(self.workday_start_minute)
+
+    @property
+    def workday_end(self):
+        return None if self.workday_end_minute is None else to_hours(self.workday_end_minute)
+
 class MeetingParticipant(Base):
     __tablename__ = "meeting_participants"
     
     id = Column(Integer, primary_key=True, index=True)
-    meeting_id = Column(Integer, ForeignKey("meetings.id"))
-    participant_id = Column(Integer, ForeignKey("participants.id"))
+    meeting_id = Column(Integer, ForeignKey("meetings.id"), index=True)
+    participant_id = Column(Integer, ForeignKey("participants.id"), index=True)
     
     meeting = relationship("Meeting", back_populates="participants")
     participant = relationship("Participant", back_populates="meetings")
 
-class ScheduledSlot(Base):
+class ScheduledSlot(MinuteRange, Base):
     __tablename__ = "scheduled_slots"
     
     id = Column(Integer, primary_key=True, index=True)
-    date = Column(String, nullable=False)
-    start_time = Column(Integer, nullable=False)
-    end_time = Column(Integer, nullable=False)
+    date = Column(Date, nullable=False)
+    start_minute = Column(Integer, nullable=False)  # Minutes since midnight
+    end_minute = Column(Integer, nullable=False)
     
     meeting = relationship("Meeting", back_populates="scheduled_slot")
\ No newline at end of file
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer
+
+from backend.app.database import Base
+
+
+class ScheduleVersion(Base):
+    __tablename__ = "schedule_versions"
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)  # Bumped whenever the schedule changes
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, JSON, String, Text, text
+
+from backend.app.database import Base
+
+
+class SchedulingRun(Base):
+    __tablename__ = "scheduling_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, nullable=False, default="queued", index=True)  # queued, running, completed, failed
+    progress = Column(Integer, nullable=False, default=0)  # Percent complete
+    port = Column(Integer, nullable=True)
+    requested_meeting_ids = Column(JSON, nullable=True)  # Meetings to schedule, None for all
+    meeting_ids = Column(JSON, nullable=True)  # Meetings claimed by this run, see MeetingClaim
+    timed_out_meeting_ids = Column(JSON, nullable=True)  # Meetings still open at the deadline, queued again
+    retries = Column(Integer, nullable=False, default=0, server_default=text("0"))  # Times these meetings were requeued
+    total_meetings = Column(Integer, nullable=False, default=0)
+    scheduled_meetings = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    load_seconds = Column(Float, nullable=True)
+    schedule_seconds = Column(Float, nullable=True)
+    write_seconds = Column(Float, nullable=True)
+
+
+class MeetingClaim(Base):
+    """A meeting an active run is scheduling; the primary key lets only one run claim it."""
+    __tablename__ = "meeting_claims"
+    
+    meeting_id = Column(Integer, primary_key=True)  # No foreign key, so claimed meetings can still be deleted
+    run_id = Column(Integer, ForeignKey("scheduling_runs.id"), nullable=False, index=True)
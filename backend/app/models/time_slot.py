@@ -1,18 +1,41 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Date, Index, Integer, ForeignKey
 from sqlalchemy.orm import relationship
 
+from backend.app.agents.timegrid import to_hours, to_minutes
 from backend.app.database import Base
 
 
 # Base = declarative_base()
 
-class TimeSlot(Base):
+class MinuteRange:
+    """Exposes minute offset columns as the hour values used by the API and agents."""
+
+    @property
+    def start_time(self):
+        return to_hours(self.start_minute)
+
+    @start_time.setter
+    def start_time(self, hours):
+        self.start_minute = to_minutes(hours)
+
+    @property
+    def end_time(self):
+        return to_hours(self.end_minute)
+
+    @end_time.setter
+    def end_time(self, hours):
+        self.end_minute = to_minutes(hours)
+
+class TimeSlot(MinuteRange, Base):
     __tablename__ = "time_slots"
+    __table_args__ = (
+        Index("ix_time_slots_participant_date_start", "participant_id", "date", "start_minute"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    date = Column(String, nullable=False)
-    start_time = Column(Integer, nullable=False)  # Store as hour (0-23)
-    end_time = Column(Integer, nullable=False)    # Store as hour (0-23)
+    date = Column(Date, nullable=False)
+    start_minute = Column(Integer, nullable=False)  # Minutes since midnight
+    end_minute = Column(Integer, nullable=False)    # Minutes since midnight
     participant_id = Column(Integer, ForeignKey("participants.id"))
     
-    participant = relationship("Participant", back_populates="available_slots")
\ No newline at end of file
+    participant = relationship("Participant", back_populates="available_slots")
@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List
+from typing import List, Optional
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models.meeting import Meeting, MeetingParticipant, ScheduledSlot
-from ..models.participant import Participant
 from ..schemas.meeting import MeetingCreate, Meeting as MeetingSchema
+from ..services.change_events import ChangeEvent, events, MEETING_DELETED, MEETING_UPDATED
+from ..services.meetings import add_meeting_participants, create_meetings, existing_participant_ids, meeting_values
+from ..services.schedule_version import bump_availability_version, bump_schedule_version
 
 router = APIRouter(
     prefix="/meetings",
@@ -14,52 +18,59 @@ router = APIRouter(
     responses={404: {"description": "Meeting not found"}},
 )
 
+def meetings_query():
+    """Select meetings together with the relationships their response includes."""
+    return select(Meeting).options(selectinload(Meeting.participants), selectinload(Meeting.scheduled_slot))
+
+async def get_meeting(db: AsyncSession, meeting_id: int) -> Optional[Meeting]:
+    result = await db.execute(
+        meetings_query()
+        .where(Meeting.id == meeting_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
 @router.post("/", response_model=MeetingSchema)
-def create_meeting(meeting: MeetingCreate, db: Session = Depends(get_db)):
+async def create_meeting(meeting: MeetingCreate, db: AsyncSession = Depends(get_async_db)):
     try:
-        db_meeting = Meeting(
-            name=meeting.name,
-            date=meeting.date,
-            duration=meeting.duration,
-            minimum_participants=meeting.minimum_participants
-        )
-        db.add(db_meeting)
-        db.commit()
-        db.refresh(db_meeting)
-        
-        # Add participants
-        for participant_id in meeting.participant_ids:
-            db_participant = db.query(Participant).filter(Participant.id == participant_id).first()
-            if db_participant:
-                meeting_participant = MeetingParticipant(
-                    meeting_id=db_meeting.id,
-                    participant_id=participant_id
-                )
-                db.add(meeting_participant)
-        
-        db.commit()
-        db.refresh(db_meeting)
-        return db_meeting
+        meetings = await db.run_sync(create_meetings, [meeting])
+        return meetings[0]
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Database error occurred")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/batch", response_model=List[MeetingSchema])
+async def create_meetings_batch(meetings: List[MeetingCreate], db: AsyncSession = Depends(get_async_db)):
+    """
+    Create many meetings in one request and one transaction.
+    Unknown participant ids are skipped, as for single meetings, but an
+    invalid meeting rejects the whole batch. Meetings are returned in
+    request order.
+    """
+    try:
+        return await db.run_sync(create_meetings, meetings)
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/", response_model=List[MeetingSchema])
-def read_meetings(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_meetings(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
     try:
-        meetings = db.query(Meeting).offset(skip).limit(limit).all()
-        return meetings
+        meetings = await db.scalars(meetings_query().order_by(Meeting.id).offset(skip).limit(limit))
+        return meetings.all()
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{meeting_id}", response_model=MeetingSchema)
-def read_meeting(meeting_id: int, db: Session = Depends(get_db)):
+async def read_meeting(meeting_id: int, db: AsyncSession = Depends(get_async_db)):
     try:
-        db_meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
+        db_meeting = await get_meeting(db, meeting_id)
         if db_meeting is None:
             raise HTTPException(status_code=404, detail="Meeting not found")
         return db_meeting
@@ -69,54 +80,78 @@ def read_meeting(meeting_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{meeting_id}", response_model=MeetingSchema)
-def update_meeting(meeting_id: int, meeting: MeetingCreate, db: Session = Depends(get_db)):
+async def update_meeting(meeting_id: int, meeting: MeetingCreate, db: AsyncSession = Depends(get_async_db)):
     try:
-        db_meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
+        db_meeting = await get_meeting(db, meeting_id)
         if db_meeting is None:
             raise HTTPException(status_code=404, detail="Meeting not found")
         
-        db_meeting.name = meeting.name
-        db_meeting.date = meeting.date
-        db_meeting.duration = meeting.duration
-        db_meeting.minimum_participants = meeting.minimum_participants
+        # A scheduled meeting whose constraints change has to be scheduled again;
+        # unknown participant ids are skipped, so they change nothing
+        values = meeting_values(meeting)
+        previous_ids = {mp.participant_id for mp in db_meeting.participants}
+        valid_ids = await db.run_sync(existing_participant_ids, meeting.participant_ids)
+        reschedule = (
+            any(getattr(db_meeting, key) != value for key, value in values.items() if key != "name")
+            or previous_ids != valid_ids
+        )
+        if reschedule and db_meeting.scheduled_slot_id is not None:
+            # Clear the reference before deleting the row it points to
+            scheduled_slot_id = db_meeting.scheduled_slot_id
+            db_meeting.scheduled_slot = None
+            await db.flush()
+            await db.execute(delete(ScheduledSlot).where(ScheduledSlot.id == scheduled_slot_id))
+            await db.run_sync(bump_availability_version)
         
-        # Update participants
-        db.query(MeetingParticipant).filter(MeetingParticipant.meeting_id == meeting_id).delete()
+        for key, value in values.items():
+            setattr(db_meeting, key, value)
         
-        for participant_id in meeting.participant_ids:
-            db_participant = db.query(Participant).filter(Participant.id == participant_id).first()
-            if db_participant:
-                meeting_participant = MeetingParticipant(
-                    meeting_id=db_meeting.id,
-                    participant_id=participant_id
-                )
-                db.add(meeting_participant)
+        # Update participants
+        await db.execute(delete(MeetingParticipant).where(MeetingParticipant.meeting_id == meeting_id))
+        await db.run_sync(add_meeting_participants, {meeting_id: meeting.participant_ids}, valid_ids)
         
-        db.commit()
-        db.refresh(db_meeting)
-        return db_meeting
+        await db.run_sync(bump_schedule_version)
+        await db.commit()
+        if reschedule:
+            events.publish(ChangeEvent(
+                kind=MEETING_UPDATED,
+                meeting_id=meeting_id,
+                participant_ids=list(previous_ids)
+            ))
+        return await get_meeting(db, meeting_id)
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{meeting_id}")
-def delete_meeting(meeting_id: int, db: Session = Depends(get_db)):
+async def delete_meeting(meeting_id: int, db: AsyncSession = Depends(get_async_db)):
     try:
-        db_meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
+        db_meeting = await db.get(Meeting, meeting_id)
         if db_meeting is None:
             raise HTTPException(status_code=404, detail="Meeting not found")
         
         # Delete related meeting participants
-        db.query(MeetingParticipant).filter(MeetingParticipant.meeting_id == meeting_id).delete()
+        participant_ids = list(await db.scalars(
+            select(MeetingParticipant.participant_id).where(MeetingParticipant.meeting_id == meeting_id)
+        ))
+        await db.execute(delete(MeetingParticipant).where(MeetingParticipant.meeting_id == meeting_id))
         
         # Delete the meeting
-        db.delete(db_meeting)
-        db.commit()
+        if db_meeting.scheduled_slot_id is not None:
+            await db.run_sync(bump_availability_version)
+        await db.delete(db_meeting)
+        await db.run_sync(bump_schedule_version)
+        await db.commit()
+        events.publish(ChangeEvent(
+            kind=MEETING_DELETED,
+            meeting_id=meeting_id,
+            participant_ids=participant_ids
+        ))
         return {"detail": "Meeting deleted"}
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
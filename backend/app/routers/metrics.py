@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+
+from ..metrics import CONTENT_TYPE, registry
+
+router = APIRouter(
+    tags=["metrics"],
+)
+
+@router.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Expose scheduler and HTTP metrics in the Prometheus text format."""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -1,13 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List
+from typing import List, Optional
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models.participant import Participant
 from ..models.time_slot import TimeSlot
 from ..schemas.participant import ParticipantCreate, Participant as ParticipantSchema
 from ..schemas.time_slot import TimeSlotCreate, TimeSlot as TimeSlotSchema
+from ..schemas.bulk_import import ImportResult
+from ..agents.participant_agent import TimeSlot as AgentTimeSlot
+from ..services.bulk_import import FORMAT_CSV, FORMAT_NDJSON, import_participants
+from ..services.change_events import (
+    AVAILABILITY_IMPORTED, ChangeEvent, events, PARTICIPANT_CREATED, PARTICIPANT_DELETED,
+    PARTICIPANT_UPDATED, TIMESLOT_CREATED
+)
+from ..services.schedule_version import bump_availability_version, bump_schedule_version
 
 router = APIRouter(
     prefix="/participants",
@@ -15,8 +25,17 @@ router = APIRouter(
     responses={404: {"description": "Participant not found"}},
 )
 
+async def get_participant(db: AsyncSession, participant_id: int) -> Optional[Participant]:
+    """Load a participant together with the slots its response includes."""
+    result = await db.execute(
+        select(Participant)
+        .options(selectinload(Participant.available_slots))
+        .where(Participant.id == participant_id)
+    )
+    return result.scalar_one_or_none()
+
 @router.post("/", response_model=ParticipantSchema)
-def create_participant(participant: ParticipantCreate, db: Session = Depends(get_db)):
+async def create_participant(participant: ParticipantCreate, db: AsyncSession = Depends(get_async_db)):
     try:
         db_participant = Participant(
             name=participant.name,
@@ -24,29 +43,74 @@ def create_participant(participant: ParticipantCreate, db: Session = Depends(get
             is_active=True
         )
         db.add(db_participant)
-        db.commit()
-        db.refresh(db_participant)
-        return db_participant
+        await db.run_sync(bump_schedule_version)
+        await db.commit()
+        events.publish(ChangeEvent(
+            kind=PARTICIPANT_CREATED,
+            participant_id=db_participant.id,
+            participant_name=db_participant.name
+        ))
+        return await get_participant(db, db_participant.id)
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Database error occurred")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/import", response_model=ImportResult)
+async def import_participants_upload(request: Request, format: str = FORMAT_CSV, db: AsyncSession = Depends(get_async_db)):
+    """
+    Bulk import participants and their availability from the request body.
+    The body is CSV with a header row or NDJSON, one row per line with name,
+    email and optionally date, start_time and end_time. It is read as a
+    stream and written in chunks; rows that fail are reported by line. A
+    database error fails every row of the chunk it happened in.
+    """
+    if format not in (FORMAT_CSV, FORMAT_NDJSON):
+        raise HTTPException(status_code=400, detail="Format must be csv or ndjson")
+    try:
+        result, created_participants, updated_participants = await import_participants(
+            db, request.stream(), format
+        )
+        if created_participants:
+            events.publish(ChangeEvent(
+                kind=PARTICIPANT_CREATED,
+                participant_ids=list(created_participants),
+                participant_names=list(created_participants.values())
+            ))
+        if updated_participants:
+            events.publish(ChangeEvent(
+                kind=AVAILABILITY_IMPORTED,
+                participant_ids=list(updated_participants),
+                participant_names=list(updated_participants.values())
+            ))
+        return result
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/", response_model=List[ParticipantSchema])
-def read_participants(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_participants(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
     try:
-        participants = db.query(Participant).offset(skip).limit(limit).all()
-        return participants
+        participants = await db.scalars(
+            select(Participant)
+            .options(selectinload(Participant.available_slots))
+            .order_by(Participant.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return participants.all()
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{participant_id}", response_model=ParticipantSchema)
-def read_participant(participant_id: int, db: Session = Depends(get_db)):
+async def read_participant(participant_id: int, db: AsyncSession = Depends(get_async_db)):
     try:
-        db_participant = db.query(Participant).filter(Participant.id == participant_id).first()
+        db_participant = await get_participant(db, participant_id)
         if db_participant is None:
             raise HTTPException(status_code=404, detail="Participant not found")
         return db_participant
@@ -56,44 +120,59 @@ def read_participant(participant_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{participant_id}", response_model=ParticipantSchema)
-def update_participant(participant_id: int, participant: ParticipantCreate, db: Session = Depends(get_db)):
+async def update_participant(participant_id: int, participant: ParticipantCreate, db: AsyncSession = Depends(get_async_db)):
     try:
-        db_participant = db.query(Participant).filter(Participant.id == participant_id).first()
+        db_participant = await get_participant(db, participant_id)
         if db_participant is None:
             raise HTTPException(status_code=404, detail="Participant not found")
         
+        previous_name = db_participant.name
         db_participant.name = participant.name
         db_participant.email = participant.email
         
-        db.commit()
-        db.refresh(db_participant)
+        await db.run_sync(bump_schedule_version)
+        await db.commit()
+        events.publish(ChangeEvent(
+            kind=PARTICIPANT_UPDATED,
+            participant_id=participant_id,
+            participant_name=previous_name
+        ))
         return db_participant
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{participant_id}")
-def delete_participant(participant_id: int, db: Session = Depends(get_db)):
+async def delete_participant(participant_id: int, db: AsyncSession = Depends(get_async_db)):
     try:
-        db_participant = db.query(Participant).filter(Participant.id == participant_id).first()
+        db_participant = await db.get(Participant, participant_id)
         if db_participant is None:
             raise HTTPException(status_code=404, detail="Participant not found")
         
-        db.delete(db_participant)
-        db.commit()
+        participant_name = db_participant.name
+        # Invitations of the participant are cleared with it, which changes the status
+        await db.delete(db_participant)
+        await db.run_sync(bump_schedule_version)
+        await db.run_sync(bump_availability_version)
+        await db.commit()
+        events.publish(ChangeEvent(
+            kind=PARTICIPANT_DELETED,
+            participant_id=participant_id,
+            participant_name=participant_name
+        ))
         return {"detail": "Participant deleted"}
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/{participant_id}/timeslots", response_model=TimeSlotSchema)
-def create_participant_timeslot(participant_id: int, timeslot: TimeSlotCreate, db: Session = Depends(get_db)):
+async def create_participant_timeslot(participant_id: int, timeslot: TimeSlotCreate, db: AsyncSession = Depends(get_async_db)):
     try:
-        db_participant = db.query(Participant).filter(Participant.id == participant_id).first()
+        db_participant = await db.get(Participant, participant_id)
         if db_participant is None:
             raise HTTPException(status_code=404, detail="Participant not found")
         
@@ -105,19 +184,29 @@ def create_participant_timeslot(participant_id: int, timeslot: TimeSlotCreate, d
         )
         
         db.add(db_timeslot)
-        db.commit()
-        db.refresh(db_timeslot)
+        await db.run_sync(bump_availability_version)
+        await db.commit()
+        events.publish(ChangeEvent(
+            kind=TIMESLOT_CREATED,
+            participant_id=participant_id,
+            participant_name=db_participant.name,
+            time_slot=AgentTimeSlot(
+                date=db_timeslot.date.isoformat(),
+                start_time=db_timeslot.start_time,
+                end_time=db_timeslot.end_time
+            )
+        ))
         return db_timeslot
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{participant_id}/timeslots", response_model=List[TimeSlotSchema])
-def read_participant_timeslots(participant_id: int, db: Session = Depends(get_db)):
+async def read_participant_timeslots(participant_id: int, db: AsyncSession = Depends(get_async_db)):
     try:
-        db_participant = db.query(Participant).filter(Participant.id == participant_id).first()
+        db_participant = await get_participant(db, participant_id)
         if db_participant is None:
             raise HTTPException(status_code=404, detail="Participant not found")
         
@@ -125,4 +214,4 @@ def read_participant_timeslots(participant_id: int, db: Session = Depends(get_db
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,158 +1,176 @@
-from typing import List
+from typing import List, Optional
+import datetime
 
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
-from ..agents.participant_agent import ParticipantAgent, TimeSlot as AgentTimeSlot
-from ..agents.scheduling_playground import SchedulingPlayground, Meeting as AgentMeeting
-from ..database import get_db, SessionLocal
+from ..agents.slot_search import suggest_slots
+from ..agents.timegrid import to_hours, to_minutes
+from ..database import get_async_db
 from ..models.meeting import Meeting, MeetingParticipant, ScheduledSlot
-from ..models.participant import Participant
-from ..schemas.meeting import MeetingScheduleResult
+from ..models.scheduling_run import SchedulingRun
+from ..schemas.meeting import MeetingScheduleResult, ScheduledSlot as ScheduledSlotSchema
+from ..schemas.scheduling_run import SchedulingRun as SchedulingRunSchema
+from ..schemas.slot_suggestion import SlotSuggestion
+from ..services.availability_cache import availability_cache
+from ..services.scheduling_inputs import SCHEDULER_WORKDAY_END, SCHEDULER_WORKDAY_START
+from ..services.schedule_version import current_schedule_version
+from ..services.scheduling_runs import enqueue_run, worker
 
 router = APIRouter(
     prefix="/scheduling",
     tags=["scheduling"],
 )
 
-@router.post("/run", response_model=List[MeetingScheduleResult])
-async def run_scheduling(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+SUGGEST_MAX_DAYS = 92
+
+@router.post("/run", response_model=SchedulingRunSchema, status_code=202)
+async def run_scheduling(db: AsyncSession = Depends(get_async_db)):
     """
-    Run the meeting scheduling process for all unscheduled meetings.
+    Queue a scheduling run for all unscheduled meetings.
     Uses Ceylon's agent-based scheduling to find optimal meeting times.
+    Triggers arriving while a run is still queued return that run.
     """
     try:
-        # Get unscheduled meetings
-        db_meetings = db.query(Meeting).filter(Meeting.scheduled_slot_id == None).all()
-        
-        if not db_meetings:
-            return []
-        
-        # Convert DB meetings to agent meetings
-        agent_meetings = []
-        for db_meeting in db_meetings:
-            agent_meeting = AgentMeeting(
-                name=db_meeting.name,
-                date=db_meeting.date,
-                duration=db_meeting.duration,
-                minimum_participants=db_meeting.minimum_participants
-            )
-            agent_meetings.append(agent_meeting)
-        
-        # Get all participants and their available slots
-        participants = []
-        for db_participant in db.query(Participant).filter(Participant.is_active == True).all():
-            available_slots = []
-            for slot in db_participant.available_slots:
-                agent_slot = AgentTimeSlot(
-                    date=slot.date,
-                    start_time=slot.start_time,
-                    end_time=slot.end_time
-                )
-                available_slots.append(agent_slot)
-            
-            participant_agent = ParticipantAgent(
-                name=db_participant.name,
-                available_slots=available_slots
-            )
-            participants.append(participant_agent)
-        
-        # Create playground
-        playground = SchedulingPlayground(port=8455)
-        
-        # Run scheduling
-        background_tasks.add_task(
-            process_scheduling_results,
-            playground, 
-            agent_meetings, 
-            participants, 
-            db_meetings
-        )
-        
-        return [
-            MeetingScheduleResult(
-                meeting_id=meeting.id,
-                name=meeting.name,
-                scheduled=False,
-                error="Scheduling in progress"
-            )
-            for meeting in db_meetings
-        ]
+        run = await db.run_sync(enqueue_run)
+        worker.notify()
+        return run
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Database error occurred")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/runs", response_model=List[SchedulingRunSchema])
+async def read_scheduling_runs(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    try:
+        runs = await db.scalars(select(SchedulingRun).order_by(SchedulingRun.id.desc()).offset(skip).limit(limit))
+        return runs.all()
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail="Database error occurred")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/runs/{run_id}", response_model=SchedulingRunSchema)
+async def read_scheduling_run(run_id: int, db: AsyncSession = Depends(get_async_db)):
+    try:
+        run = await db.get(SchedulingRun, run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail="Scheduling run not found")
+        return run
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/status", response_model=List[MeetingScheduleResult])
-def get_scheduling_status(db: Session = Depends(get_db)):
-    """Get the current status of all meetings."""
+async def get_scheduling_status(request: Request, response: Response, after_id: int = 0,
+                                limit: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get the current status of meetings, ordered by id.
+    Pass the last meeting id seen as ``after_id`` to page through with ``limit``.
+    Responses carry an ETag tied to the schedule version, so polls with
+    ``If-None-Match`` get 304 until the schedule changes.
+    """
     try:
-        results = []
-        
-        for meeting in db.query(Meeting).all():
-            result = MeetingScheduleResult(
-                meeting_id=meeting.id,
-                name=meeting.name,
-                scheduled=meeting.scheduled_slot_id is not None
+        version = await db.run_sync(current_schedule_version)
+        etag = f'W/"{version}-{after_id}-{limit}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+
+        page = select(Meeting.id).where(Meeting.id > after_id).order_by(Meeting.id)
+        if limit is not None:
+            page = page.limit(limit)
+        page = page.subquery()
+
+        # One query for the page: meetings, their slot, and invitees of scheduled meetings
+        rows = await db.execute(
+            select(
+                Meeting.id, Meeting.name,
+                ScheduledSlot.id, ScheduledSlot.date, ScheduledSlot.start_minute, ScheduledSlot.end_minute,
+                MeetingParticipant.participant_id
             )
-            
-            if meeting.scheduled_slot:
-                result.time_slot = meeting.scheduled_slot
-                
-                # Get participant IDs
-                participant_ids = [
-                    mp.participant_id 
-                    for mp in db.query(MeetingParticipant)
-                    .filter(MeetingParticipant.meeting_id == meeting.id)
-                    .all()
-                ]
-                result.participants = participant_ids
-            
-            results.append(result)
-        
+            .select_from(Meeting)
+            .join(page, page.c.id == Meeting.id)
+            .outerjoin(ScheduledSlot, ScheduledSlot.id == Meeting.scheduled_slot_id)
+            .outerjoin(MeetingParticipant, and_(
+                MeetingParticipant.meeting_id == Meeting.id,
+                Meeting.scheduled_slot_id != None
+            ))
+            .order_by(Meeting.id, MeetingParticipant.id)
+        )
+
+        results = []
+        for meeting_id, name, slot_id, date, start_minute, end_minute, participant_id in rows:
+            if not results or results[-1].meeting_id != meeting_id:
+                result = MeetingScheduleResult(
+                    meeting_id=meeting_id,
+                    name=name,
+                    scheduled=slot_id is not None
+                )
+                if slot_id is not None:
+                    result.time_slot = ScheduledSlotSchema(
+                        id=slot_id, date=date, start_time=to_hours(start_minute), end_time=to_hours(end_minute)
+                    )
+                results.append(result)
+            if participant_id is not None:
+                results[-1].participants.append(participant_id)
+
+        response.headers["ETag"] = etag
         return results
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-async def process_scheduling_results(
-    playground: SchedulingPlayground,
-    agent_meetings: List[AgentMeeting],
-    participants: List[ParticipantAgent],
-    db_meetings: List[Meeting]
-):
-    """Process the results of the scheduling and update the database."""
-    # Run scheduling
-    results = await playground.schedule_meetings(agent_meetings, participants)
+@router.get("/suggest", response_model=List[SlotSuggestion])
+async def suggest_meeting_slots(participant_ids: List[int] = Query(...), duration: float = Query(..., gt=0, le=24),
+                                date_from: datetime.date = Query(...), date_to: Optional[datetime.date] = None,
+                                k: int = Query(5, ge=1, le=50),
+                                workday_start: float = Query(SCHEDULER_WORKDAY_START, ge=0, le=24),
+                                workday_end: float = Query(SCHEDULER_WORKDAY_END, ge=0, le=24),
+                                db: AsyncSession = Depends(get_async_db)):
+    """
+    Suggest up to k slots for the participants to meet, most attendees first.
+    Duration is in hours and the search covers date_from to date_to (one day
+    by default), within the working hours the scheduler uses unless
+    workday_start and workday_end are given. Free time minus scheduled
+    meetings comes from an in-memory LRU cache, so no meeting is created and
+    no agents are involved.
+    """
+    date_to = date_to or date_from
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to must not be before date_from")
+    if workday_end <= workday_start:
+        raise HTTPException(status_code=400, detail="workday_end must be after workday_start")
+    days = (date_to - date_from).days + 1
+    if days > SUGGEST_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {SUGGEST_MAX_DAYS} days")
     
-    # Update database with results
-    db = SessionLocal()
     try:
-        for i, (meeting_id, result) in enumerate(results.items()):
-            db_meeting = db_meetings[i]
-            
-            if result.scheduled and result.time_slot:
-                try:
-                    # Create scheduled slot
-                    db_slot = ScheduledSlot(
-                        date=result.time_slot.date,
-                        start_time=result.time_slot.start_time,
-                        end_time=result.time_slot.end_time
-                    )
-                    db.add(db_slot)
-                    db.commit()
-                    db.refresh(db_slot)
-                    
-                    # Update meeting with scheduled slot
-                    db_meeting.scheduled_slot_id = db_slot.id
-                    db.commit()
-                except SQLAlchemyError as e:
-                    db.rollback()
-                    raise HTTPException(status_code=500, detail="Database error occurred")
-                except Exception as e:
-                    db.rollback()
-                    raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
\ No newline at end of file
+        participant_ids = list(dict.fromkeys(participant_ids))
+        free_time = await db.run_sync(availability_cache.get_many, participant_ids)
+        missing = [participant_id for participant_id in participant_ids if participant_id not in free_time]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Participants not found: {missing}")
+        
+        dates = [(date_from + datetime.timedelta(days=day)).isoformat() for day in range(days)]
+        return [
+            SlotSuggestion(
+                date=candidate.date,
+                start_time=to_hours(candidate.start),
+                end_time=to_hours(candidate.end),
+                attendee_count=candidate.attendee_count,
+                participants=candidate.attendees
+            )
+            for candidate in suggest_slots(free_time, dates, to_minutes(duration), k,
+                                           window=(to_minutes(workday_start), to_minutes(workday_end)))
+        ]
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail="Database error occurred")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
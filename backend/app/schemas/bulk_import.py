@@ -0,0 +1,42 @@
+from pydantic import BaseModel, EmailStr, validator
+from typing import List, Optional
+import datetime
+
+from ..agents.wire import check_date
+
+class ImportRow(BaseModel):
+    name: str
+    email: EmailStr
+    date: Optional[datetime.date] = None
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+
+    @validator("date")
+    def date_in_range(cls, date):
+        return date if date is None else check_date(date)
+
+    @validator("end_time", always=True)
+    def check_slot(cls, end_time, values):
+        slot = (values.get("date"), values.get("start_time"), end_time)
+        if all(value is None for value in slot):
+            return end_time
+        if any(value is None for value in slot):
+            raise ValueError("date, start_time and end_time must be given together")
+        if not 0 <= values["start_time"] < end_time <= 24:
+            raise ValueError("expected 0 <= start_time < end_time <= 24")
+        return end_time
+
+    @property
+    def has_slot(self) -> bool:
+        return self.date is not None
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class ImportResult(BaseModel):
+    rows: int = 0
+    imported_rows: int = 0
+    participants_created: int = 0
+    time_slots_created: int = 0
+    errors: List[ImportRowError] = []
@@ -1,10 +1,14 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 from typing import List, Optional
+import datetime
+
+from ..agents.timegrid import SLOT_MINUTES, to_minutes
+from ..agents.wire import check_date
 
 class ScheduledSlotBase(BaseModel):
-    date: str
-    start_time: int
-    end_time: int
+    date: datetime.date
+    start_time: float  # Hours, e.g. 9.5 for 09:30
+    end_time: float
 
 class ScheduledSlotCreate(ScheduledSlotBase):
     pass
@@ -17,9 +21,38 @@ class ScheduledSlot(ScheduledSlotBase):
 
 class MeetingBase(BaseModel):
     name: str
-    date: str
+    date: datetime.date
+    date_to: Optional[datetime.date] = None  # Search through this date, e.g. the next 10 business days
     duration: int
     minimum_participants: int = 2
+    workday_start: Optional[float] = None  # Working hours in hours, server defaults when omitted
+    workday_end: Optional[float] = None
+    business_days: bool = False
+    
+    @validator("date", "date_to")
+    def date_in_range(cls, date):
+        return date if date is None else check_date(date)
+    
+    @validator("date_to")
+    def date_to_not_before_date(cls, date_to, values):
+        if date_to is not None and "date" in values and date_to < values["date"]:
+            raise ValueError("date_to must not be before date")
+        return date_to
+    
+    @validator("workday_start", "workday_end")
+    def within_day(cls, hours):
+        if hours is not None and not 0 <= hours <= 24:
+            raise ValueError("Working hours must be between 0 and 24")
+        if hours is not None and to_minutes(hours) % SLOT_MINUTES:
+            raise ValueError(f"Working hours must fall on the {SLOT_MINUTES} minute grid")
+        return hours
+    
+    @validator("workday_end")
+    def end_after_start(cls, workday_end, values):
+        workday_start = values.get("workday_start")
+        if workday_end is not None and workday_start is not None and workday_end <= workday_start:
+            raise ValueError("workday_end must be after workday_start")
+        return workday_end
 
 class MeetingCreate(MeetingBase):
     participant_ids: List[int] = []
@@ -29,6 +62,11 @@ class Meeting(MeetingBase):
     participants: List[int] = []
     scheduled_slot: Optional[ScheduledSlot] = None
     
+    @validator("participants", pre=True)
+    def participant_ids(cls, participants):
+        # ORM meetings hold MeetingParticipant rows, the API exposes their ids
+        return [getattr(participant, "participant_id", participant) for participant in participants]
+    
     class Config:
         orm_mode = True
 
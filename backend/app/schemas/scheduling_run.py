@@ -0,0 +1,25 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import List, Optional
+
+class SchedulingRun(BaseModel):
+    id: int
+    status: str
+    progress: int
+    port: Optional[int] = None
+    requested_meeting_ids: Optional[List[int]] = None
+    meeting_ids: Optional[List[int]] = None
+    timed_out_meeting_ids: Optional[List[int]] = None
+    retries: int = 0
+    total_meetings: int
+    scheduled_meetings: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    load_seconds: Optional[float] = None
+    schedule_seconds: Optional[float] = None
+    write_seconds: Optional[float] = None
+    
+    class Config:
+        orm_mode = True
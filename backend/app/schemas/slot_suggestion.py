@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import List
+import datetime
+
+class SlotSuggestion(BaseModel):
+    date: datetime.date
+    start_time: float  # Hours, e.g. 9.5 for 09:30
+    end_time: float
+    attendee_count: int
+    participants: List[int] = []
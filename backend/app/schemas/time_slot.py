@@ -1,13 +1,33 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 from typing import Optional
+import datetime
+
+from ..agents.wire import check_date
 
 class TimeSlotBase(BaseModel):
-    date: str
-    start_time: int
-    end_time: int
+    date: datetime.date
+    start_time: float  # Hours, e.g. 9.5 for 09:30
+    end_time: float
 
 class TimeSlotCreate(TimeSlotBase):
     participant_id: int
+    
+    @validator("date")
+    def date_in_range(cls, date):
+        return check_date(date)
+    
+    @validator("start_time", "end_time")
+    def within_day(cls, hours):
+        if not 0 <= hours <= 24:
+            raise ValueError("Times must be between 0 and 24")
+        return hours
+    
+    @validator("end_time")
+    def end_after_start(cls, end_time, values):
+        start_time = values.get("start_time")
+        if start_time is not None and end_time <= start_time:
+            raise ValueError("end_time must be after start_time")
+        return end_time
 
 class TimeSlot(TimeSlotBase):
     id: int
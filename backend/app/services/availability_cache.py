@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+import os
+
+from sqlalchemy.orm import Session
+
+from ..agents.interval_index import IntervalIndex
+from .change_events import (
+    AVAILABILITY_IMPORTED, ChangeEvent, MEETING_DELETED, MEETING_UPDATED, PARTICIPANT_DELETED,
+    PARTICIPANT_UPDATED, TIMESLOT_CREATED
+)
+from .schedule_version import current_availability_version
+from .scheduling_inputs import load_snapshot
+
+SUGGEST_CACHE_SIZE = int(os.getenv("SUGGEST_CACHE_SIZE", "10000"))
+
+
+def load_free_time(db: Session, participant_ids: Iterable[int]) -> Dict[int, IntervalIndex]:
+    """
+    Load the free time of active participants minus their scheduled meetings.
+
+    Participants that do not exist or are inactive are left out.
+    """
+    snapshot = load_snapshot(db, participant_ids)
+    return {
+        participant_id: snapshot.interval_index(i)
+        for i, participant_id in enumerate(snapshot.participant_ids)
+    }
+
+
+class AvailabilityCache:
+    """
+    LRU cache of participants' bookable time for slot suggestions.
+
+    Entries are dropped when a participant's time slots change, and when a
+    meeting they are invited to is booked, moved or deleted. Creating a
+    meeting books no time, so it leaves the cache alone.
+
+    Change events only reach the process that made the change. Every such
+    change also bumps the availability version in the database, and the
+    whole cache is cleared when a lookup finds it moved, so other worker
+    processes do not keep serving stale free time.
+    """
+
+    def __init__(self, maxsize: int = SUGGEST_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.availability_version = None
+        self._entries: "OrderedDict[int, IntervalIndex]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, db: Session, participant_ids: List[int]) -> Dict[int, IntervalIndex]:
+        """Return cached free time for the participants, loading the missing ones in one pass."""
+        availability_version = current_availability_version(db)
+        if availability_version != self.availability_version:
+            self.clear()
+            self.availability_version = availability_version
+
+        found, missing = {}, []
+        for participant_id in participant_ids:
+            index = self._entries.get(participant_id)
+            if index is None:
+                missing.append(participant_id)
+            else:
+                self._entries.move_to_end(participant_id)
+                found[participant_id] = index
+        self.hits += len(found)
+        self.misses += len(missing)
+
+        if missing:
+            loaded = load_free_time(db, missing)
+            for participant_id, index in loaded.items():
+                self._entries[participant_id] = index
+            found.update(loaded)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return found
+
+    def invalidate(self, participant_ids: Iterable[int]):
+        for participant_id in participant_ids:
+            self._entries.pop(participant_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def handle_change(self, event: ChangeEvent):
+        """Drop the participants whose availability an event changed."""
+        if event.kind in (TIMESLOT_CREATED, PARTICIPANT_UPDATED, PARTICIPANT_DELETED):
+            self.invalidate([event.participant_id])
+        elif event.kind in (AVAILABILITY_IMPORTED, MEETING_UPDATED, MEETING_DELETED):
+            self.invalidate(event.participant_ids)
+
+
+availability_cache = AvailabilityCache()
@@ -0,0 +1,200 @@
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import codecs
+import csv
+import json
+import logging
+import os
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..agents.timegrid import to_minutes
+from ..models.participant import Participant
+from ..models.time_slot import TimeSlot
+from ..schemas.bulk_import import ImportResult, ImportRow, ImportRowError
+from .schedule_version import bump_availability_version, bump_schedule_version
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+
+logger = logging.getLogger("ceylon")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode an upload stream into lines without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def _csv_record(line: str, header: List[str]) -> dict:
+    values = next(csv.reader([line]))
+    if len(values) > len(header):
+        raise ValueError(f"Expected at most {len(header)} columns, got {len(values)}")
+    return {key: value for key, value in zip(header, values) if value != ""}
+
+
+def _ndjson_record(line: str) -> dict:
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("Each line must be a JSON object")
+    return record
+
+
+async def iter_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Yield ``(line, record, error)`` for each non-empty line of the upload.
+
+    CSV uploads start with a header row naming the columns; quoted fields
+    may not span lines.
+    """
+    header = None
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        if fmt == FORMAT_CSV and header is None:
+            header = [column.strip() for column in next(csv.reader([line]))]
+            continue
+        try:
+            record = _csv_record(line, header) if fmt == FORMAT_CSV else _ndjson_record(line)
+        except (ValueError, csv.Error) as e:
+            yield line_number, None, str(e)
+            continue
+        yield line_number, record, None
+
+
+def _validate(records: List[Tuple[int, dict]], errors: List[ImportRowError]) -> List[Tuple[int, ImportRow]]:
+    rows = []
+    for line_number, record in records:
+        try:
+            row = ImportRow(**record)
+        except ValidationError as e:
+            errors.append(ImportRowError(line=line_number, error="; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            )))
+            continue
+        rows.append((line_number, row))
+    return rows
+
+
+def import_chunk(db: Session, records: List[Tuple[int, dict]], result: ImportResult,
+                 created_participants: Dict[int, str], updated_participants: Dict[int, str]):
+    """
+    Validate and insert one chunk of records in a single transaction.
+
+    Participants are matched by email. Unknown emails are inserted with one
+    executemany, then all time slots of the chunk with another. Rows that
+    fail validation are reported and skipped. A database error rolls back
+    the whole chunk and reports every valid row in it as failed, including
+    rows that were not at fault; chunks committed before stay imported.
+    """
+    errors: List[ImportRowError] = []
+    rows = _validate(records, errors)
+    result.errors.extend(errors)
+    if not rows:
+        return
+
+    try:
+        emails = {row.email for _, row in rows}
+        participant_ids, existing = {}, {}
+        for participant_id, email, name in (
+            db.query(Participant.id, Participant.email, Participant.name)
+            .filter(Participant.email.in_(emails))
+        ):
+            participant_ids[email] = participant_id
+            existing[participant_id] = name
+
+        new_participants, created = {}, []
+        for _, row in rows:
+            if row.email not in participant_ids and row.email not in new_participants:
+                new_participants[row.email] = {"name": row.name, "email": row.email, "is_active": True}
+        if new_participants:
+            created = db.scalars(
+                insert(Participant).returning(Participant.id, sort_by_parameter_order=True),
+                list(new_participants.values())
+            ).all()
+            participant_ids.update(zip(new_participants, created))
+            bump_schedule_version(db)
+
+        slots = [
+            {
+                "participant_id": participant_ids[row.email],
+                "date": row.date,
+                "start_minute": to_minutes(row.start_time),
+                "end_minute": to_minutes(row.end_time)
+            }
+            for _, row in rows
+            if row.has_slot
+        ]
+        if slots:
+            db.execute(insert(TimeSlot), slots)
+            bump_availability_version(db)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Bulk import chunk failed: {e}")
+        result.errors.extend(
+            ImportRowError(line=line_number, error="Database error occurred")
+            for line_number, _ in rows
+        )
+        return
+
+    result.imported_rows += len(rows)
+    result.participants_created += len(new_participants)
+    result.time_slots_created += len(slots)
+    for participant, participant_id in zip(new_participants.values(), created):
+        created_participants[participant_id] = participant["name"]
+    # Existing participants with new slots may have meetings waiting on them
+    with_slots = {slot["participant_id"] for slot in slots}
+    for participant_id, name in existing.items():
+        if participant_id in with_slots:
+            updated_participants[participant_id] = name
+
+
+async def import_participants(db: AsyncSession, chunks: AsyncIterator[bytes], fmt: str,
+                              chunk_size: int = IMPORT_CHUNK_SIZE
+                              ) -> Tuple[ImportResult, Dict[int, str], Dict[int, str]]:
+    """
+    Stream participants and their availability into the database.
+
+    Returns the import summary, the participants it created and the existing
+    participants that received new time slots, both keyed by id, so callers
+    can announce the changes.
+
+    Lines are parsed on the event loop as they arrive, and each chunk is
+    validated and written in one ``run_sync`` call. ``run_sync`` runs on the
+    loop's thread too, so other requests wait while a chunk is processed;
+    ``chunk_size`` bounds how long, not the memory of the whole upload.
+    """
+    result = ImportResult()
+    created_participants: Dict[int, str] = {}
+    updated_participants: Dict[int, str] = {}
+    pending: List[Tuple[int, dict]] = []
+    async for line_number, record, error in iter_records(iter_lines(chunks), fmt):
+        result.rows += 1
+        if error is not None:
+            result.errors.append(ImportRowError(line=line_number, error=error))
+            continue
+        pending.append((line_number, record))
+        if len(pending) >= chunk_size:
+            await db.run_sync(import_chunk, pending, result, created_participants, updated_participants)
+            pending = []
+    if pending:
+        await db.run_sync(import_chunk, pending, result, created_participants, updated_participants)
+    result.errors.sort(key=lambda error: error.line)
+    return result, created_participants, updated_participants
@@ -0,0 +1,74 @@
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+import asyncio
+import logging
+
+from ..agents.participant_agent import TimeSlot as AgentTimeSlot
+
+TIMESLOT_CREATED = "timeslot_created"
+AVAILABILITY_IMPORTED = "availability_imported"
+PARTICIPANT_CREATED = "participant_created"
+PARTICIPANT_UPDATED = "participant_updated"
+PARTICIPANT_DELETED = "participant_deleted"
+MEETING_UPDATED = "meeting_updated"
+MEETING_DELETED = "meeting_deleted"
+
+logger = logging.getLogger("ceylon")
+
+
+@dataclass
+class ChangeEvent:
+    kind: str
+    participant_id: Optional[int] = None
+    participant_name: Optional[str] = None
+    meeting_id: Optional[int] = None
+    time_slot: Optional[AgentTimeSlot] = None
+    participant_ids: List[int] = field(default_factory=list)      # Bulk changes, or a meeting's invitees
+    participant_names: List[str] = field(default_factory=list)
+
+
+class ChangeEventBus:
+    """
+    Delivers data change events from the routers to scheduler components.
+
+    Sync routers run in a threadpool, so once bound to the app's event loop
+    handlers are always invoked on that loop.
+    """
+
+    def __init__(self):
+        self._handlers: List[Callable[[ChangeEvent], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, loop: Optional[asyncio.AbstractEventLoop]):
+        self._loop = loop
+
+    def subscribe(self, handler: Callable[[ChangeEvent], None]):
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+
+    def unsubscribe(self, handler: Callable[[ChangeEvent], None]):
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    def publish(self, event: ChangeEvent):
+        for handler in self._handlers:
+            if self._loop is None or self._in_loop():
+                self._dispatch(handler, event)
+            else:
+                self._loop.call_soon_threadsafe(self._dispatch, handler, event)
+
+    def _in_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    @staticmethod
+    def _dispatch(handler: Callable[[ChangeEvent], None], event: ChangeEvent):
+        try:
+            handler(event)
+        except Exception as e:
+            logger.error(f"Error handling {event.kind} event: {e}")
+
+
+events = ChangeEventBus()
@@ -0,0 +1,83 @@
+from typing import Dict, Iterable, List, Set
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, selectinload
+
+from ..agents.timegrid import to_minutes
+from ..models.meeting import Meeting, MeetingParticipant
+from ..models.participant import Participant
+from ..schemas.meeting import MeetingCreate
+from .schedule_version import bump_schedule_version
+
+
+def meeting_values(meeting: MeetingCreate) -> dict:
+    """Return the column values of a meeting, with working hours in minutes."""
+    return {
+        "name": meeting.name,
+        "date": meeting.date,
+        "date_to": meeting.date_to,
+        "duration": meeting.duration,
+        "minimum_participants": meeting.minimum_participants,
+        "workday_start_minute": None if meeting.workday_start is None else to_minutes(meeting.workday_start),
+        "workday_end_minute": None if meeting.workday_end is None else to_minutes(meeting.workday_end),
+        "business_days": meeting.business_days
+    }
+
+
+def existing_participant_ids(db: Session, participant_ids: Iterable[int]) -> Set[int]:
+    """Return the ids that belong to a participant, checked with a single IN query."""
+    participant_ids = set(participant_ids)
+    if not participant_ids:
+        return set()
+    return {
+        participant_id
+        for participant_id, in db.query(Participant.id).filter(Participant.id.in_(participant_ids))
+    }
+
+
+def add_meeting_participants(db: Session, invitees: Dict[int, List[int]], valid_ids: Set[int]):
+    """Insert the invitee rows of many meetings with one executemany, skipping unknown participants."""
+    rows = [
+        {"meeting_id": meeting_id, "participant_id": participant_id}
+        for meeting_id, participant_ids in invitees.items()
+        for participant_id in dict.fromkeys(participant_ids)
+        if participant_id in valid_ids
+    ]
+    if rows:
+        db.execute(insert(MeetingParticipant), rows)
+
+
+def create_meetings(db: Session, meetings: List[MeetingCreate]) -> List[Meeting]:
+    """
+    Create meetings and their invitees in one transaction.
+
+    Participant ids of the whole batch are validated together. Meetings are
+    inserted as one batch returning their ids in order (SQLAlchemy falls back
+    to one statement per row where the database cannot guarantee that order,
+    as on SQLite), and all invitee rows with a single executemany.
+    """
+    if not meetings:
+        return []
+
+    valid_ids = existing_participant_ids(
+        db, (participant_id for meeting in meetings for participant_id in meeting.participant_ids)
+    )
+    meeting_ids = db.scalars(
+        insert(Meeting).returning(Meeting.id, sort_by_parameter_order=True),
+        [meeting_values(meeting) for meeting in meetings]
+    ).all()
+    add_meeting_participants(
+        db,
+        {meeting_id: meeting.participant_ids for meeting_id, meeting in zip(meeting_ids, meetings)},
+        valid_ids
+    )
+    bump_schedule_version(db)
+    db.commit()
+
+    created = {
+        db_meeting.id: db_meeting
+        for db_meeting in db.query(Meeting)
+        .options(selectinload(Meeting.participants), selectinload(Meeting.scheduled_slot))
+        .filter(Meeting.id.in_(meeting_ids))
+    }
+    return [created[meeting_id] for meeting_id in meeting_ids]
@@ -0,0 +1,253 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import logging
+import os
+import socket
+
+from ..agents.local_transport import TRANSPORT_CEYLON
+from ..agents.participant_agent import ParticipantAgent, TimeSlot as AgentTimeSlot
+from ..agents.scheduling_playground import (
+    SchedulingPlayground, Meeting as AgentMeeting, MeetingOutput, PlaygroundStopped
+)
+from ..agents.snapshot import AvailabilitySnapshot
+from ..database import SessionLocal
+from .change_events import (
+    ChangeEvent, events, AVAILABILITY_IMPORTED, MEETING_DELETED, MEETING_UPDATED, PARTICIPANT_CREATED,
+    TIMESLOT_CREATED
+)
+from .schedule_version import current_availability_version
+from .scheduling_inputs import (
+    agent_name, load_bookings, load_snapshot, SCHEDULER_MEETING_TIMEOUT, SCHEDULER_RESPONSE_TIMEOUT,
+    SCHEDULER_SOLVER_MODE, SCHEDULER_TRANSPORT
+)
+
+SCHEDULER_RESIDENT = os.getenv("SCHEDULER_RESIDENT", "1") == "1"
+SCHEDULER_RESIDENT_PORT = int(os.getenv("SCHEDULER_RESIDENT_PORT", "8454"))
+
+logger = logging.getLogger("ceylon")
+
+
+def port_is_free(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind(("0.0.0.0", port))
+        except OSError:
+            return False
+    return True
+
+
+def load_availability_version() -> int:
+    db = SessionLocal()
+    try:
+        return current_availability_version(db)
+    finally:
+        db.close()
+
+
+def load_participants(participant_ids: Optional[Iterable[int]] = None
+                      ) -> Tuple[AvailabilitySnapshot, Dict[int, Dict[str, AgentTimeSlot]], int]:
+    """
+    Load the free time and booked meetings of active participants (all if no ids given).
+
+    Bookings are kept apart from the free time, so agents can free the
+    time of a meeting again when it is changed or deleted. The availability
+    version is read first, so the data is at least as new as the version.
+    """
+    db = SessionLocal()
+    try:
+        version = current_availability_version(db)
+        return (
+            load_snapshot(db, participant_ids, subtract_bookings=False),
+            load_bookings(db, participant_ids),
+            version
+        )
+    finally:
+        db.close()
+
+
+class ResidentScheduler:
+    """
+    A playground started once with an agent per active participant.
+
+    Runs submit meeting batches to it instead of building a playground and
+    agents each time. Agents start with the meetings already booked in the
+    database. Change events keep their availability current, so a run does
+    not need to reload anyone's slots: new slots are added in place, and
+    changed, new or removed participants are reloaded in the background.
+    Over Ceylon, agents cannot join a running playground, so adding one
+    restarts it; runs fall back to their own playground meanwhile.
+
+    Events only come from this process. Before each batch the availability
+    version is compared with the one each invitee's agent was loaded at,
+    and invitees changed since, by any process, are reloaded. Over Ceylon
+    only one process can listen on the resident port; in the others the
+    resident playground does not start and runs use their own playgrounds.
+    """
+
+    def __init__(self, enabled: bool = SCHEDULER_RESIDENT, port: int = SCHEDULER_RESIDENT_PORT,
+                 transport: str = SCHEDULER_TRANSPORT):
+        self.enabled = enabled
+        self.port = port
+        self.transport = transport
+        self.playground: Optional[SchedulingPlayground] = None
+        self._stale: Set[int] = set()  # Participant ids whose agents need reloading
+        self._loaded: Dict[int, int] = {}  # Availability version each participant's agent was loaded at
+        self._sync_task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self.playground is not None
+
+    async def start(self):
+        if not self.enabled:
+            return
+        # Subscribed even without a playground, so the first participants start one
+        events.subscribe(self.handle_change)
+        await self._start_playground()
+
+    async def _start_playground(self):
+        if self.transport == TRANSPORT_CEYLON and not port_is_free(self.port):
+            logger.warning(f"Resident playground port {self.port} is in use, probably by another worker "
+                           f"process; runs use their own playgrounds")
+            return
+        snapshot, bookings, version = await asyncio.to_thread(load_participants)
+        if not len(snapshot):
+            logger.info("No active participants, resident playground not started")
+            return
+
+        agents = snapshot.build_agents()
+        for agent in agents:
+            agent.set_bookings(bookings.get(agent.participant_id, {}))
+        playground = SchedulingPlayground(
+            name="resident_scheduler", port=self.port, solver_mode=SCHEDULER_SOLVER_MODE, transport=self.transport,
+            response_timeout=SCHEDULER_RESPONSE_TIMEOUT, meeting_timeout=SCHEDULER_MEETING_TIMEOUT
+        )
+        try:
+            await playground.start_resident(agents)
+        except Exception as e:
+            logger.error(f"Could not start resident playground: {e}")
+            await playground.stop_resident()
+            return
+
+        self.playground = playground
+        self._loaded = dict.fromkeys(snapshot.participant_ids, version)
+        where = f"on port {self.port}" if self.transport == TRANSPORT_CEYLON else "in process"
+        logger.info(f"Resident playground running with {len(snapshot)} agents {where}")
+
+    async def stop(self):
+        events.unsubscribe(self.handle_change)
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            await asyncio.gather(self._sync_task, return_exceptions=True)
+            self._sync_task = None
+        self._stale = set()
+        self._loaded = {}
+        if self.playground is not None:
+            await self.playground.stop_resident()
+            self.playground = None
+
+    def covers(self, names: Iterable[str]) -> bool:
+        return self.running and self.playground.covers(names)
+
+    def handle_change(self, event: ChangeEvent):
+        """Apply a data change to the resident agents' cached availability."""
+        if event.kind in (MEETING_UPDATED, MEETING_DELETED):
+            if self.playground is not None:
+                self.playground.release_meeting(str(event.meeting_id))
+        elif event.kind == TIMESLOT_CREATED and self.playground is not None and (
+            self.playground.add_available_slot(agent_name(event.participant_id), event.time_slot)
+        ):
+            return
+        elif event.kind in (AVAILABILITY_IMPORTED, PARTICIPANT_CREATED) and event.participant_ids:
+            # Bulk imports announce their participants together
+            self.refresh(event.participant_ids)
+        elif event.participant_id is not None:
+            # Created, updated, deleted, or a new slot for a participant without an agent
+            self.refresh([event.participant_id])
+
+    def refresh(self, participant_ids: Iterable[int]):
+        """Reload the agents of the given participants in the background."""
+        self._stale.update(participant_ids)
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self._sync())
+
+    async def _sync(self):
+        while self._stale:
+            participant_ids, self._stale = self._stale, set()
+            try:
+                if self.playground is None:
+                    await self._start_playground()
+                    continue
+                snapshot, bookings, version = await asyncio.to_thread(load_participants, participant_ids)
+                if not self._apply(participant_ids, snapshot, bookings, version):
+                    # Ceylon cannot connect agents to a running playground
+                    logger.info("Restarting resident playground to add participants")
+                    playground, self.playground = self.playground, None
+                    await playground.stop_resident()
+                    await self._start_playground()
+            except Exception as e:
+                logger.error(f"Could not refresh resident agents: {e}")
+
+    def _apply(self, participant_ids: Set[int], snapshot: AvailabilitySnapshot,
+               bookings: Dict[int, Dict[str, AgentTimeSlot]], version: int) -> bool:
+        """Update, add or drop resident agents; False if an agent could not be added."""
+        playground = self.playground
+        names = {agent.participant_id: name for name, agent in playground.resident_agents.items()}
+        for i, participant_id in enumerate(snapshot.participant_ids):
+            name = snapshot.names[i]
+            if names.pop(participant_id, None) is not None:
+                playground.update_participant(name, snapshot.interval_index(i), bookings.get(participant_id, {}))
+                continue
+            agent = ParticipantAgent(name=name, free_time=snapshot.interval_index(i), participant_id=participant_id)
+            agent.set_bookings(bookings.get(participant_id, {}))
+            if not playground.add_participant(agent):
+                return False
+
+        # Deleted or deactivated participants
+        for participant_id in participant_ids:
+            if participant_id in names:
+                playground.remove_participant(names[participant_id])
+        self._loaded.update(dict.fromkeys(participant_ids, version))
+        return True
+
+    def record_results(self, results: Dict[str, MeetingOutput]):
+        """Book meetings scheduled without the resident playground on its agents."""
+        if self.playground is None:
+            return
+        for meeting_id, result in results.items():
+            if result.scheduled:
+                self.playground.book_meeting(meeting_id, result.time_slot, result.participants)
+
+    async def schedule(self, agent_meetings: List[AgentMeeting], agent_names: Dict[int, str],
+                       meeting_ids: Optional[List[str]] = None,
+                       timeout: Optional[float] = None) -> Optional[Dict[str, MeetingOutput]]:
+        """
+        Schedule a batch on the resident agents using their cached availability.
+
+        ``agent_names`` maps the invitees' participant ids to their agents.
+        Invitees whose availability changed since their agents were loaded
+        are reloaded first. Returns None if the playground is restarting,
+        lacks an agent for one of the invitees or stops before the batch
+        runs, so the caller can use a playground of its own instead.
+        """
+        # The playground may be swapped out while the batch waits
+        playground = self.playground
+        if playground is None or not playground.covers(agent_names.values()):
+            return None
+        version = await asyncio.to_thread(load_availability_version)
+        stale = {participant_id for participant_id in agent_names if self._loaded.get(participant_id) != version}
+        if stale:
+            snapshot, bookings, version = await asyncio.to_thread(load_participants, stale)
+            if playground is not self.playground:
+                return None
+            if not self._apply(stale, snapshot, bookings, version):
+                # An agent has to be added after all, which needs a restart
+                self.refresh(stale)
+                return None
+        try:
+            return await playground.submit(agent_meetings, meeting_ids, timeout)
+        except PlaygroundStopped:
+            return None
+
+
+resident = ResidentScheduler()
@@ -0,0 +1,37 @@
+from sqlalchemy.orm import Session
+
+from ..models.schedule_version import ScheduleVersion
+
+SCHEDULE_VERSION_ID = 1
+# Bumped only when participants' bookable time changes, so caches in every
+# worker process can tell their entries went stale
+AVAILABILITY_VERSION_ID = 2
+
+
+def current_schedule_version(db: Session, version_id: int = SCHEDULE_VERSION_ID) -> int:
+    """Return the version of the meeting schedule, 0 before anything changed."""
+    version = (
+        db.query(ScheduleVersion.version)
+        .filter(ScheduleVersion.id == version_id)
+        .scalar()
+    )
+    return version or 0
+
+
+def bump_schedule_version(db: Session, version_id: int = SCHEDULE_VERSION_ID):
+    """Advance the schedule version as part of the caller's transaction."""
+    updated = (
+        db.query(ScheduleVersion)
+        .filter(ScheduleVersion.id == version_id)
+        .update({ScheduleVersion.version: ScheduleVersion.version + 1}, synchronize_session=False)
+    )
+    if not updated:
+        db.add(ScheduleVersion(id=version_id, version=1))
+
+
+def current_availability_version(db: Session) -> int:
+    return current_schedule_version(db, AVAILABILITY_VERSION_ID)
+
+
+def bump_availability_version(db: Session):
+    bump_schedule_version(db, AVAILABILITY_VERSION_ID)
@@ -0,0 +1,148 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import datetime
+import os
+
+from sqlalchemy.orm import Session
+
+from ..agents.availability import WORKDAY_END, WORKDAY_START
+from ..agents.batch_solver import SOLVER_GREEDY
+from ..agents.local_transport import TRANSPORT_CEYLON
+from ..agents.participant_agent import TimeSlot as AgentTimeSlot
+from ..agents.scheduling_playground import Meeting as AgentMeeting
+from ..agents.snapshot import AvailabilitySnapshot
+from ..agents.timegrid import to_hours, to_minutes
+from ..models.meeting import Meeting, MeetingParticipant, ScheduledSlot
+from ..models.participant import Participant
+from ..models.time_slot import TimeSlot
+
+# Working hours (hours) for meetings that do not set their own
+SCHEDULER_WORKDAY_START = float(os.getenv("SCHEDULER_WORKDAY_START", str(WORKDAY_START)))
+SCHEDULER_WORKDAY_END = float(os.getenv("SCHEDULER_WORKDAY_END", str(WORKDAY_END)))
+# How runs and the resident playground schedule; both read them from here.
+# "local" runs the agents over in-process queues instead of Ceylon networking
+SCHEDULER_TRANSPORT = os.getenv("SCHEDULER_TRANSPORT", TRANSPORT_CEYLON)
+# Seconds before a silent agent counts as unavailable, and before a meeting
+# still being negotiated times out
+SCHEDULER_RESPONSE_TIMEOUT = float(os.getenv("SCHEDULER_RESPONSE_TIMEOUT", "10"))
+SCHEDULER_MEETING_TIMEOUT = float(os.getenv("SCHEDULER_MEETING_TIMEOUT", "60"))
+# "greedy" or "exact" solve each batch from the agents' reported free time,
+# "negotiate" has the agents confirm one proposed slot at a time
+SCHEDULER_SOLVER_MODE = os.getenv("SCHEDULER_SOLVER_MODE", SOLVER_GREEDY)
+
+
+def agent_name(participant_id: int) -> str:
+    """Name a participant's agent after their id, as participant names need not be unique."""
+    return f"participant-{participant_id}"
+
+
+def load_snapshot(db: Session, participant_ids: Optional[Iterable[int]] = None,
+                  subtract_bookings: bool = True) -> AvailabilitySnapshot:
+    """
+    Load the free time of active participants (all if no ids given).
+
+    Only columns are fetched, ordered by participant, and packed straight
+    into the snapshot's arrays without building ORM or slot objects. The
+    time of meetings participants are already booked for is taken out
+    unless ``subtract_bookings`` is false, for callers that track bookings
+    themselves.
+    """
+    participants = db.query(Participant.id).filter(Participant.is_active == True)
+    slots = (
+        db.query(TimeSlot.participant_id, TimeSlot.date, TimeSlot.start_minute, TimeSlot.end_minute)
+        .join(Participant, Participant.id == TimeSlot.participant_id)
+        .filter(Participant.is_active == True)
+    )
+    if participant_ids is not None:
+        participant_ids = set(participant_ids)
+        participants = participants.filter(Participant.id.in_(participant_ids))
+        slots = slots.filter(TimeSlot.participant_id.in_(participant_ids))
+
+    snapshot = AvailabilitySnapshot()
+    positions = {}
+    for participant_id, in participants.order_by(Participant.id):
+        positions[participant_id] = len(snapshot.names)
+        snapshot.participant_ids.append(participant_id)
+        snapshot.names.append(agent_name(participant_id))
+
+    # Slots arrive grouped by participant in snapshot order, so counts become offsets
+    counts = [0] * len(snapshot.names)
+    date_positions: Dict[datetime.date, int] = {}
+    for participant_id, date, start_minute, end_minute in slots.order_by(TimeSlot.participant_id, TimeSlot.id):
+        date_position = date_positions.get(date)
+        if date_position is None:
+            date_position = date_positions[date] = len(snapshot.dates)
+            snapshot.dates.append(date.isoformat())
+        snapshot.slot_dates.append(date_position)
+        snapshot.slot_starts.append(start_minute)
+        snapshot.slot_ends.append(end_minute)
+        counts[positions[participant_id]] += 1
+
+    offset = 0
+    for count in counts:
+        offset += count
+        snapshot.slot_offsets.append(offset)
+
+    if not subtract_bookings or not len(snapshot):
+        return snapshot
+    booked = {
+        participant_id: [
+            (slot.date, to_minutes(slot.start_time), to_minutes(slot.end_time)) for slot in slots.values()
+        ]
+        for participant_id, slots in load_bookings(
+            db, None if participant_ids is None else snapshot.participant_ids
+        ).items()
+    }
+    return snapshot.subtract(booked) if booked else snapshot
+
+
+def load_bookings(db: Session, participant_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, AgentTimeSlot]]:
+    """Return the scheduled meetings of each invited participant as agent slots by meeting id."""
+    booked = (
+        db.query(MeetingParticipant.participant_id, Meeting.id, ScheduledSlot.date,
+                 ScheduledSlot.start_minute, ScheduledSlot.end_minute)
+        .join(Meeting, Meeting.id == MeetingParticipant.meeting_id)
+        .join(ScheduledSlot, ScheduledSlot.id == Meeting.scheduled_slot_id)
+    )
+    if participant_ids is not None:
+        booked = booked.filter(MeetingParticipant.participant_id.in_(set(participant_ids)))
+
+    bookings: Dict[int, Dict[str, AgentTimeSlot]] = {}
+    for participant_id, meeting_id, date, start_minute, end_minute in booked:
+        bookings.setdefault(participant_id, {})[str(meeting_id)] = AgentTimeSlot(
+            date=date.isoformat(), start_time=to_hours(start_minute), end_time=to_hours(end_minute)
+        )
+    return bookings
+
+
+def load_scheduling_inputs(db: Session, db_meetings: List[Meeting]) -> Tuple[List[AgentMeeting], Dict[int, str]]:
+    """Convert meetings to agent meetings and return the invited participants' agent names by id."""
+    # Only participants invited to an unscheduled meeting take part in the run
+    invited_ids = {mp.participant_id for db_meeting in db_meetings for mp in db_meeting.participants}
+    agent_names = {
+        participant_id: agent_name(participant_id)
+        for participant_id, in db.query(Participant.id).filter(
+            Participant.is_active == True, Participant.id.in_(invited_ids)
+        )
+    }
+
+    # Convert DB meetings to agent meetings
+    agent_meetings = []
+    for db_meeting in db_meetings:
+        agent_meeting = AgentMeeting(
+            name=db_meeting.name,
+            date=db_meeting.date.isoformat(),
+            duration=db_meeting.duration,
+            minimum_participants=db_meeting.minimum_participants,
+            participants=[
+                agent_names[mp.participant_id]
+                for mp in db_meeting.participants
+                if mp.participant_id in agent_names
+            ],
+            date_to=db_meeting.date_to.isoformat() if db_meeting.date_to else None,
+            window_start=SCHEDULER_WORKDAY_START if db_meeting.workday_start is None else db_meeting.workday_start,
+            window_end=SCHEDULER_WORKDAY_END if db_meeting.workday_end is None else db_meeting.workday_end,
+            business_days=bool(db_meeting.business_days)
+        )
+        agent_meetings.append(agent_meeting)
+
+    return agent_meetings, agent_names
@@ -0,0 +1,589 @@
+from collections import deque
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+import os
+import time
+
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, selectinload
+
+from .. import metrics
+from ..agents.partition import PartitionedSolver
+from ..agents.scheduling_playground import SchedulingPlayground, Meeting as AgentMeeting, MeetingOutput
+from ..agents.snapshot import AvailabilitySnapshot
+from ..agents.timegrid import to_minutes
+from ..database import SessionLocal
+from ..models.meeting import Meeting, MeetingParticipant, ScheduledSlot
+from ..models.scheduling_run import MeetingClaim, SchedulingRun
+from .availability_cache import availability_cache
+from .change_events import (
+    AVAILABILITY_IMPORTED, ChangeEvent, events, MEETING_DELETED, MEETING_UPDATED, PARTICIPANT_CREATED
+)
+from .resident_scheduler import port_is_free, resident
+from .schedule_version import bump_availability_version, bump_schedule_version
+from .scheduling_inputs import (
+    load_scheduling_inputs, load_snapshot, SCHEDULER_MEETING_TIMEOUT, SCHEDULER_RESPONSE_TIMEOUT,
+    SCHEDULER_SOLVER_MODE, SCHEDULER_TRANSPORT
+)
+
+RUN_QUEUED = "queued"
+RUN_RUNNING = "running"
+RUN_COMPLETED = "completed"
+RUN_FAILED = "failed"
+
+SCHEDULER_CONCURRENCY = int(os.getenv("SCHEDULER_CONCURRENCY", "2"))
+SCHEDULER_PORTS = os.getenv("SCHEDULER_PORTS", "8455-8474")
+SCHEDULER_POLL_INTERVAL = float(os.getenv("SCHEDULER_POLL_INTERVAL", "5"))
+# Seconds before a run stops scheduling and keeps what it has
+SCHEDULER_RUN_TIMEOUT = float(os.getenv("SCHEDULER_RUN_TIMEOUT", "120"))
+# How many times meetings that timed out are queued again
+SCHEDULER_MAX_RETRIES = int(os.getenv("SCHEDULER_MAX_RETRIES", "2"))
+# Worker processes that solve independent meeting clusters in parallel,
+# straight from the availability snapshot; 0 negotiates through the agents
+SCHEDULER_SOLVER_PROCESSES = int(os.getenv("SCHEDULER_SOLVER_PROCESSES", "0"))
+# Directory to write a JSON profile of every run to; unset disables profiles
+SCHEDULER_PROFILE_DIR = os.getenv("SCHEDULER_PROFILE_DIR")
+
+logger = logging.getLogger("ceylon")
+
+solver_pool = PartitionedSolver(SCHEDULER_SOLVER_PROCESSES)
+
+
+def enqueue_run(db: Session, meeting_ids: Optional[Iterable[int]] = None, retries: int = 0) -> SchedulingRun:
+    """
+    Queue a scheduling run, reusing a run that is still waiting to start.
+
+    ``meeting_ids`` limits the run to those meetings; without it every
+    unscheduled meeting is considered. Limited requests are merged into a
+    queued run, and a full request widens it. ``retries`` counts how often
+    the meetings were queued again after timing out; a merged run keeps
+    the highest count.
+    """
+    queued = (
+        db.query(SchedulingRun)
+        .filter(SchedulingRun.status == RUN_QUEUED)
+        .order_by(SchedulingRun.id)
+        .first()
+    )
+    if queued is not None:
+        if retries > queued.retries:
+            queued.retries = retries
+            db.commit()
+        if queued.requested_meeting_ids is not None:
+            if meeting_ids is None:
+                queued.requested_meeting_ids = None
+            else:
+                queued.requested_meeting_ids = sorted(set(queued.requested_meeting_ids) | set(meeting_ids))
+            db.commit()
+            db.refresh(queued)
+        return queued
+
+    run = SchedulingRun(
+        status=RUN_QUEUED,
+        progress=0,
+        requested_meeting_ids=None if meeting_ids is None else sorted(set(meeting_ids)),
+        retries=retries
+    )
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+    return run
+
+
+def claim_next_run() -> Optional[int]:
+    """Move the oldest queued run to running and return its id."""
+    db = SessionLocal()
+    try:
+        run = (
+            db.query(SchedulingRun)
+            .filter(SchedulingRun.status == RUN_QUEUED)
+            .order_by(SchedulingRun.id)
+            .first()
+        )
+        if run is None:
+            return None
+
+        # Conditional update so two workers can never claim the same run
+        claimed = (
+            db.query(SchedulingRun)
+            .filter(SchedulingRun.id == run.id, SchedulingRun.status == RUN_QUEUED)
+            .update({"status": RUN_RUNNING, "started_at": datetime.utcnow()}, synchronize_session=False)
+        )
+        db.commit()
+        return run.id if claimed else None
+    finally:
+        db.close()
+
+
+def affected_meeting_ids(db: Session, event: ChangeEvent) -> List[int]:
+    """Return the unscheduled meetings whose schedule depends on a change."""
+    if event.kind in (MEETING_DELETED, PARTICIPANT_CREATED):
+        return []
+
+    query = db.query(Meeting.id).filter(Meeting.scheduled_slot_id == None)
+    if event.kind == MEETING_UPDATED:
+        query = query.filter(Meeting.id == event.meeting_id)
+    elif event.kind == AVAILABILITY_IMPORTED:
+        query = query.join(MeetingParticipant).filter(MeetingParticipant.participant_id.in_(event.participant_ids))
+    else:
+        query = query.join(MeetingParticipant).filter(MeetingParticipant.participant_id == event.participant_id)
+    return [meeting_id for meeting_id, in query.distinct()]
+
+
+def enqueue_affected(event: ChangeEvent) -> bool:
+    """Queue a run for the meetings a change affects; returns whether one was queued."""
+    db = SessionLocal()
+    try:
+        meeting_ids = affected_meeting_ids(db, event)
+        if not meeting_ids:
+            return False
+        enqueue_run(db, meeting_ids)
+        return True
+    finally:
+        db.close()
+
+
+def claim_meetings(db: Session, run_id: int, meeting_ids: List[int]):
+    """
+    Claim meetings for a run, skipping those another active run holds.
+
+    Claims are rows keyed by meeting id, inserted ignoring conflicts, so
+    of two runs claiming the same meeting at once exactly one gets it.
+    """
+    if not meeting_ids:
+        return
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    db.execute(
+        dialect.insert(MeetingClaim).on_conflict_do_nothing(),
+        [{"meeting_id": meeting_id, "run_id": run_id} for meeting_id in meeting_ids]
+    )
+
+
+def release_meetings(db: Session, run_id: int):
+    """Drop a run's meeting claims; committed with the run's final status."""
+    db.query(MeetingClaim).filter(MeetingClaim.run_id == run_id).delete(synchronize_session=False)
+
+
+def requeue_interrupted_runs() -> int:
+    """Put runs left running by a previous worker process back in the queue."""
+    db = SessionLocal()
+    try:
+        running = db.query(SchedulingRun.id).filter(SchedulingRun.status == RUN_RUNNING)
+        db.query(MeetingClaim).filter(MeetingClaim.run_id.in_(running.scalar_subquery())).delete(
+            synchronize_session=False
+        )
+        count = (
+            db.query(SchedulingRun)
+            .filter(SchedulingRun.status == RUN_RUNNING)
+            .update({"status": RUN_QUEUED, "progress": 0, "port": None, "meeting_ids": None},
+                    synchronize_session=False)
+        )
+        db.commit()
+        return count
+    finally:
+        db.close()
+
+
+def process_scheduling_results(db: Session, results: Dict[str, MeetingOutput]) -> int:
+    """
+    Store scheduled slots for successful meetings and return how many were scheduled.
+
+    Results are keyed by meeting id. All slots are inserted with one
+    executemany and all meetings updated with another, in a single
+    transaction. Meetings that already have a slot are left alone, so
+    writing the results of a retried run again is harmless.
+    """
+    scheduled = {
+        int(meeting_id): result.time_slot
+        for meeting_id, result in results.items()
+        if result.scheduled and result.time_slot
+    }
+    if not scheduled:
+        return 0
+
+    pending = [
+        meeting_id
+        for meeting_id, in db.query(Meeting.id)
+        .filter(Meeting.id.in_(scheduled), Meeting.scheduled_slot_id == None)
+        .order_by(Meeting.id)
+    ]
+    if not pending:
+        return 0
+
+    slot_ids = db.scalars(
+        insert(ScheduledSlot).returning(ScheduledSlot.id, sort_by_parameter_order=True),
+        [
+            {
+                "date": date.fromisoformat(scheduled[meeting_id].date),
+                "start_minute": to_minutes(scheduled[meeting_id].start_time),
+                "end_minute": to_minutes(scheduled[meeting_id].end_time)
+            }
+            for meeting_id in pending
+        ]
+    ).all()
+    db.execute(
+        update(Meeting),
+        [
+            {"id": meeting_id, "scheduled_slot_id": slot_id}
+            for meeting_id, slot_id in zip(pending, slot_ids)
+        ]
+    )
+    bump_schedule_version(db)
+    bump_availability_version(db)
+    db.commit()
+    return len(pending)
+
+
+def write_profile(run: SchedulingRun, results: Dict[str, MeetingOutput], resident_run: bool):
+    """Dump a run's stage timings and per-meeting negotiation stats to SCHEDULER_PROFILE_DIR."""
+    profile = {
+        "run_id": run.id,
+        "status": run.status,
+        "resident": resident_run,
+        "total_meetings": run.total_meetings,
+        "scheduled_meetings": run.scheduled_meetings,
+        "queue_wait_seconds": (run.started_at - run.created_at).total_seconds() if run.started_at else None,
+        "load_seconds": run.load_seconds,
+        "schedule_seconds": run.schedule_seconds,
+        "write_seconds": run.write_seconds,
+        "meetings": {
+            meeting_id: {
+                "scheduled": result.scheduled,
+                "rounds": result.rounds,
+                "first_feasible_seconds": result.first_feasible_seconds,
+                "timed_out": result.timed_out,
+                "error": result.error
+            }
+            for meeting_id, result in results.items()
+        }
+    }
+    try:
+        os.makedirs(SCHEDULER_PROFILE_DIR, exist_ok=True)
+        with open(os.path.join(SCHEDULER_PROFILE_DIR, f"run-{run.id}.json"), "w") as f:
+            json.dump(profile, f, indent=2)
+    except OSError as e:
+        logger.warning(f"Could not write profile for scheduling run {run.id}: {e}")
+
+
+# The steps of a run below each use their own session, so that
+# execute_run can call them in a thread instead of on the event loop
+
+def start_run(run_id: int, port: int) -> Tuple[List[AgentMeeting], List[str], Dict[int, str], Dict[str, List[int]]]:
+    """
+    Record the port of a claimed run and load the meetings it schedules.
+
+    Returns the agent meetings, their ids, the invitees' agent names by
+    participant id and the invitee ids by meeting id.
+    """
+    db = SessionLocal()
+    try:
+        run = db.get(SchedulingRun, run_id)
+        run.port = port
+        if run.started_at is not None:
+            metrics.RUN_QUEUE_WAIT_SECONDS.observe((run.started_at - run.created_at).total_seconds())
+
+        # Claimed and committed first, so meetings another active run holds are skipped
+        unscheduled = db.query(Meeting.id).filter(Meeting.scheduled_slot_id == None)
+        if run.requested_meeting_ids is not None:
+            unscheduled = unscheduled.filter(Meeting.id.in_(run.requested_meeting_ids))
+        claim_meetings(db, run_id, [meeting_id for meeting_id, in unscheduled])
+        db.commit()
+
+        # A meeting may have been scheduled by the run that held it in between
+        db_meetings = (
+            db.query(Meeting)
+            .join(MeetingClaim, MeetingClaim.meeting_id == Meeting.id)
+            .options(selectinload(Meeting.participants))
+            .filter(MeetingClaim.run_id == run_id, Meeting.scheduled_slot_id == None)
+            .order_by(Meeting.id)
+            .all()
+        )
+        run.meeting_ids = [db_meeting.id for db_meeting in db_meetings]
+        run.total_meetings = len(db_meetings)
+        # Read now, while the invitees loaded with the meetings are not expired by a commit
+        invitee_ids = {
+            str(db_meeting.id): [mp.participant_id for mp in db_meeting.participants]
+            for db_meeting in db_meetings
+        }
+
+        agent_meetings, agent_names = load_scheduling_inputs(db, db_meetings)
+        meeting_ids = [str(db_meeting.id) for db_meeting in db_meetings]
+        db.commit()
+        return agent_meetings, meeting_ids, agent_names, invitee_ids
+    finally:
+        db.close()
+
+
+def load_run_snapshot(participant_ids: Iterable[int]) -> AvailabilitySnapshot:
+    """Load the availability snapshot of a run's invitees."""
+    db = SessionLocal()
+    try:
+        return load_snapshot(db, participant_ids)
+    finally:
+        db.close()
+
+
+def update_run(run_id: int, **values):
+    """Set columns of a run, such as its progress and stage timings."""
+    db = SessionLocal()
+    try:
+        db.query(SchedulingRun).filter(SchedulingRun.id == run_id).update(values, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def finish_run(run_id: int, results: Dict[str, MeetingOutput]) -> Tuple[List[int], int]:
+    """
+    Store a run's results and mark it completed.
+
+    Returns the ids of the meetings that timed out and how often the run's
+    meetings were queued again already.
+    """
+    db = SessionLocal()
+    try:
+        run = db.get(SchedulingRun, run_id)
+        # Settled meetings are kept even when others timed out
+        started = time.perf_counter()
+        run.scheduled_meetings = process_scheduling_results(db, results)
+        run.write_seconds = time.perf_counter() - started
+        metrics.RUN_STAGE_SECONDS.observe(run.write_seconds, stage="write")
+        timed_out = sorted(int(meeting_id) for meeting_id, result in results.items() if result.timed_out)
+        run.timed_out_meeting_ids = timed_out or None
+        run.status = RUN_COMPLETED
+        run.progress = 100
+        run.finished_at = datetime.utcnow()
+        release_meetings(db, run_id)
+        db.commit()
+        return timed_out, run.retries
+    finally:
+        db.close()
+
+
+def requeue_timed_out(run_id: int, timed_out: List[int], retries: int):
+    """Queue the meetings a run timed out on again, up to SCHEDULER_MAX_RETRIES times."""
+    if retries >= SCHEDULER_MAX_RETRIES:
+        logger.error(f"Scheduling run {run_id} timed out on meetings {timed_out}, not retrying")
+        return
+    db = SessionLocal()
+    try:
+        requeued = enqueue_run(db, timed_out, retries=retries + 1)
+        logger.warning(f"Scheduling run {run_id} timed out on {len(timed_out)} meetings, "
+                       f"queued again in run {requeued.id}")
+    finally:
+        db.close()
+
+
+def fail_run(run_id: int, error: str):
+    """Mark a run failed with the error that stopped it."""
+    db = SessionLocal()
+    try:
+        run = db.get(SchedulingRun, run_id)
+        if run is not None:
+            run.status = RUN_FAILED
+            run.error = error
+            run.finished_at = datetime.utcnow()
+            release_meetings(db, run_id)
+            db.commit()
+    finally:
+        db.close()
+
+
+def write_run_profile(run_id: int, results: Dict[str, MeetingOutput], resident_run: bool):
+    """Write the profile of a finished run, if it still exists."""
+    db = SessionLocal()
+    try:
+        run = db.get(SchedulingRun, run_id)
+        if run is not None:
+            write_profile(run, results, resident_run)
+    finally:
+        db.close()
+
+
+async def execute_run(run_id: int, port: int, transport: str = SCHEDULER_TRANSPORT,
+                      timeout: float = SCHEDULER_RUN_TIMEOUT):
+    """
+    Run the scheduler for one claimed run and record its outcome.
+
+    Scheduling stops ``timeout`` seconds after the run starts. Meetings
+    settled by then are stored, and the rest are recorded as timed out and
+    queued again, up to SCHEDULER_MAX_RETRIES times. Database work runs in
+    a thread so it does not block the event loop.
+    """
+    results = {}
+    use_resident = False
+    try:
+        started = time.perf_counter()
+        agent_meetings, meeting_ids, agent_names, invitee_ids = await asyncio.to_thread(
+            start_run, run_id, port
+        )
+        use_resident = not solver_pool.enabled and resident.covers(agent_names.values())
+        if meeting_ids and not use_resident:
+            snapshot = await asyncio.to_thread(load_run_snapshot, list(agent_names))
+        load_seconds = time.perf_counter() - started
+        metrics.RUN_STAGE_SECONDS.observe(load_seconds, stage="load")
+        await asyncio.to_thread(update_run, run_id, load_seconds=load_seconds, progress=10)
+
+        if meeting_ids:
+            started = time.perf_counter()
+            time_left = max(timeout - load_seconds, 0)
+            if use_resident:
+                resident_results = await resident.schedule(agent_meetings, agent_names, meeting_ids, time_left)
+                use_resident = resident_results is not None
+                if use_resident:
+                    results = resident_results
+                else:
+                    logger.info(f"Resident playground restarted, scheduling run {run_id} on its own playground")
+                    snapshot = await asyncio.to_thread(load_run_snapshot, list(agent_names))
+            if solver_pool.enabled:
+                results = await solver_pool.solve(agent_meetings, meeting_ids, snapshot, timeout=time_left)
+            elif not use_resident:
+                playground = SchedulingPlayground(
+                    port=port, solver_mode=SCHEDULER_SOLVER_MODE, transport=transport,
+                    response_timeout=SCHEDULER_RESPONSE_TIMEOUT, meeting_timeout=SCHEDULER_MEETING_TIMEOUT
+                )
+                results = await playground.schedule_meetings(
+                    agent_meetings, snapshot.build_agents(), meeting_ids, time_left
+                )
+            schedule_seconds = time.perf_counter() - started
+            metrics.RUN_STAGE_SECONDS.observe(schedule_seconds, stage="schedule")
+            await asyncio.to_thread(update_run, run_id, schedule_seconds=schedule_seconds, progress=80)
+
+        timed_out, retries = await asyncio.to_thread(finish_run, run_id, results)
+        metrics.RUNS_FINISHED.inc(status=RUN_COMPLETED)
+        # Booked time is gone from the invitees' suggestions
+        availability_cache.invalidate(
+            participant_id
+            for meeting_id, result in results.items()
+            if result.scheduled
+            for participant_id in invitee_ids.get(meeting_id, ())
+        )
+        if not use_resident:
+            # Resident agents only hear of the meetings they schedule themselves
+            resident.record_results(results)
+
+        # Queued only now, so another worker does not skip them as claimed by this run
+        if timed_out:
+            await asyncio.to_thread(requeue_timed_out, run_id, timed_out, retries)
+    except Exception as e:
+        logger.error(f"Scheduling run {run_id} failed: {e}")
+        await asyncio.to_thread(fail_run, run_id, str(e))
+        metrics.RUNS_FINISHED.inc(status=RUN_FAILED)
+    finally:
+        if SCHEDULER_PROFILE_DIR:
+            await asyncio.to_thread(write_run_profile, run_id, results, use_resident)
+
+
+class PortPool:
+    """Hands out playground ports from a fixed range, skipping ports in use."""
+
+    def __init__(self, port_range: str = SCHEDULER_PORTS):
+        first, _, last = port_range.partition("-")
+        self._free = deque(range(int(first), int(last or first) + 1))
+
+    def acquire(self) -> Optional[int]:
+        for _ in range(len(self._free)):
+            port = self._free.popleft()
+            if port_is_free(port):
+                return port
+            self._free.append(port)
+        return None
+
+    def release(self, port: int):
+        self._free.append(port)
+
+
+class SchedulingWorker:
+    """Runs queued scheduling runs with bounded concurrency inside the app's event loop."""
+
+    def __init__(self, concurrency: int = SCHEDULER_CONCURRENCY, ports: Optional[PortPool] = None,
+                 poll_interval: float = SCHEDULER_POLL_INTERVAL):
+        self.concurrency = concurrency
+        self.ports = ports or PortPool()
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._changes: Set[asyncio.Task] = set()  # Change events still being queued
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    async def start(self):
+        requeued = await asyncio.to_thread(requeue_interrupted_runs)
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted scheduling runs")
+
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._loop()) for _ in range(self.concurrency)]
+        events.subscribe(self.handle_change)
+
+    async def stop(self):
+        events.unsubscribe(self.handle_change)
+        await asyncio.gather(*self._changes, return_exceptions=True)
+        # wait_for can turn a cancellation that races its timeout into a
+        # TimeoutError, so the loops also check the flag before each run
+        self._stopping = True
+        self.notify()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        solver_pool.shutdown()
+
+    def handle_change(self, event: ChangeEvent):
+        """Queue an incremental run for the meetings a change affects."""
+        task = asyncio.create_task(self._enqueue_affected(event))
+        self._changes.add(task)
+        task.add_done_callback(self._changes.discard)
+
+    async def _enqueue_affected(self, event: ChangeEvent):
+        # The queries run in a thread so they do not block the event loop
+        try:
+            queued = await asyncio.to_thread(enqueue_affected, event)
+        except Exception as e:
+            logger.error(f"Could not queue a run for {event.kind} event: {e}")
+            return
+        if queued:
+            self.notify()
+
+    def notify(self):
+        """Wake idle workers after a run has been queued."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _idle(self):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _loop(self):
+        while not self._stopping:
+            port = self.ports.acquire()
+            if port is None:
+                await self._idle()
+                continue
+
+            try:
+                # The queries run in a thread so they do not block the event loop
+                run_id = await asyncio.to_thread(claim_next_run)
+                if run_id is None:
+                    await self._idle()
+                    continue
+
+                logger.info(f"Starting scheduling run {run_id} on port {port}")
+                await execute_run(run_id, port)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Scheduling worker error: {e}")
+                await asyncio.sleep(self.poll_interval)
+            finally:
+                self.ports.release(port)
+
+
+worker = SchedulingWorker()
@@ -0,0 +1,179 @@
+"""
+Load test: async routers (AsyncSession) vs. the blocking sync-session path.
+
+Both variants serve the same read endpoints from the same database. The
+sync variant mirrors the previous routers: ``def`` handlers that use
+``get_db`` and therefore hold a threadpool thread for their DB I/O. Once
+more requests are in flight than the pool has connections, finished
+requests wait for a thread to close their session while every thread waits
+for a connection; the sync variant then only progresses as checkouts time
+out, which the ``errors`` column counts.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_async_routers
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import statistics
+import tempfile
+import time
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--participants", type=int, default=500)
+parser.add_argument("--meetings", type=int, default=1000)
+parser.add_argument("--requests", type=int, default=2000)
+parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+parser.add_argument("--threads", type=int, default=40, help="Threadpool size available to sync handlers")
+parser.add_argument("--pool-timeout", type=float, default=5, help="Seconds a sync request waits for a connection")
+parser.add_argument("--seed", type=int, default=7)
+args = parser.parse_args()
+
+# The app reads DATABASE_URL at import time
+_fd, database_path = tempfile.mkstemp(suffix=".db")
+os.close(_fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+
+import anyio.to_thread
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, selectinload, sessionmaker
+
+from backend.app.database import DATABASE_URL
+from backend.app.main import app as async_app
+from backend.app.models.meeting import Meeting, MeetingParticipant
+from backend.app.models.participant import Participant
+from backend.app.models.time_slot import TimeSlot
+from backend.app.schemas.meeting import Meeting as MeetingSchema
+from backend.app.schemas.participant import Participant as ParticipantSchema
+
+
+# Same pool as the app's sync engine, with a shorter checkout timeout so a
+# starved pool shows up as errors instead of a stalled run
+sync_engine = create_engine(DATABASE_URL, pool_timeout=args.pool_timeout)
+SyncSession = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+
+
+def get_db():
+    db = SyncSession()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+sync_app = FastAPI()
+
+
+@sync_app.get("/participants/{participant_id}", response_model=ParticipantSchema)
+def read_participant(participant_id: int, db: Session = Depends(get_db)):
+    return db.query(Participant).filter(Participant.id == participant_id).first()
+
+
+@sync_app.get("/meetings/", response_model=list[MeetingSchema])
+def read_meetings(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    return (
+        db.query(Meeting)
+        .options(selectinload(Meeting.participants), selectinload(Meeting.scheduled_slot))
+        .order_by(Meeting.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def populate(participants: int, meetings: int, seed: int):
+    rng = random.Random(seed)
+    db = SyncSession()
+    try:
+        db.bulk_insert_mappings(Participant, [
+            {"id": i + 1, "name": f"participant_{i}", "email": f"p{i}@example.com", "is_active": True}
+            for i in range(participants)
+        ])
+        db.bulk_insert_mappings(TimeSlot, [
+            {
+                "participant_id": i + 1,
+                "date": datetime.date(2024, 7, day + 1),
+                "start_minute": 9 * 60,
+                "end_minute": 17 * 60
+            }
+            for i in range(participants)
+            for day in range(5)
+        ])
+        db.bulk_insert_mappings(Meeting, [
+            {"id": j + 1, "name": f"meeting_{j}", "date": datetime.date(2024, 7, rng.randrange(5) + 1),
+             "duration": 1, "minimum_participants": 2}
+            for j in range(meetings)
+        ])
+        db.bulk_insert_mappings(MeetingParticipant, [
+            {"meeting_id": j + 1, "participant_id": participant_id}
+            for j in range(meetings)
+            for participant_id in rng.sample(range(1, participants + 1), 3)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def make_paths(count: int, participants: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        f"/participants/{rng.randrange(participants) + 1}" if i % 2 == 0
+        else f"/meetings/?skip={rng.randrange(50) * 20}&limit=20"
+        for i in range(count)
+    ]
+
+
+async def load(app, paths, concurrency: int):
+    latencies = []
+    errors = 0
+    queue = iter(paths)
+
+    async def client_loop(client):
+        nonlocal errors
+        for path in queue:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                failed = response.status_code != 200
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return len(paths) / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.95)], errors
+
+
+async def main():
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threads
+    populate(args.participants, args.meetings, args.seed)
+    paths = make_paths(args.requests, args.participants, args.seed)
+
+    print(f"{'concurrency':>11} {'variant':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for concurrency in args.concurrency:
+        for name, app in (("sync", sync_app), ("async", async_app)):
+            throughput, p50, p95, errors = await load(app, paths, concurrency)
+            print(
+                f"{concurrency:>11} {name:>7} {throughput:>8.0f} "
+                f"{p50 * 1000:>8.1f} {p95 * 1000:>8.1f} {errors:>7}", flush=True
+            )
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    finally:
+        sync_engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(database_path + suffix):
+                os.remove(database_path + suffix)
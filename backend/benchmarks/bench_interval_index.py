@@ -0,0 +1,71 @@
+"""
+Micro-benchmark: interval index lookups vs. the linear slot scan.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_interval_index
+"""
+import argparse
+import random
+import timeit
+
+from backend.app.agents.interval_index import IntervalIndex
+from backend.app.agents.participant_agent import ParticipantAgent, TimeSlot
+from backend.app.agents.timegrid import to_minutes
+
+
+def make_slots(count: int, days: int, seed: int):
+    rng = random.Random(seed)
+    slots = []
+    for _ in range(count):
+        day = rng.randrange(days)
+        start = rng.randrange(0, 46) / 2
+        length = rng.choice((0.5, 1, 1.5, 2))
+        slots.append(TimeSlot(
+            date=f"2024-07-{day + 1:02d}",
+            start_time=start,
+            end_time=min(start + length, 24)
+        ))
+    return slots
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--slots", type=int, nargs="+", default=[10, 100, 500, 2000])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'slots':>6} {'scan us/q':>10} {'index us/q':>11} {'speedup':>8} {'build ms':>9}")
+    for count in args.slots:
+        slots = make_slots(count, args.days, args.seed)
+        requests = make_slots(args.queries, args.days, args.seed + 1)
+
+        def scan():
+            for request in requests:
+                any(
+                    ParticipantAgent.has_overlap(slot, request, request.duration)
+                    for slot in slots
+                )
+
+        build_time = timeit.timeit(lambda: IntervalIndex(slots), number=5) / 5
+        index = IntervalIndex(slots)
+
+        def lookup():
+            for request in requests:
+                index.has_overlap(
+                    request.date,
+                    to_minutes(request.start_time),
+                    to_minutes(request.end_time),
+                    to_minutes(request.duration)
+                )
+
+        scan_time = min(timeit.repeat(scan, number=1, repeat=3)) / len(requests)
+        index_time = min(timeit.repeat(lookup, number=1, repeat=3)) / len(requests)
+        print(f"{count:>6} {scan_time * 1e6:>10.2f} {index_time * 1e6:>11.2f} "
+              f"{scan_time / index_time:>7.1f}x {build_time * 1e3:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
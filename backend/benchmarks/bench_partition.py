@@ -0,0 +1,111 @@
+"""
+Benchmark: batch solving in one process vs. independent clusters in a process pool.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_partition
+    python -m backend.benchmarks.bench_partition --teams 256 --processes 1 4 8 32
+
+The organisation is made of teams that never meet with each other, so
+every team's meetings form their own cluster. The single-process baseline
+builds the availability bitmap and solves every meeting in the event
+loop's process, as the playground does. Pool runs are timed after a
+warm-up run that starts the workers, and must schedule every meeting in
+the same slot as the baseline.
+"""
+from dataclasses import replace
+from typing import Dict, List
+import argparse
+import asyncio
+import os
+import time
+
+from backend.app.agents.batch_solver import BatchSolver, SOLVER_GREEDY
+from backend.app.agents.partition import PartitionedSolver
+from backend.app.agents.snapshot import AvailabilitySnapshot
+from backend.benchmarks.workload import PRESETS, Workload, build_meetings, generate
+
+
+def make_organisation(teams: int, preset: str, seed: int) -> List[Workload]:
+    """Generate one workload per team, with team-prefixed participant names."""
+    workloads = []
+    for team in range(teams):
+        workload = generate(replace(PRESETS[preset], seed=seed + team))
+        workload.names = [f"team_{team}_{name}" for name in workload.names]
+        workloads.append(workload)
+    return workloads
+
+
+def make_snapshot(workloads: List[Workload]) -> AvailabilitySnapshot:
+    snapshot = AvailabilitySnapshot()
+    positions: Dict[str, int] = {}
+    for workload in workloads:
+        for name, slots in zip(workload.names, workload.slots):
+            snapshot.participant_ids.append(len(snapshot.names) + 1)
+            snapshot.names.append(name)
+            for date, start, end in slots:
+                if date not in positions:
+                    positions[date] = len(snapshot.dates)
+                    snapshot.dates.append(date)
+                snapshot.slot_dates.append(positions[date])
+                snapshot.slot_starts.append(start)
+                snapshot.slot_ends.append(end)
+            snapshot.slot_offsets.append(len(snapshot.slot_starts))
+    return snapshot
+
+
+def solve_single(meetings, meeting_ids, snapshot):
+    by_id = dict(zip(meeting_ids, meetings))
+    invitees = {meeting_id: set(meeting.participants) for meeting_id, meeting in by_id.items()}
+    result = BatchSolver(snapshot.availability()).solve(by_id, invitees, mode=SOLVER_GREEDY)
+    return {meeting_id: assignment.time_slot for meeting_id, assignment in result.assignments.items()}
+
+
+async def solve_pool(solver: PartitionedSolver, meetings, meeting_ids, snapshot):
+    results = await solver.solve(meetings, meeting_ids, snapshot)
+    return {meeting_id: result.time_slot for meeting_id, result in results.items() if result.scheduled}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--teams", type=int, default=64)
+    parser.add_argument("--preset", default="medium", choices=sorted(PRESETS), help="Workload of each team")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    workloads = make_organisation(args.teams, args.preset, args.seed)
+    snapshot = make_snapshot(workloads)
+    meetings = [meeting for workload in workloads for meeting in build_meetings(workload)]
+    meeting_ids = [str(i) for i in range(len(meetings))]
+    print(f"{args.teams} teams, {len(snapshot)} participants, {len(meetings)} meetings, {os.cpu_count()} CPUs")
+
+    print(f"{'solver':>12} {'best ms':>9} {'median ms':>10} {'scheduled':>10} {'same slots':>11}")
+    timings = []
+    for _ in range(args.repeats):
+        started = time.perf_counter()
+        expected = solve_single(meetings, meeting_ids, snapshot)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    print(f"{'single':>12} {timings[0] * 1000:>9.1f} {timings[len(timings) // 2] * 1000:>10.1f} "
+          f"{len(expected):>10} {'-':>11}", flush=True)
+
+    for processes in args.processes:
+        solver = PartitionedSolver(processes)
+        try:
+            asyncio.run(solve_pool(solver, meetings, meeting_ids, snapshot))  # Start the workers
+            timings = []
+            for _ in range(args.repeats):
+                started = time.perf_counter()
+                slots = asyncio.run(solve_pool(solver, meetings, meeting_ids, snapshot))
+                timings.append(time.perf_counter() - started)
+        finally:
+            solver.shutdown()
+        timings.sort()
+        print(f"{f'pool x{processes}':>12} {timings[0] * 1000:>9.1f} {timings[len(timings) // 2] * 1000:>10.1f} "
+              f"{len(slots):>10} {str(slots == expected):>11}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
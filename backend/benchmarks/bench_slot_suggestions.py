@@ -0,0 +1,110 @@
+"""
+Benchmark: GET /scheduling/suggest latency with a cold and a warm availability cache.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_slot_suggestions
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import statistics
+import tempfile
+import time
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--participants", type=int, default=2000)
+parser.add_argument("--days", type=int, default=30)
+parser.add_argument("--slots", type=int, default=3, help="Time slots per participant per day")
+parser.add_argument("--invitees", type=int, nargs="+", default=[3, 10, 50])
+parser.add_argument("--requests", type=int, default=200)
+parser.add_argument("--seed", type=int, default=7)
+args = parser.parse_args()
+
+# The app reads DATABASE_URL at import time
+_fd, database_path = tempfile.mkstemp(suffix=".db")
+os.close(_fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+
+import httpx
+
+from backend.app.database import SessionLocal
+from backend.app.main import app
+from backend.app.models.participant import Participant
+from backend.app.models.time_slot import TimeSlot
+from backend.app.services.availability_cache import availability_cache
+
+
+def populate(participants: int, days: int, slots: int, seed: int):
+    rng = random.Random(seed)
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(Participant, [
+            {"id": i + 1, "name": f"participant_{i}", "email": f"p{i}@example.com", "is_active": True}
+            for i in range(participants)
+        ])
+        rows = []
+        for i in range(participants):
+            for day in range(days):
+                for _ in range(slots):
+                    start = rng.randrange(8 * 4, 17 * 4) * 15
+                    rows.append({
+                        "participant_id": i + 1,
+                        "date": datetime.date(2024, 7, 1) + datetime.timedelta(days=day),
+                        "start_minute": start,
+                        "end_minute": start + rng.choice((30, 60, 90, 120))
+                    })
+        db.bulk_insert_mappings(TimeSlot, rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def make_queries(count: int, invitees: int, participants: int, days: int, seed: int):
+    rng = random.Random(seed)
+    date_to = datetime.date(2024, 7, 1) + datetime.timedelta(days=min(days, 14) - 1)
+    return [
+        "/scheduling/suggest?"
+        + "".join(f"participant_ids={participant_id}&" for participant_id in rng.sample(range(1, participants + 1), invitees))
+        + f"duration=1&date_from=2024-07-01&date_to={date_to.isoformat()}&k=5"
+        for _ in range(count)
+    ]
+
+
+async def measure(client, queries):
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        response = await client.get(query)
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95)]
+
+
+async def main():
+    populate(args.participants, args.days, args.slots, args.seed)
+    print(f"{'invitees':>8} {'cold p50 ms':>11} {'cold p95 ms':>11} {'warm p50 ms':>11} {'warm p95 ms':>11}")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for invitees in args.invitees:
+            queries = make_queries(args.requests, invitees, args.participants, args.days, args.seed)
+            availability_cache.clear()
+            cold = await measure(client, queries)
+            warm = await measure(client, queries)
+            print(
+                f"{invitees:>8} {cold[0] * 1000:>11.2f} {cold[1] * 1000:>11.2f} "
+                f"{warm[0] * 1000:>11.2f} {warm[1] * 1000:>11.2f}",
+                flush=True
+            )
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(database_path + suffix):
+                os.remove(database_path + suffix)
@@ -0,0 +1,111 @@
+"""
+Benchmark: availability snapshot loader vs. lazy per-participant loading.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_snapshot_loader
+"""
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.agents.participant_agent import ParticipantAgent, TimeSlot as AgentTimeSlot
+from backend.app.database import Base
+from backend.app.models.participant import Participant
+from backend.app.models.time_slot import TimeSlot
+from backend.app.services.scheduling_inputs import load_snapshot
+
+
+def populate(session, participants: int, slots: int, days: int, seed: int):
+    rng = random.Random(seed)
+    session.bulk_insert_mappings(Participant, [
+        {"id": i + 1, "name": f"participant_{i}", "email": f"p{i}@example.com", "is_active": True}
+        for i in range(participants)
+    ])
+    rows = []
+    for i in range(participants):
+        for _ in range(slots):
+            start = rng.randrange(8, 17)
+            rows.append({
+                "participant_id": i + 1,
+                "date": datetime.date(2024, 7, rng.randrange(days) + 1),
+                "start_minute": start * 60,
+                "end_minute": (start + rng.choice((1, 2, 3))) * 60
+            })
+    session.bulk_insert_mappings(TimeSlot, rows)
+    session.commit()
+
+
+def lazy_agents(session):
+    """The previous loader: one slot query per participant and a dataclass per slot."""
+    agents = []
+    for db_participant in session.query(Participant).filter(Participant.is_active == True).all():
+        available_slots = [
+            AgentTimeSlot(date=slot.date.isoformat(), start_time=slot.start_time, end_time=slot.end_time)
+            for slot in db_participant.available_slots
+        ]
+        agents.append(ParticipantAgent(name=db_participant.name, available_slots=available_slots))
+    return agents
+
+
+def snapshot_agents(session):
+    return load_snapshot(session).build_agents()
+
+
+def measure(engine, loader):
+    queries = 0
+
+    def count(*args):
+        nonlocal queries
+        queries += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    session = sessionmaker(bind=engine)()
+    try:
+        started = time.perf_counter()
+        agents = loader(session)
+        elapsed = time.perf_counter() - started
+    finally:
+        session.close()
+        event.remove(engine, "before_cursor_execute", count)
+    return elapsed, queries, len(agents)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--participants", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--slots", type=int, default=20, help="Time slots per participant")
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'participants':>12} {'lazy ms':>9} {'queries':>8} {'snapshot ms':>12} {'queries':>8} {'speedup':>8}")
+    for count in args.participants:
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        engine = create_engine(f"sqlite:///{path}")
+        try:
+            Base.metadata.create_all(bind=engine)
+            session = sessionmaker(bind=engine)()
+            populate(session, count, args.slots, args.days, args.seed)
+            session.close()
+
+            lazy_time, lazy_queries, _ = measure(engine, lazy_agents)
+            snapshot_time, snapshot_queries, _ = measure(engine, snapshot_agents)
+            print(
+                f"{count:>12} {lazy_time * 1000:>9.1f} {lazy_queries:>8} "
+                f"{snapshot_time * 1000:>12.1f} {snapshot_queries:>8} {lazy_time / snapshot_time:>7.1f}x"
+            )
+        finally:
+            engine.dispose()
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
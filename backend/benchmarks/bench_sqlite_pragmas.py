@@ -0,0 +1,160 @@
+"""
+Benchmark: read throughput while a write-heavy scheduling run commits.
+
+Compares a plain ``create_engine`` (rollback journal, default pragmas)
+with ``configure_engine`` (WAL, synchronous=NORMAL, busy_timeout and a
+larger page cache). A writer thread stores scheduling results in chunks
+through ``process_scheduling_results`` while reader threads run the
+status query.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_sqlite_pragmas
+"""
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, delete, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.agents.participant_agent import TimeSlot as AgentTimeSlot
+from backend.app.agents.scheduling_playground import MeetingOutput
+from backend.app.database import Base, configure_engine
+from backend.app.models.meeting import Meeting, ScheduledSlot
+from backend.app.models import schedule_version, scheduling_run  # noqa: F401
+from backend.app.services.schedule_version import current_schedule_version
+from backend.app.services.scheduling_runs import process_scheduling_results
+
+
+def populate(session, meetings: int):
+    session.bulk_insert_mappings(Meeting, [
+        {"id": j + 1, "name": f"meeting_{j}", "date": datetime.date(2024, 7, j % 28 + 1),
+         "duration": 1, "minimum_participants": 2}
+        for j in range(meetings)
+    ])
+    session.commit()
+
+
+def writer(Session, meetings: int, chunk: int, stop: threading.Event, counts: dict):
+    """Schedule every meeting chunk by chunk, then clear the schedule and start over."""
+    session = Session()
+    try:
+        while not stop.is_set():
+            for first in range(1, meetings + 1, chunk):
+                if stop.is_set():
+                    break
+                results = {
+                    str(meeting_id): MeetingOutput(
+                        meeting_id=str(meeting_id),
+                        name=f"meeting_{meeting_id - 1}",
+                        scheduled=True,
+                        time_slot=AgentTimeSlot(date="2024-07-01", start_time=9, end_time=10)
+                    )
+                    for meeting_id in range(first, min(first + chunk, meetings + 1))
+                }
+                try:
+                    counts["written"] += process_scheduling_results(session, results)
+                    counts["commits"] += 1
+                except OperationalError:
+                    session.rollback()
+                    counts["errors"] += 1
+            session.execute(update(Meeting).values(scheduled_slot_id=None))
+            session.execute(delete(ScheduledSlot))
+            session.commit()
+    finally:
+        session.close()
+
+
+def reader(Session, meetings: int, page: int, stop: threading.Event, latencies: list, counts: dict, seed: int):
+    rng = random.Random(seed)
+    session = Session()
+    query = (
+        select(Meeting.id, Meeting.name, ScheduledSlot.date, ScheduledSlot.start_minute)
+        .outerjoin(ScheduledSlot, Meeting.scheduled_slot_id == ScheduledSlot.id)
+        .order_by(Meeting.id)
+        .limit(page)
+    )
+    try:
+        while not stop.is_set():
+            after_id = rng.randrange(max(meetings - page, 1))
+            started = time.perf_counter()
+            try:
+                current_schedule_version(session)
+                session.execute(query.where(Meeting.id > after_id)).all()
+                session.commit()
+            except OperationalError:
+                session.rollback()
+                counts["errors"] += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+    finally:
+        session.close()
+
+
+def run(engine, args):
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    stop = threading.Event()
+    write_counts = {"written": 0, "commits": 0, "errors": 0}
+    read_counts = {"errors": 0}
+    latencies = []
+    threads = [threading.Thread(target=writer, args=(Session, args.meetings, args.chunk, stop, write_counts))]
+    threads += [
+        threading.Thread(target=reader, args=(Session, args.meetings, args.page, stop, latencies, read_counts, seed))
+        for seed in range(args.readers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else float("nan")
+    slowest = latencies[-1] if latencies else float("nan")
+    return len(latencies) / args.duration, p95, slowest, read_counts["errors"], write_counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--meetings", type=int, default=5000)
+    parser.add_argument("--chunk", type=int, default=500, help="Meetings stored per commit")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--page", type=int, default=100, help="Meetings per status query")
+    parser.add_argument("--duration", type=float, default=5, help="Seconds per configuration")
+    args = parser.parse_args()
+
+    print(
+        f"{'engine':>10} {'reads/s':>8} {'p95 ms':>8} {'max ms':>8} {'read errors':>11} "
+        f"{'rows written/s':>14} {'write errors':>12}"
+    )
+    for name, make_engine in (("default", create_engine), ("configured", configure_engine)):
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        engine = make_engine(f"sqlite:///{path}")
+        try:
+            Base.metadata.create_all(bind=engine)
+            session = sessionmaker(bind=engine)()
+            populate(session, args.meetings)
+            session.close()
+
+            reads, p95, slowest, read_errors, write_counts = run(engine, args)
+            print(
+                f"{name:>10} {reads:>8.0f} {p95 * 1000:>8.1f} {slowest * 1000:>8.1f} {read_errors:>11} "
+                f"{write_counts['written'] / args.duration:>14.0f} {write_counts['errors']:>12}"
+            )
+        finally:
+            engine.dispose()
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: sweep-line candidate search, probing dense dates, vs. probing every start time of every day.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_window_search
+"""
+import argparse
+import datetime
+import random
+import time
+
+from backend.app.agents.availability import AvailabilityBitmap, SEARCH_STEP, WORKDAY_END, WORKDAY_START
+from backend.app.agents.participant_agent import TimeSlot
+from backend.app.agents.timegrid import to_minutes
+
+
+def make_bitmap(participants: int, days: int, slots: int, density: float, seed: int) -> AvailabilityBitmap:
+    rng = random.Random(seed)
+    bitmap = AvailabilityBitmap()
+    first = datetime.date(2024, 7, 1)
+    for i in range(participants):
+        bitmap.add_participant(f"p{i}")
+        for day in range(days):
+            if rng.random() >= density:
+                continue
+            date = (first + datetime.timedelta(days=day)).isoformat()
+            for _ in range(slots):
+                start = rng.randrange(8 * 2, 18 * 2) / 2
+                bitmap.add_slot(f"p{i}", TimeSlot(date=date, start_time=start, end_time=start + rng.choice((1, 2, 3))))
+    return bitmap
+
+
+def probe_candidates(bitmap: AvailabilityBitmap, dates, duration, invited, minimum_participants):
+    """The previous search: check every half-hour start of every date against the cell bitsets."""
+    duration_minutes = to_minutes(duration)
+    candidates = []
+    for date in dates:
+        start = to_minutes(WORKDAY_START)
+        while start + duration_minutes <= to_minutes(WORKDAY_END):
+            free = bitmap.free_mask(date, start, duration_minutes, invited)
+            if free and free.bit_count() >= minimum_participants:
+                candidates.append((date, start, free))
+            start += to_minutes(SEARCH_STEP)
+    return candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--participants", type=int, default=200)
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 10, 60])
+    parser.add_argument("--slots", type=int, default=2, help="Free slots per participant per day")
+    parser.add_argument("--density", type=float, nargs="+", default=[1.0, 0.2],
+                        help="Share of days on which a participant has any free time")
+    parser.add_argument("--invitees", type=int, default=8)
+    parser.add_argument("--meetings", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'density':>7} {'days':>5} {'probe ms':>9} {'search ms':>9} {'speedup':>8} {'candidates':>11}")
+    for density, days in ((density, days) for density in args.density for days in args.days):
+        bitmap = make_bitmap(args.participants, days, args.slots, density, args.seed)
+        dates = [(datetime.date(2024, 7, 1) + datetime.timedelta(days=day)).isoformat() for day in range(days)]
+        rng = random.Random(args.seed)
+        groups = [
+            bitmap.mask_for(f"p{i}" for i in rng.sample(range(args.participants), args.invitees))
+            for _ in range(args.meetings)
+        ]
+
+        started = time.perf_counter()
+        probed = [probe_candidates(bitmap, dates, 1, invited, 2) for invited in groups]
+        probe_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        swept = [bitmap.window_candidates(dates, 1, invited, 2) for invited in groups]
+        sweep_time = time.perf_counter() - started
+
+        assert probed == swept
+        print(
+            f"{density:>7.1f} {days:>5} {probe_time * 1000:>9.1f} {sweep_time * 1000:>9.1f} "
+            f"{probe_time / sweep_time:>7.1f}x {sum(map(len, swept)):>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark: pickled message bytes and serialization time, plain dataclasses vs. the packed wire format.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_wire_format
+
+The traffic is what one scheduling run sends: a batch availability request
+and reply per invitee, then a MeetingScheduled per invitee of each meeting,
+or, when negotiating, an availability request and reply per invitee of
+each proposed slot.
+"""
+from dataclasses import dataclass
+from typing import Dict, List
+import argparse
+import datetime
+import pickle
+import random
+import sys
+import time
+
+from backend.app.agents import participant_agent as packed
+from backend.app.agents.timegrid import SLOT_MINUTES, cell_range, range_mask
+
+
+# The message classes as they were before the packed encoding
+@dataclass
+class TimeSlot:
+    date: str
+    start_time: int
+    end_time: int
+
+@dataclass
+class AvailabilityRequest:
+    meeting_id: str
+    time_slot: TimeSlot
+
+@dataclass
+class AvailabilityResponse:
+    meeting_id: str
+    participant: str
+    time_slot: TimeSlot
+    available: bool
+
+@dataclass
+class CandidateWindow:
+    meeting_id: str
+    date: str
+    start_time: float
+    end_time: float
+
+@dataclass
+class BatchAvailabilityRequest:
+    windows: List[CandidateWindow]
+    resolution: int = SLOT_MINUTES
+
+@dataclass
+class BatchAvailabilityResponse:
+    participant: str
+    masks: Dict[str, int]
+
+@dataclass
+class MeetingScheduled:
+    meeting_id: str
+    time_slot: TimeSlot
+    participants: List[str]
+
+
+def make_traffic(types, participants: int, meetings: int, invitees: int, days: int,
+                 proposals: int, seed: int) -> Dict[str, list]:
+    """Build the messages of one run with the given message classes."""
+    rng = random.Random(seed)
+    legacy = types is not packed
+    ref = (lambda i: f"participant_{i}") if legacy else (lambda i: i + 1)
+    dates = [(datetime.date(2024, 7, 1) + datetime.timedelta(days=day)).isoformat() for day in range(days)]
+    groups = [rng.sample(range(participants), invitees) for _ in range(meetings)]
+    working_hours = range_mask(cell_range(8, 18))
+
+    windows: Dict[int, list] = {}
+    for meeting_id, group in enumerate(groups):
+        for i in group:
+            windows.setdefault(i, []).extend(
+                types.CandidateWindow(str(meeting_id), date, 8, 18) for date in dates
+            )
+
+    traffic = {"batch": [], "negotiation": []}
+    for i, participant_windows in windows.items():
+        traffic["batch"].append(types.BatchAvailabilityRequest(participant_windows, SLOT_MINUTES))
+        traffic["batch"].append(types.BatchAvailabilityResponse(
+            ref(i), {date: rng.getrandbits(96) & working_hours for date in dates}
+        ))
+    for meeting_id, group in enumerate(groups):
+        slot = types.TimeSlot(rng.choice(dates), 9, 10)
+        scheduled = types.MeetingScheduled(str(meeting_id), slot, [ref(i) for i in group])
+        traffic["batch"].extend(scheduled for _ in group)
+
+        for _ in range(proposals):
+            start = rng.randrange(8 * 4, 17 * 4) / 4
+            slot = types.TimeSlot(rng.choice(dates), start, start + 1)
+            request = types.AvailabilityRequest(str(meeting_id), slot)
+            traffic["negotiation"].extend(request for _ in group)
+            traffic["negotiation"].extend(
+                types.AvailabilityResponse(str(meeting_id), ref(i), slot, rng.random() < 0.7) for i in group
+            )
+        traffic["negotiation"].extend(scheduled for _ in group)
+    return traffic
+
+
+def measure(messages: list, repeats: int):
+    """Return total pickled bytes and the best dumps and loads time over the repeats."""
+    encoded = [pickle.dumps(message) for message in messages]
+    dump_time = load_time = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for message in messages:
+            pickle.dumps(message)
+        dump_time = min(dump_time, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for data in encoded:
+            pickle.loads(data)
+        load_time = min(load_time, time.perf_counter() - started)
+    return sum(map(len, encoded)), dump_time, load_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--participants", type=int, default=500)
+    parser.add_argument("--meetings", type=int, default=300)
+    parser.add_argument("--invitees", type=int, default=8)
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--proposals", type=int, default=3, help="Slots proposed per meeting when negotiating")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    workload = (args.participants, args.meetings, args.invitees, args.days, args.proposals, args.seed)
+    legacy = make_traffic(sys.modules[__name__], *workload)
+    compact = make_traffic(packed, *workload)
+
+    print(f"{'run':>11} {'format':>9} {'messages':>9} {'KiB':>9} {'B/msg':>7} {'dumps ms':>9} {'loads ms':>9}")
+    for run in ("batch", "negotiation"):
+        for label, traffic in (("dataclass", legacy), ("packed", compact)):
+            messages = traffic[run]
+            size, dump_time, load_time = measure(messages, args.repeats)
+            print(
+                f"{run:>11} {label:>9} {len(messages):>9} {size / 1024:>9.1f} {size / len(messages):>7.1f} "
+                f"{dump_time * 1000:>9.1f} {load_time * 1000:>9.1f}",
+                flush=True
+            )
+
+
+if __name__ == "__main__":
+    # Re-import under the package name so the old classes pickle with a
+    # full module path, as they did from backend.app.agents
+    from backend.benchmarks.bench_wire_format import main
+    main()
@@ -0,0 +1,381 @@
+"""
+Benchmark suite: schedule synthetic organisations through the playground and the HTTP API.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.suite
+    python -m backend.benchmarks.suite --preset small medium --save
+
+Workloads come from ``workload.PRESETS``. The playground scenario drives
+``SchedulingPlayground.schedule_meetings`` directly. The http scenario
+queues ``/scheduling/run`` and waits for the worker, and http-status
+times ``/scheduling/status`` on the scheduled result. Latency percentiles
+come from the timed repeats. Message counts, database queries and peak
+traced memory come from one extra instrumented repeat, so the
+instrumentation does not skew the timings.
+
+Everything runs offline against a temporary SQLite database. Results are
+compared with the saved baseline, and the exit status is 1 when a metric
+regressed by more than the tolerance. Timings depend on the machine, so
+save a fresh baseline before comparing on a different one.
+
+``--transport local`` runs both scenarios over the in-process transport
+instead of Ceylon networking. Its results are stored under separate
+scenario names, and its messages are counted but add no bytes, as they
+are never serialized.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, fields, replace
+from typing import Callable, Dict, List, Tuple
+import argparse
+import asyncio
+import json
+import math
+import os
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "suite.json")
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--preset", nargs="+", default=["small", "medium"])
+for name in ("participants", "slots_per_participant", "meetings", "invitees", "days", "window_days", "seed"):
+    parser.add_argument(f"--{name.replace('_', '-')}", type=int, help="Override the preset's value")
+parser.add_argument("--density", type=float, help="Override the preset's value")
+parser.add_argument("--scenario", nargs="+", default=["playground", "http"], choices=["playground", "http"])
+parser.add_argument("--repeats", type=int, default=5)
+parser.add_argument("--status-requests", type=int, default=20, help="Status requests timed after each http run")
+parser.add_argument("--port", type=int, default=8600, help="First port for playground scenario runs")
+parser.add_argument("--no-resident", action="store_true", help="Build a playground per http run")
+parser.add_argument("--transport", default="ceylon", choices=["ceylon", "local"], help="How agents exchange messages")
+parser.add_argument("--run-timeout", type=float, default=60, help="Seconds to wait for one scheduling run")
+parser.add_argument("--baseline", default=BASELINE_PATH)
+parser.add_argument("--save", action="store_true", help="Store the results as the new baseline")
+parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+args = parser.parse_args()
+
+# The app reads these at import time
+_fd, database_path = tempfile.mkstemp(suffix=".db")
+os.close(_fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+os.environ["SCHEDULER_RESIDENT"] = "0" if args.no_resident else "1"
+os.environ["SCHEDULER_TRANSPORT"] = args.transport
+
+from ceylon.base.uni_agent import BaseAgent
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+
+from backend.app.agents.batch_solver import SOLVER_GREEDY
+from backend.app.agents.local_transport import LocalTransport, TRANSPORT_CEYLON
+from backend.app.agents.scheduling_playground import SchedulingPlayground
+from backend.app.database import Base, DATABASE_URL, SessionLocal, async_engine, engine
+from backend.app.main import app
+from backend.app.models.meeting import Meeting, ScheduledSlot
+from backend.app.models.scheduling_run import SchedulingRun
+from backend.app.services.schedule_version import bump_schedule_version
+from backend.app.services.scheduling_runs import RUN_COMPLETED, RUN_FAILED
+from backend.benchmarks.workload import PRESETS, Workload, WorkloadSpec, build_agents, build_meetings, generate, populate
+
+# Lower is better for these; a scenario scheduling fewer meetings is also a regression
+METRICS = ("p50_ms", "p95_ms", "failures", "messages", "message_kib", "queries", "peak_mib")
+# Seconds a playground run may overrun its deadline while it stops its agents
+STOP_SLACK = 15
+# Differences this small are noise whatever the relative change
+ABSOLUTE_SLACK = {"p50_ms": 2.0, "p95_ms": 2.0, "failures": 1, "message_kib": 1.0, "queries": 2, "peak_mib": 0.5}
+
+overrides = {
+    spec_field.name: getattr(args, spec_field.name)
+    for spec_field in fields(WorkloadSpec)
+    if getattr(args, spec_field.name, None) is not None
+}
+specs = {preset: replace(PRESETS[preset], **overrides) for preset in args.preset}
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+@contextmanager
+def instrumented():
+    """Count agent messages and database queries and trace memory while active."""
+    counts = Counter()
+    send_message, broadcast_message = BaseAgent.send_message, BaseAgent.broadcast_message
+    local_send = LocalTransport.send
+
+    def record(message):
+        counts["messages"] += 1
+        counts["message_bytes"] += len(message) if isinstance(message, bytes) else len(pickle.dumps(message))
+
+    async def counted_send(self, peer_id, message):
+        record(message)
+        await send_message(self, peer_id, message)
+
+    async def counted_broadcast(self, message):
+        record(message)
+        await broadcast_message(self, message)
+
+    async def counted_local_send(self, sender, peer_id, message):
+        counts["messages"] += 1
+        await local_send(self, sender, peer_id, message)
+
+    def count_query(*_):
+        counts["queries"] += 1
+
+    engines = (engine, async_engine.sync_engine)
+    for counted in engines:
+        event.listen(counted, "before_cursor_execute", count_query)
+    BaseAgent.send_message, BaseAgent.broadcast_message = counted_send, counted_broadcast
+    LocalTransport.send = counted_local_send
+    tracemalloc.start()
+    try:
+        yield counts
+    finally:
+        counts["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        BaseAgent.send_message, BaseAgent.broadcast_message = send_message, broadcast_message
+        LocalTransport.send = local_send
+        for counted in engines:
+            event.remove(counted, "before_cursor_execute", count_query)
+
+
+def summarize(latencies: List[float], counts: Counter, scheduled: int, failures: int = 0) -> Dict:
+    def milliseconds(value):
+        return round(value * 1000, 2) if latencies else None
+
+    return {
+        "p50_ms": milliseconds(latencies and percentile(latencies, 0.5)),
+        "p95_ms": milliseconds(latencies and percentile(latencies, 0.95)),
+        "max_ms": milliseconds(latencies and max(latencies)),
+        "failures": failures,
+        "messages": counts["messages"],
+        "message_kib": round(counts["message_bytes"] / 1024, 1),
+        "queries": counts["queries"],
+        "peak_mib": round(counts["peak_bytes"] / 2 ** 20, 2),
+        "scheduled": scheduled,
+    }
+
+
+def bench_playground(workload: Workload) -> Dict[str, Dict]:
+    async def schedule(port: int) -> int:
+        playground = SchedulingPlayground(port=port, solver_mode=SOLVER_GREEDY, transport=args.transport)
+        try:
+            results = await asyncio.wait_for(
+                playground.schedule_meetings(
+                    build_meetings(workload), build_agents(workload), timeout=args.run_timeout
+                ),
+                args.run_timeout + STOP_SLACK
+            )
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"Playground run did not finish in {args.run_timeout:.0f}s")
+        except RuntimeError as e:
+            # Ceylon gives up after 30 s when agents do not connect and never yields the playground
+            raise RuntimeError(f"Agents did not connect: {e}")
+        if playground.unresponsive:
+            raise RuntimeError(f"{len(playground.unresponsive)} agents never answered")
+        timed_out = sum(result.timed_out for result in results.values())
+        if timed_out:
+            raise RuntimeError(f"{timed_out} meetings timed out waiting for agent messages")
+        return sum(result.scheduled for result in results.values())
+
+    latencies, failures, scheduled = [], 0, 0
+    for i in range(args.repeats):
+        started = time.perf_counter()
+        try:
+            scheduled = asyncio.run(schedule(args.port + i))
+        except RuntimeError as e:
+            # Ceylon can fail to connect every agent or lose a message; count it as a failed run
+            print(f"playground repeat {i} failed: {e}", flush=True)
+            failures += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    with instrumented() as counts:
+        try:
+            asyncio.run(schedule(args.port + args.repeats))
+        except RuntimeError as e:
+            print(f"instrumented playground run failed: {e}", flush=True)
+    return {"playground": summarize(latencies, counts, scheduled, failures)}
+
+
+def reset_database(workload: Workload):
+    db = SessionLocal()
+    try:
+        for table in reversed(Base.metadata.sorted_tables):
+            db.execute(table.delete())
+        db.commit()
+        populate(db, workload)
+    finally:
+        db.close()
+
+
+def clear_schedule():
+    """Unschedule every meeting so the next run does the same work."""
+    db = SessionLocal()
+    try:
+        # A run left unfinished by a failed repeat would be requeued at startup
+        db.query(SchedulingRun).delete(synchronize_session=False)
+        db.query(Meeting).update({Meeting.scheduled_slot_id: None}, synchronize_session=False)
+        db.query(ScheduledSlot).delete(synchronize_session=False)
+        bump_schedule_version(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_http(client: TestClient, waiter) -> Tuple[float, int]:
+    """Queue a run and wait for the worker to finish it; returns latency and meetings scheduled."""
+    started = time.perf_counter()
+    response = client.post("/scheduling/run")
+    assert response.status_code == 202, response.text
+    run_id = response.json()["id"]
+
+    # Wait on a separate engine so polling adds no queries to the app's count
+    with waiter.connect() as connection:
+        while connection.exec_driver_sql(
+            "SELECT status FROM scheduling_runs WHERE id = ?", (run_id,)
+        ).scalar() not in (RUN_COMPLETED, RUN_FAILED):
+            if time.perf_counter() - started > args.run_timeout:
+                raise RuntimeError(f"Scheduling run {run_id} did not finish in {args.run_timeout:.0f}s")
+            time.sleep(0.002)
+    elapsed = time.perf_counter() - started
+
+    run = client.get(f"/scheduling/runs/{run_id}").json()
+    if run["status"] == RUN_FAILED:
+        raise RuntimeError(f"Scheduling run failed: {run['error']}")
+    if run["timed_out_meeting_ids"]:
+        # Partial results after a lost message are not comparable with full runs
+        raise RuntimeError(f"{len(run['timed_out_meeting_ids'])} meetings timed out waiting for agent messages")
+    return elapsed, run["scheduled_meetings"]
+
+
+def time_status(client: TestClient, requests: int) -> List[float]:
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get("/scheduling/status")
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+    return latencies
+
+
+def bench_http(workload: Workload) -> Dict[str, Dict]:
+    reset_database(workload)
+    waiter = create_engine(DATABASE_URL)
+    latencies, status_latencies, failures, scheduled = [], [], 0, 0
+    try:
+        # Every repeat starts the app afresh. Entering the client starts the
+        # worker and resident playground, and leaving it drops agents that
+        # still hold bookings from the previous run.
+        for i in range(args.repeats):
+            clear_schedule()
+            with TestClient(app) as client:
+                try:
+                    elapsed, scheduled = run_http(client, waiter)
+                except RuntimeError as e:
+                    print(f"http repeat {i} failed: {e}", flush=True)
+                    failures += 1
+                    continue
+                latencies.append(elapsed)
+                status_latencies.extend(time_status(client, args.status_requests))
+
+        clear_schedule()
+        with TestClient(app) as client:
+            with instrumented() as run_counts:
+                try:
+                    run_http(client, waiter)
+                except RuntimeError as e:
+                    print(f"instrumented http run failed: {e}", flush=True)
+            with instrumented() as status_counts:
+                time_status(client, 1)
+    finally:
+        waiter.dispose()
+    return {
+        "http": summarize(latencies, run_counts, scheduled, failures),
+        "http-status": summarize(status_latencies, status_counts, scheduled),
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict) -> List[str]:
+    """Describe every metric that regressed against the baseline."""
+    regressions = []
+    for key, result in results.items():
+        preset = key.split("/")[0]
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            continue
+        if baseline["presets"].get(preset) != asdict(specs[preset]):
+            print(f"{key}: workload differs from the baseline, not compared")
+            continue
+        for metric in METRICS:
+            if base.get(metric) is None or result[metric] is None:
+                continue
+            limit = base[metric] * (1 + args.tolerance)
+            if result[metric] > limit and result[metric] - base[metric] > ABSOLUTE_SLACK.get(metric, 0):
+                regressions.append(f"{key} {metric}: {base[metric]} -> {result[metric]}")
+        if result["scheduled"] < base.get("scheduled", 0):
+            regressions.append(f"{key} scheduled: {base['scheduled']} -> {result['scheduled']}")
+    return regressions
+
+
+SCENARIOS: Dict[str, Callable[[Workload], Dict[str, Dict]]] = {
+    "playground": bench_playground,
+    "http": bench_http,
+}
+
+
+def main() -> int:
+    results = {}
+    print(
+        f"{'preset':>8} {'scenario':>17} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'failed':>6} "
+        f"{'messages':>9} {'msg KiB':>8} {'queries':>8} {'peak MiB':>9} {'scheduled':>10}"
+    )
+    for preset in args.preset:
+        workload = generate(specs[preset])
+        for scenario in args.scenario:
+            for name, result in SCENARIOS[scenario](workload).items():
+                if args.transport != TRANSPORT_CEYLON:
+                    name = f"{name}-{args.transport}"
+                results[f"{preset}/{name}"] = result
+                latency = " ".join(
+                    f"{result[metric]:>9.1f}" if result[metric] is not None else f"{'-':>9}"
+                    for metric in ("p50_ms", "p95_ms", "max_ms")
+                )
+                print(
+                    f"{preset:>8} {name:>17} {latency} {result['failures']:>6} {result['messages']:>9} "
+                    f"{result['message_kib']:>8.1f} {result['queries']:>8} {result['peak_mib']:>9.2f} "
+                    f"{result['scheduled']:>10}",
+                    flush=True
+                )
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    regressions = compare(results, baseline)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+
+    if args.save:
+        baseline.setdefault("presets", {}).update({preset: asdict(spec) for preset, spec in specs.items()})
+        baseline.setdefault("results", {}).update(results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+    return 1 if regressions and not args.save else 0
+
+
+if __name__ == "__main__":
+    try:
+        status = main()
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(database_path + suffix):
+                os.remove(database_path + suffix)
+    sys.exit(status)
@@ -0,0 +1,134 @@
+"""
+Synthetic organisations for the benchmark suite.
+
+A workload is fully determined by its spec, seed included, so every run of
+the suite schedules the same participants, free time and meetings.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+import datetime
+import random
+
+from sqlalchemy.orm import Session
+
+from backend.app.agents.interval_index import IntervalIndex
+from backend.app.agents.participant_agent import ParticipantAgent
+from backend.app.agents.scheduling_playground import Meeting as AgentMeeting
+from backend.app.models.meeting import Meeting, MeetingParticipant
+from backend.app.models.participant import Participant
+from backend.app.models.time_slot import TimeSlot
+
+FIRST_DATE = datetime.date(2024, 7, 1)
+
+
+@dataclass
+class WorkloadSpec:
+    participants: int = 50
+    slots_per_participant: int = 2  # Free slots per participant per day with free time
+    meetings: int = 30
+    invitees: int = 4               # Participants invited to each meeting
+    density: float = 0.8            # Share of days on which a participant has any free time
+    days: int = 5
+    window_days: int = 1            # Dates each meeting may be scheduled on
+    duration: int = 1               # Meeting length in hours
+    seed: int = 7
+
+
+# Ceylon gives agents 30 seconds to connect to a playground, which here
+# holds a run to about fifty participants, so larger presets add meetings,
+# dates and search windows rather than people.
+PRESETS: Dict[str, WorkloadSpec] = {
+    "small": WorkloadSpec(participants=20, meetings=15, invitees=3, days=3),
+    "medium": WorkloadSpec(),
+    "large": WorkloadSpec(meetings=150, invitees=6, days=10, window_days=3),
+}
+
+
+@dataclass
+class Workload:
+    spec: WorkloadSpec
+    names: List[str] = field(default_factory=list)
+    # Per participant: (date, start minute, end minute) of each free slot
+    slots: List[List[Tuple[str, int, int]]] = field(default_factory=list)
+    # Per meeting: (first date, last date, invited participant indexes)
+    meetings: List[Tuple[str, str, List[int]]] = field(default_factory=list)
+
+    @property
+    def minimum_participants(self) -> int:
+        return max(2, self.spec.invitees // 2)
+
+
+def generate(spec: WorkloadSpec) -> Workload:
+    """Build the participants, free time and meetings described by a spec."""
+    rng = random.Random(spec.seed)
+    dates = [(FIRST_DATE + datetime.timedelta(days=day)).isoformat() for day in range(spec.days)]
+    workload = Workload(spec=spec, names=[f"participant_{i}" for i in range(spec.participants)])
+
+    for _ in range(spec.participants):
+        slots = []
+        for date in dates:
+            if rng.random() >= spec.density:
+                continue
+            for _ in range(spec.slots_per_participant):
+                start = rng.randrange(8 * 4, 17 * 4) * 15
+                slots.append((date, start, min(start + rng.choice((60, 90, 120, 180)), 20 * 60)))
+        workload.slots.append(slots)
+
+    for _ in range(spec.meetings):
+        first = rng.randrange(max(spec.days - spec.window_days, 0) + 1)
+        last = min(first + spec.window_days, spec.days) - 1
+        invited = rng.sample(range(spec.participants), min(spec.invitees, spec.participants))
+        workload.meetings.append((dates[first], dates[last], invited))
+    return workload
+
+
+def build_agents(workload: Workload) -> List[ParticipantAgent]:
+    return [
+        ParticipantAgent(name=name, free_time=IntervalIndex.from_intervals(slots), participant_id=i + 1)
+        for i, (name, slots) in enumerate(zip(workload.names, workload.slots))
+    ]
+
+
+def build_meetings(workload: Workload) -> List[AgentMeeting]:
+    return [
+        AgentMeeting(
+            name=f"meeting_{i}",
+            date=first,
+            date_to=None if last == first else last,
+            duration=workload.spec.duration,
+            minimum_participants=workload.minimum_participants,
+            participants=[workload.names[j] for j in invited]
+        )
+        for i, (first, last, invited) in enumerate(workload.meetings)
+    ]
+
+
+def populate(db: Session, workload: Workload):
+    """Insert the workload into an empty database; participant and meeting ids start at 1."""
+    db.bulk_insert_mappings(Participant, [
+        {"id": i + 1, "name": name, "email": f"{name}@example.com", "is_active": True}
+        for i, name in enumerate(workload.names)
+    ])
+    db.bulk_insert_mappings(TimeSlot, [
+        {"participant_id": i + 1, "date": datetime.date.fromisoformat(date), "start_minute": start, "end_minute": end}
+        for i, slots in enumerate(workload.slots)
+        for date, start, end in slots
+    ])
+    db.bulk_insert_mappings(Meeting, [
+        {
+            "id": i + 1,
+            "name": f"meeting_{i}",
+            "date": datetime.date.fromisoformat(first),
+            "date_to": None if last == first else datetime.date.fromisoformat(last),
+            "duration": workload.spec.duration,
+            "minimum_participants": workload.minimum_participants
+        }
+        for i, (first, last, _) in enumerate(workload.meetings)
+    ])
+    db.bulk_insert_mappings(MeetingParticipant, [
+        {"meeting_id": i + 1, "participant_id": j + 1}
+        for i, (_, _, invited) in enumerate(workload.meetings)
+        for j in invited
+    ])
+    db.commit()
+
@@ -0,0 +1,47 @@
+"""Helpers that drive the scheduler through the HTTP API."""
+import time
+from typing import List, Optional
+
+from fastapi.testclient import TestClient
+
+DATE = "2024-07-22"
+
+
+def add_participant(client: TestClient, name: str, start_time: float = 9, end_time: float = 12,
+                    date: str = DATE, email: Optional[str] = None) -> int:
+    response = client.post("/participants/", json={"name": name, "email": email or f"{name.lower()}@example.com"})
+    assert response.status_code == 200, response.text
+    participant_id = response.json()["id"]
+    response = client.post(f"/participants/{participant_id}/timeslots", json={
+        "date": date, "start_time": start_time, "end_time": end_time, "participant_id": participant_id
+    })
+    assert response.status_code == 200, response.text
+    return participant_id
+
+
+def add_meeting(client: TestClient, name: str, participant_ids: List[int], duration: int = 1,
+                minimum_participants: int = 2, date: str = DATE) -> int:
+    response = client.post("/meetings/", json={
+        "name": name, "date": date, "duration": duration,
+        "minimum_participants": minimum_participants, "participant_ids": participant_ids
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def run_scheduler(client: TestClient, timeout: float = 30) -> dict:
+    """Queue a full scheduling run and wait until the worker finishes it."""
+    response = client.post("/scheduling/run")
+    assert response.status_code == 202, response.text
+    run_id = response.json()["id"]
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        run = client.get(f"/scheduling/runs/{run_id}").json()
+        if run["status"] in ("completed", "failed"):
+            return run
+        time.sleep(0.05)
+    raise AssertionError(f"Scheduling run {run_id} did not finish in {timeout}s")
+
+
+def scheduled_slot(client: TestClient, meeting_id: int) -> dict:
+    return client.get(f"/meetings/{meeting_id}").json()["scheduled_slot"]
@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+# The app reads its configuration at import time
+_fd, DATABASE_PATH = tempfile.mkstemp(suffix=".db")
+os.close(_fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+os.environ["SCHEDULER_TRANSPORT"] = "local"
+os.environ["SCHEDULER_POLL_INTERVAL"] = "0.05"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.database import Base, SessionLocal
+from backend.app.main import app
+from backend.app.services.availability_cache import availability_cache
+from backend.app.services.resident_scheduler import resident
+
+
+@pytest.fixture
+def database():
+    """An empty database for each test."""
+    db = SessionLocal()
+    try:
+        for table in reversed(Base.metadata.sorted_tables):
+            db.execute(table.delete())
+        db.commit()
+    finally:
+        db.close()
+    # Ids are reused once the tables are empty
+    availability_cache.clear()
+    yield
+
+
+@pytest.fixture(params=[False, True], ids=["per-run", "resident"])
+def start_app(request, database, monkeypatch):
+    """Start the app with or without the resident playground; the returned context starts it again."""
+    monkeypatch.setattr(resident, "enabled", request.param)
+    return lambda: TestClient(app)
+
+
+@pytest.fixture
+def client(start_app):
+    with start_app() as client:
+        yield client
+
+
+def pytest_sessionfinish(session, exitstatus):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DATABASE_PATH + suffix):
+            os.remove(DATABASE_PATH + suffix)
@@ -0,0 +1,56 @@
+import datetime
+import random
+
+import pytest
+
+from backend.app.agents import availability
+from backend.app.agents.availability import AvailabilityBitmap
+from backend.app.agents.participant_agent import TimeSlot
+
+DATES = [(datetime.date(2024, 7, 22) + datetime.timedelta(days=day)).isoformat() for day in range(7)]
+
+
+def random_bitmap(seed: int) -> AvailabilityBitmap:
+    rng = random.Random(seed)
+    bitmap = AvailabilityBitmap()
+    for i in range(30):
+        bitmap.add_participant(f"p{i}")
+        for date in DATES:
+            # Some days are fully booked, others have overlapping slots
+            for _ in range(rng.choice((0, 1, 2, 4))):
+                start = rng.randrange(7 * 2, 19 * 2) / 2
+                bitmap.add_slot(f"p{i}", TimeSlot(date=date, start_time=start, end_time=start + rng.choice((0.5, 1, 3))))
+    return bitmap
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sweep_and_probe_find_the_same_windows(seed, monkeypatch):
+    bitmap = random_bitmap(seed)
+    rng = random.Random(seed)
+    searches = [
+        (bitmap.mask_for(f"p{i}" for i in rng.sample(range(30), invitees)), duration, minimum, window)
+        for invitees in (2, 6, 20)
+        for duration in (0.5, 1.5)
+        for minimum in (1, 2, 5)
+        for window in ((9, 17), (8.5, 12))
+    ]
+
+    def search(ratio):
+        monkeypatch.setattr(availability, "PROBE_RATIO", ratio)
+        return [
+            bitmap.window_candidates(DATES, duration, invited, minimum, *window)
+            for invited, duration, minimum, window in searches
+        ]
+
+    swept = search(0)
+    assert any(swept)
+    assert search(1000) == swept
+    assert search(3) == swept
+
+
+@pytest.mark.parametrize("window, step", [((9.1, 17), 0.5), ((9, 16.9), 0.5), ((9, 17), 0.1)])
+def test_windows_off_the_cell_grid_are_rejected(window, step):
+    # Sweep and probe only agree when starts and run edges share the cell grid
+    bitmap = random_bitmap(0)
+    with pytest.raises(ValueError):
+        bitmap.window_candidates(DATES, 1, bitmap.mask_for(["p0", "p1"]), 1, *window, step)
@@ -0,0 +1,39 @@
+import time
+
+from backend.app.agents.availability import AvailabilityBitmap
+from backend.app.agents.batch_solver import BatchSolver, SOLVER_EXACT, SOLVER_GREEDY
+from backend.app.agents.participant_agent import TimeSlot
+from backend.app.agents.scheduling_playground import Meeting
+
+DATE = "2024-07-22"
+
+
+def pair_busy_day(count: int):
+    availability = AvailabilityBitmap()
+    for name in ("a", "b"):
+        availability.add_participant(name, [TimeSlot(date=DATE, start_time=9, end_time=17)])
+    meetings = {
+        str(i): Meeting(name=f"m{i}", date=DATE, duration=1, minimum_participants=2, participants=["a", "b"])
+        for i in range(count)
+    }
+    return availability, meetings, {meeting_id: {"a", "b"} for meeting_id in meetings}
+
+
+def test_exact_solver_schedules_a_feasible_day():
+    availability, meetings, invitees = pair_busy_day(8)
+    result = BatchSolver(availability).solve(meetings, invitees, mode=SOLVER_EXACT)
+    assert result.mode == SOLVER_EXACT
+    assert len(result.assignments) == 8
+    starts = sorted(assignment.time_slot.start_time for assignment in result.assignments.values())
+    assert all(later - earlier >= 1 for earlier, later in zip(starts, starts[1:]))
+
+
+def test_exact_solver_falls_back_to_greedy_on_infeasible_instances():
+    # More one-hour meetings than the day holds used to backtrack for minutes
+    availability, meetings, invitees = pair_busy_day(12)
+    started = time.perf_counter()
+    result = BatchSolver(availability).solve(meetings, invitees, mode=SOLVER_EXACT)
+    assert time.perf_counter() - started < 5
+    assert result.mode == SOLVER_GREEDY
+    assert len(result.assignments) == 8
+    assert len(result.unscheduled) == 4
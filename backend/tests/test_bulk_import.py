@@ -0,0 +1,118 @@
+import time
+
+from sqlalchemy import text
+
+from backend.app.database import SessionLocal
+from backend.app.models.participant import Participant
+from backend.app.models.time_slot import TimeSlot
+from backend.app.schemas.bulk_import import ImportResult
+from backend.app.services.bulk_import import import_chunk
+from backend.app.services.resident_scheduler import resident
+from backend.app.services.scheduling_inputs import agent_name
+from backend.tests.api import DATE
+
+
+def upload(client, body: str, format: str = "csv") -> dict:
+    response = client.post("/participants/import", params={"format": format}, content=body.encode())
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def counts():
+    db = SessionLocal()
+    try:
+        return db.query(Participant).count(), db.query(TimeSlot).count()
+    finally:
+        db.close()
+
+
+def test_invalid_rows_are_reported_and_valid_rows_imported(client):
+    result = upload(client, "\n".join([
+        "name,email,date,start_time,end_time",
+        f"Alice,alice@example.com,{DATE},9,12",
+        "Bob,not-an-email,,,",
+        f"Carol,carol@example.com,{DATE},9,",
+        f"Dave,dave@example.com,{DATE},12,9",
+        "Erin,erin@example.com,,,,extra",
+        "Frank,frank@example.com,,,",
+    ]))
+
+    assert result["rows"] == 6
+    assert result["imported_rows"] == 2
+    assert result["participants_created"] == 2
+    assert result["time_slots_created"] == 1
+    assert [error["line"] for error in result["errors"]] == [3, 4, 5, 6]
+    assert counts() == (2, 1)
+
+
+def test_duplicate_emails_share_one_participant(client):
+    response = client.post("/participants/", json={"name": "Alice", "email": "alice@example.com"})
+    assert response.status_code == 200
+    result = upload(client, "\n".join([
+        f'{{"name": "Alice", "email": "alice@example.com", "date": "{DATE}", "start_time": 9, "end_time": 10}}',
+        f'{{"name": "Bob", "email": "bob@example.com", "date": "{DATE}", "start_time": 9, "end_time": 10}}',
+        f'{{"name": "Bobby", "email": "bob@example.com", "date": "{DATE}", "start_time": 14, "end_time": 15}}',
+    ]), format="ndjson")
+
+    assert result["imported_rows"] == 3
+    assert result["participants_created"] == 1
+    assert result["time_slots_created"] == 3
+    assert result["errors"] == []
+    assert counts() == (2, 3)
+
+
+def test_database_error_fails_the_whole_chunk(database):
+    db = SessionLocal()
+    try:
+        # Fails the chunk after its participants were inserted
+        db.execute(text(
+            "CREATE TRIGGER reject_slot BEFORE INSERT ON time_slots WHEN NEW.start_minute = 0 "
+            "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+        ))
+        db.commit()
+        result = ImportResult()
+        created, updated = {}, {}
+
+        import_chunk(db, [
+            (1, {"name": "Alice", "email": "alice@example.com", "date": DATE, "start_time": 9, "end_time": 10}),
+            (2, {"name": "Bob", "email": "bob@example.com", "date": DATE, "start_time": 0, "end_time": 1}),
+            (3, {"name": "Carol", "email": "not-an-email"}),
+        ], result, created, updated)
+        assert result.imported_rows == 0
+        assert result.participants_created == 0
+        errors = {error.line: error.error for error in result.errors}
+        # The valid row on line 1 fails with the chunk, the invalid one as before
+        assert errors[1] == errors[2] == "Database error occurred"
+        assert errors[3].startswith("email")
+        assert counts() == (0, 0)
+
+        # Later chunks are unaffected
+        import_chunk(db, [
+            (4, {"name": "Alice", "email": "alice@example.com", "date": DATE, "start_time": 9, "end_time": 10}),
+        ], result, created, updated)
+        assert result.imported_rows == 1
+        assert counts() == (1, 1)
+        # Only participants that were committed are announced
+        assert list(created.values()) == ["Alice"]
+    finally:
+        db.execute(text("DROP TRIGGER IF EXISTS reject_slot"))
+        db.commit()
+        db.close()
+
+
+def test_imported_participants_get_resident_agents(client):
+    upload(client, "\n".join([
+        "name,email,date,start_time,end_time",
+        f"Alice,alice@example.com,{DATE},9,12",
+        "Bob,bob@example.com,,,",
+    ]))
+    participants = client.get("/participants/").json()
+    names = [agent_name(participant["id"]) for participant in participants]
+    assert len(names) == 2
+    if not resident.enabled:
+        return
+
+    deadline = time.monotonic() + 5
+    while not resident.covers(names) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert resident.covers(names)
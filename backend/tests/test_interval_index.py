@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from backend.app.agents.interval_index import IntervalIndex
+
+DATE = "2024-07-22"
+
+
+def index_of(*intervals) -> IntervalIndex:
+    return IntervalIndex.from_intervals((DATE, start, end) for start, end in intervals)
+
+
+def test_building_merges_overlapping_and_touching_intervals():
+    index = index_of((600, 660), (540, 600), (630, 700), (800, 900), (900, 900))
+    assert index.intervals(DATE) == [(540, 700), (800, 900)]
+
+
+@pytest.mark.parametrize("added, expected", [
+    ((400, 500), [(400, 500), (540, 600), (660, 720)]),  # Before everything
+    ((600, 660), [(540, 720)]),                          # Touches both neighbours
+    ((590, 670), [(540, 720)]),                          # Overlaps both neighbours
+    ((560, 580), [(540, 600), (660, 720)]),              # Inside an interval
+    ((500, 800), [(500, 800)]),                          # Covers everything
+    ((720, 780), [(540, 600), (660, 780)]),              # Extends the last one
+    ((610, 650), [(540, 600), (610, 650), (660, 720)]),  # In the gap
+    ((700, 700), [(540, 600), (660, 720)]),              # Empty
+])
+def test_add_merges_with_the_intervals_it_touches(added, expected):
+    index = index_of((540, 600), (660, 720))
+    index.add(DATE, *added)
+    assert index.intervals(DATE) == expected
+
+
+@pytest.mark.parametrize("removed, expected", [
+    ((560, 580), [(540, 560), (580, 600), (660, 720)]),  # Splits an interval
+    ((540, 600), [(660, 720)]),                          # Exactly one interval
+    ((580, 680), [(540, 580), (680, 720)]),              # Trims both neighbours
+    ((600, 660), [(540, 600), (660, 720)]),              # Only the gap
+    ((500, 800), []),                                    # Everything
+    ((700, 700), [(540, 600), (660, 720)]),              # Empty
+])
+def test_remove_splits_and_trims_intervals(removed, expected):
+    index = index_of((540, 600), (660, 720))
+    index.remove(DATE, *removed)
+    assert index.intervals(DATE) == expected
+
+
+def test_queries_on_a_date_without_free_time():
+    index = index_of((540, 600))
+    assert not index.has_overlap("2024-07-23", 540, 600, 30)
+    assert not index.contains("2024-07-23", 540, 600)
+    assert index.free_cells("2024-07-23") == 0
+    index.remove(DATE, 540, 600)
+    assert index.dates() == []
+
+
+def test_contains_needs_a_single_interval():
+    index = index_of((540, 600), (600, 660), (700, 760))
+    assert index.contains(DATE, 540, 660)        # Merged on build
+    assert not index.contains(DATE, 650, 710)    # Spans a gap
+    assert not index.contains(DATE, 530, 560)
+
+
+def test_free_cells_only_counts_whole_cells():
+    index = index_of((545, 630), (1410, 1440))
+    # 9:00-9:30 is only partly free; 23:30-24:00 is the last cell of the day
+    assert index.free_cells(DATE, 30) == (1 << 19) | (1 << 20) | (1 << 47)
+
+
+def test_matches_a_minute_by_minute_model():
+    rng = random.Random(3)
+    for _ in range(200):
+        index, free = IntervalIndex(), set()
+        for _ in range(12):
+            start = rng.randrange(0, 1440, 5)
+            end = min(start + rng.randrange(0, 240, 5), 1440)
+            if rng.random() < 0.6:
+                index.add(DATE, start, end)
+                free.update(range(start, end))
+            else:
+                index.remove(DATE, start, end)
+                free.difference_update(range(start, end))
+
+        intervals = index.intervals(DATE)
+        assert {minute for start, end in intervals for minute in range(start, end)} == free
+        # Merged: sorted, disjoint and not touching
+        assert all(end < next_start for (_, end), (next_start, _) in zip(intervals, intervals[1:]))
+
+        start = rng.randrange(0, 1440, 5)
+        end = min(start + rng.randrange(5, 240, 5), 1440)
+        duration = rng.randrange(5, 60, 5)
+        assert index.contains(DATE, start, end) == (set(range(start, end)) <= free)
+        overlap = any(
+            set(range(max(a, start), min(b, end))) and min(b, end) - max(a, start) >= duration
+            for a, b in intervals
+        )
+        assert index.has_overlap(DATE, start, end, duration) == overlap
+        assert index.free_cells(DATE, 30) == sum(
+            1 << cell for cell in range(48) if set(range(cell * 30, cell * 30 + 30)) <= free
+        )
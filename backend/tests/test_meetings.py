@@ -0,0 +1,47 @@
+from backend.tests.api import DATE, add_participant
+
+
+def meeting(name: str, participant_ids, **fields) -> dict:
+    return {
+        "name": name, "date": DATE, "duration": 1, "minimum_participants": 2,
+        "participant_ids": participant_ids, **fields
+    }
+
+
+def test_batch_returns_created_meetings_in_request_order(client):
+    participant_ids = [add_participant(client, f"P{i}") for i in range(3)]
+
+    response = client.post("/meetings/batch", json=[
+        meeting("first", participant_ids[:2]),
+        # Unknown and repeated ids are skipped, as for single meetings
+        meeting("second", [participant_ids[2], 9999, participant_ids[2]], workday_start=10, workday_end=16),
+    ])
+
+    assert response.status_code == 200, response.text
+    first, second = response.json()
+    assert first["name"] == "first" and second["name"] == "second"
+    assert first["id"] < second["id"]
+    assert first["participants"] == participant_ids[:2]
+    assert second["participants"] == [participant_ids[2]]
+    assert (second["workday_start"], second["workday_end"]) == (10, 16)
+    assert first["scheduled_slot"] is None
+    assert client.get(f"/meetings/{second['id']}").json() == second
+
+
+def test_batch_with_an_invalid_meeting_creates_nothing(client):
+    participant_ids = [add_participant(client, f"P{i}") for i in range(2)]
+
+    response = client.post("/meetings/batch", json=[
+        meeting("valid", participant_ids),
+        meeting("invalid", participant_ids, date_to="2024-07-01"),
+    ])
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][:2] == ["body", 1]
+    assert client.get("/meetings/").json() == []
+
+
+def test_empty_batch_creates_nothing(client):
+    response = client.post("/meetings/batch", json=[])
+    assert response.status_code == 200
+    assert response.json() == []
@@ -0,0 +1,44 @@
+import time
+
+from backend.app.metrics import CONTENT_TYPE
+from backend.tests.api import add_meeting, add_participant, run_scheduler
+
+
+def read_metrics(client) -> dict:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE
+    samples = {}
+    for line in response.text.splitlines():
+        if line and not line.startswith("#"):
+            sample, value = line.rsplit(" ", 1)
+            samples[sample] = float(value)
+    return samples
+
+
+def test_runs_and_requests_are_measured(client):
+    # Metrics are process-wide, so earlier tests may have counted runs already
+    before = read_metrics(client)
+    alice = add_participant(client, "Alice")
+    bob = add_participant(client, "Bob")
+    add_meeting(client, "Sync", [alice, bob])
+    assert run_scheduler(client)["status"] == "completed"
+
+    expected = [
+        'scheduler_runs_total{status="completed"}',
+        'http_request_duration_seconds_count{method="POST",route="/scheduling/run",status="202"}',
+    ] + [f'scheduler_run_stage_seconds_count{{stage="{stage}"}}' for stage in ("load", "schedule", "write")]
+
+    def missing():
+        return [sample for sample in expected if after.get(sample, 0) <= before.get(sample, 0)]
+
+    # Runs are counted just after their status is stored, and adding the
+    # meeting may have queued a run of its own that is still scheduling it
+    deadline = time.monotonic() + 5
+    after = read_metrics(client)
+    while missing() and time.monotonic() < deadline:
+        time.sleep(0.05)
+        after = read_metrics(client)
+
+    assert missing() == []
+    assert after['http_request_duration_seconds_count{method="GET",route="/metrics",status="200"}'] >= 1
@@ -0,0 +1,78 @@
+import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from backend.app import migrations
+from backend.app.migrations import migrate
+
+# The schema the first release created, with dates as text and times as hours
+BASELINE_SCHEMA = [
+    "CREATE TABLE participants (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+    "email VARCHAR NOT NULL UNIQUE, is_active BOOLEAN)",
+    "CREATE TABLE time_slots (id INTEGER PRIMARY KEY, date VARCHAR NOT NULL, start_time INTEGER NOT NULL, "
+    "end_time INTEGER NOT NULL, participant_id INTEGER REFERENCES participants (id))",
+    "CREATE TABLE scheduled_slots (id INTEGER PRIMARY KEY, date VARCHAR NOT NULL, "
+    "start_time INTEGER NOT NULL, end_time INTEGER NOT NULL)",
+    "CREATE TABLE meetings (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, date VARCHAR NOT NULL, "
+    "duration INTEGER NOT NULL, minimum_participants INTEGER, "
+    "scheduled_slot_id INTEGER REFERENCES scheduled_slots (id))",
+    "CREATE TABLE meeting_participants (id INTEGER PRIMARY KEY, meeting_id INTEGER REFERENCES meetings (id), "
+    "participant_id INTEGER REFERENCES participants (id))",
+]
+BASELINE_ROWS = [
+    "INSERT INTO participants VALUES (1, 'Alice', 'alice@example.com', 1)",
+    "INSERT INTO time_slots VALUES (1, ' 2024-07-22', 9, 17, 1)",
+    "INSERT INTO scheduled_slots VALUES (1, '2024-07-22', 10, 11)",
+    "INSERT INTO meetings VALUES (1, 'sync', '2024-07-22 ', 1, 2, 1)",
+    "INSERT INTO meeting_participants VALUES (1, 1, 1)",
+]
+
+
+@pytest.fixture
+def baseline_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA + BASELINE_ROWS:
+            connection.execute(text(statement))
+    yield engine
+    engine.dispose()
+
+
+def test_baseline_database_migrates_in_place(baseline_engine):
+    migrate(baseline_engine)
+
+    inspector = inspect(baseline_engine)
+    for table in ("time_slots", "scheduled_slots"):
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        assert {"start_minute", "end_minute"} <= columns
+        assert not {"start_time", "end_time"} & columns
+    assert "business_days" in {column["name"] for column in inspector.get_columns("meetings")}
+    assert "ix_time_slots_participant_date_start" in {index["name"] for index in inspector.get_indexes("time_slots")}
+
+    with baseline_engine.connect() as connection:
+        assert connection.execute(text("SELECT date, start_minute, end_minute FROM time_slots")).one() == \
+            ("2024-07-22", 540, 1020)
+        assert connection.execute(text("SELECT date, start_minute, end_minute FROM scheduled_slots")).one() == \
+            ("2024-07-22", 600, 660)
+        assert connection.execute(text("SELECT date, business_days FROM meetings")).one() == ("2024-07-22", 0)
+
+
+def test_migration_is_idempotent(baseline_engine):
+    migrate(baseline_engine)
+    with baseline_engine.connect() as connection:
+        before = connection.execute(text("SELECT * FROM time_slots")).all()
+
+    migrate(baseline_engine)
+
+    with baseline_engine.connect() as connection:
+        assert connection.execute(text("SELECT * FROM time_slots")).all() == before
+
+
+def test_sqlite_without_drop_column_is_refused(baseline_engine, monkeypatch):
+    monkeypatch.setattr(migrations, "SQLITE_MIN_VERSION", (99, 0, 0))
+    with pytest.raises(RuntimeError, match="SQLite 99.0.0"):
+        migrate(baseline_engine)
+    # Nothing was converted
+    columns = {column["name"] for column in inspect(baseline_engine).get_columns("time_slots")}
+    assert {"start_time", "end_time"} <= columns
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from backend.app.agents.batch_solver import SOLVER_GREEDY
+from backend.app.agents.local_transport import TRANSPORT_LOCAL
+from backend.app.agents.partition import PartitionedSolver
+from backend.app.agents.scheduling_playground import Meeting, SchedulingPlayground
+from backend.app.agents.snapshot import AvailabilitySnapshot
+
+DATE = "2024-07-22"
+FREE_TIME = {
+    "a": [(540, 720)],
+    "b": [(600, 780)],
+    "c": [(780, 960)],
+    "d": [(540, 600), (840, 960)],
+}
+
+
+def make_snapshot() -> AvailabilitySnapshot:
+    snapshot = AvailabilitySnapshot(dates=[DATE])
+    for participant_id, (name, intervals) in enumerate(FREE_TIME.items(), start=1):
+        snapshot.participant_ids.append(participant_id)
+        snapshot.names.append(name)
+        for start, end in intervals:
+            snapshot.slot_dates.append(0)
+            snapshot.slot_starts.append(start)
+            snapshot.slot_ends.append(end)
+        snapshot.slot_offsets.append(len(snapshot.slot_starts))
+    return snapshot
+
+
+def meeting(name: str, participants, minimum_participants: int = 2) -> Meeting:
+    return Meeting(name=name, date=DATE, duration=1, minimum_participants=minimum_participants,
+                   participants=participants)
+
+
+def outcomes(results):
+    return {
+        meeting_id: (result.time_slot, sorted(result.participants)) if result.scheduled else None
+        for meeting_id, result in results.items()
+    }
+
+
+# Inviting everyone joins all meetings into one cluster
+@pytest.mark.parametrize("invite_everyone", [False, True])
+def test_partitioned_results_match_the_playground(invite_everyone):
+    meetings = [
+        meeting("ab", ["a", "b"]),
+        meeting("ab again", ["a", "b"]),
+        meeting("cd", ["c", "d"]),
+        # Nobody is invited, which is not the same as inviting everyone
+        meeting("empty", [], minimum_participants=1),
+    ]
+    if invite_everyone:
+        meetings.append(meeting("everyone", None))
+    meeting_ids = [str(i) for i in range(len(meetings))]
+
+    solver = PartitionedSolver(2)
+    try:
+        partitioned = asyncio.run(solver.solve(meetings, meeting_ids, make_snapshot()))
+    finally:
+        solver.shutdown()
+
+    async def unpartitioned():
+        playground = SchedulingPlayground(solver_mode=SOLVER_GREEDY, transport=TRANSPORT_LOCAL)
+        return await playground.schedule_meetings(meetings, make_snapshot().build_agents(), meeting_ids)
+
+    expected = outcomes(asyncio.run(unpartitioned()))
+    assert outcomes(partitioned) == expected
+    assert expected["3"] is None
+    assert all(expected[meeting_id] is not None for meeting_id in meeting_ids if meeting_id != "3")
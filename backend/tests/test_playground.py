@@ -0,0 +1,146 @@
+import asyncio
+from typing import List
+
+import pytest
+from ceylon import on
+
+from backend.app.agents.batch_solver import SOLVER_GREEDY
+from backend.app.agents.local_transport import TRANSPORT_LOCAL
+from backend.app.agents.participant_agent import (
+    AvailabilityRequest, AvailabilityResponse, BatchAvailabilityRequest, ParticipantAgent, TimeSlot
+)
+from backend.app.agents.scheduling_playground import Meeting, SchedulingPlayground, SOLVER_NEGOTIATE
+
+DATE = "2024-07-22"
+
+
+class SilentAgent(ParticipantAgent):
+    """A participant whose agent never answers."""
+
+    @on(BatchAvailabilityRequest)
+    async def handle_batch_request(self, request: BatchAvailabilityRequest, time: int, agent):
+        pass
+
+    @on(AvailabilityRequest)
+    async def handle_request(self, request: AvailabilityRequest, time: int, agent):
+        pass
+
+
+class DecliningAgent(ParticipantAgent):
+    """A participant that is free on paper but turns every proposal down."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = []
+
+    @on(AvailabilityRequest)
+    async def handle_request(self, request: AvailabilityRequest, time: int, agent):
+        self.requests.append(request.request_id)
+        await self.send_message(agent.id, AvailabilityResponse(
+            meeting_id=request.meeting_id,
+            participant_id=self.participant_id,
+            time_slot=request.time_slot,
+            available=False,
+            request_id=request.request_id
+        ))
+
+
+def agent(name: str, start_time: float = 9, end_time: float = 12, agent_class=ParticipantAgent) -> ParticipantAgent:
+    return agent_class(name, [TimeSlot(DATE, start_time, end_time)])
+
+
+def schedule(meetings: List[Meeting], participants: List[ParticipantAgent], timeout=None, **options):
+    async def run():
+        playground = SchedulingPlayground(transport=TRANSPORT_LOCAL, **options)
+        results = await playground.schedule_meetings(meetings, participants, timeout=timeout)
+        return playground, results
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("options", [
+    {"solver_mode": SOLVER_GREEDY},
+    {"solver_mode": SOLVER_NEGOTIATE},
+], ids=["greedy", "negotiated"])
+def test_meetings_are_scheduled_without_overlap(options):
+    participants = [agent("Alice"), agent("Bob"), agent("Carol", 10, 12)]
+    meetings = [
+        Meeting("standup", DATE, 1, 2, participants=["Alice", "Bob"]),
+        Meeting("review", DATE, 1, 3, participants=["Alice", "Bob", "Carol"]),
+        Meeting("nobody", DATE, 1, 2, participants=[]),
+    ]
+
+    _, results = schedule(meetings, participants, **options)
+
+    standup, review, nobody = results["0"], results["1"], results["2"]
+    assert standup.scheduled and review.scheduled and not nobody.scheduled
+    assert sorted(review.participants) == ["Alice", "Bob", "Carol"]
+    assert 10 <= review.time_slot.start_time
+    assert (standup.time_slot.end_time <= review.time_slot.start_time
+            or review.time_slot.end_time <= standup.time_slot.start_time)
+    # Agents booked the meetings they attend
+    assert set(participants[0].scheduled_meetings) == {"0", "1"}
+    assert set(participants[2].scheduled_meetings) == {"1"}
+
+
+def test_default_playground_books_shared_invitees_once_per_slot():
+    participants = [agent("Alice"), agent("Bob")]
+    meetings = [Meeting(f"sync{i}", DATE, 1, 2, participants=["Alice", "Bob"]) for i in range(2)]
+
+    _, results = schedule(meetings, participants)
+
+    first, second = results["0"], results["1"]
+    assert first.scheduled and second.scheduled
+    assert (first.time_slot.end_time <= second.time_slot.start_time
+            or second.time_slot.end_time <= first.time_slot.start_time)
+
+
+def test_silent_agents_count_as_unavailable_after_the_response_timeout():
+    participants = [agent("Alice"), agent("Bob"), agent("Mute", agent_class=SilentAgent)]
+    meetings = [
+        Meeting("pair", DATE, 1, 2, participants=["Alice", "Bob"]),
+        Meeting("everyone", DATE, 1, 3),
+    ]
+
+    playground, results = schedule(meetings, participants, solver_mode=SOLVER_GREEDY, response_timeout=0.2)
+
+    assert playground.unresponsive == {"Mute"}
+    assert results["0"].scheduled
+    assert not results["1"].scheduled and not results["1"].timed_out
+
+
+def test_meetings_still_open_at_the_meeting_timeout_time_out():
+    participants = [agent("Alice"), agent("Mute", agent_class=SilentAgent)]
+    meetings = [Meeting("pair", DATE, 1, 2)]
+
+    _, results = schedule(meetings, participants, solver_mode=SOLVER_NEGOTIATE, meeting_timeout=0.2)
+
+    assert results["0"].timed_out and not results["0"].scheduled
+
+
+def test_batch_deadline_ends_negotiation():
+    participants = [agent("Alice"), agent("Mute", agent_class=SilentAgent)]
+    meetings = [Meeting("pair", DATE, 1, 2)]
+
+    _, results = schedule(meetings, participants, timeout=0.2, solver_mode=SOLVER_NEGOTIATE, response_timeout=5)
+
+    assert results["0"].timed_out
+
+
+def test_each_proposed_slot_is_decided_once():
+    decliners = [agent(f"No{i}", 9, 11, agent_class=DecliningAgent) for i in range(3)]
+    participants = [agent("Alice", 9, 11)] + decliners
+    meetings = [Meeting("sync", DATE, 1, 2)]
+
+    playground, results = schedule(meetings, participants, solver_mode=SOLVER_NEGOTIATE)
+
+    # 9:00, 9:30 and 10:00 are proposed once each, however many decline them
+    assert not results["0"].scheduled
+    assert results["0"].rounds == 3
+    for decliner in decliners:
+        assert decliner.requests == [1, 2, 3]
+    assert playground.polls == {}
+
+
+def test_unknown_solver_modes_are_rejected():
+    with pytest.raises(ValueError):
+        SchedulingPlayground(transport=TRANSPORT_LOCAL, solver_mode="fastest")
@@ -0,0 +1,97 @@
+import datetime
+import itertools
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from backend.app.database import SessionLocal, engine
+from backend.app.models.meeting import Meeting, MeetingParticipant, ScheduledSlot
+from backend.app.models.participant import Participant
+from backend.app.models.time_slot import TimeSlot
+from backend.app.services.scheduling_inputs import agent_name, load_snapshot
+
+DATE = datetime.date(2024, 7, 22)
+NEXT_DATE = datetime.date(2024, 7, 23)
+emails = (f"p{i}@example.com" for i in itertools.count())
+
+
+@contextmanager
+def counted_queries():
+    counts = {"queries": 0}
+
+    def count(*_):
+        counts["queries"] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        yield counts
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+
+def add_participants(db, count: int, is_active: bool = True):
+    participants = [
+        Participant(name="Same name", email=next(emails), is_active=is_active)
+        for _ in range(count)
+    ]
+    db.add_all(participants)
+    db.flush()
+    for participant in participants:
+        db.add_all([
+            TimeSlot(date=DATE, start_minute=540, end_minute=720, participant_id=participant.id),
+            TimeSlot(date=NEXT_DATE, start_minute=780, end_minute=900, participant_id=participant.id),
+        ])
+    db.commit()
+    return [participant.id for participant in participants]
+
+
+def book(db, participant_ids, start_minute: int, end_minute: int):
+    slot = ScheduledSlot(date=DATE, start_minute=start_minute, end_minute=end_minute)
+    db.add(slot)
+    db.flush()
+    meeting = Meeting(name="booked", date=DATE, duration=1, minimum_participants=2, scheduled_slot_id=slot.id)
+    db.add(meeting)
+    db.flush()
+    db.add_all(MeetingParticipant(meeting_id=meeting.id, participant_id=participant_id)
+               for participant_id in participant_ids)
+    db.commit()
+
+
+def test_snapshot_takes_out_booked_time(database):
+    db = SessionLocal()
+    try:
+        booked, free = add_participants(db, 2)
+        add_participants(db, 1, is_active=False)
+        book(db, [booked], 600, 660)
+
+        snapshot = load_snapshot(db)
+        assert list(snapshot.participant_ids) == [booked, free]
+        assert snapshot.names == [agent_name(booked), agent_name(free)]
+        assert list(snapshot.intervals(0)) == [
+            ("2024-07-22", 540, 600), ("2024-07-22", 660, 720), ("2024-07-23", 780, 900)
+        ]
+        assert list(snapshot.intervals(1)) == [("2024-07-22", 540, 720), ("2024-07-23", 780, 900)]
+
+        unbooked = load_snapshot(db, [booked], subtract_bookings=False)
+        assert list(unbooked.intervals(0)) == [("2024-07-22", 540, 720), ("2024-07-23", 780, 900)]
+    finally:
+        db.close()
+
+
+def test_snapshot_queries_do_not_grow_with_participants(database):
+    db = SessionLocal()
+    try:
+        participant_ids = add_participants(db, 3)
+        book(db, participant_ids[:2], 600, 660)
+        with counted_queries() as few:
+            assert len(load_snapshot(db, participant_ids)) == 3
+
+        participant_ids += add_participants(db, 40)
+        book(db, participant_ids[10:30], 660, 720)
+        with counted_queries() as many:
+            assert len(load_snapshot(db, participant_ids)) == 43
+
+        # Participants, their slots and their bookings
+        assert few["queries"] == many["queries"] == 3
+    finally:
+        db.close()
@@ -0,0 +1,258 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.agents.local_transport import TRANSPORT_CEYLON
+from backend.app.agents.participant_agent import TimeSlot
+from backend.app.agents.scheduling_playground import MeetingOutput, SOLVER_NEGOTIATE
+from backend.app.database import SessionLocal
+from backend.app.main import app
+from backend.app.models.meeting import Meeting, MeetingParticipant, ScheduledSlot
+from backend.app.models.participant import Participant
+from backend.app.models.scheduling_run import MeetingClaim, SchedulingRun
+from backend.app.models.time_slot import TimeSlot as DbTimeSlot
+from backend.app.services import resident_scheduler, scheduling_runs
+from backend.app.services.resident_scheduler import resident, ResidentScheduler
+from backend.app.services.schedule_version import bump_availability_version
+from backend.app.services.scheduling_inputs import agent_name
+from backend.app.services.scheduling_runs import finish_run, process_scheduling_results, RUN_RUNNING, start_run
+from backend.tests.api import DATE, add_meeting, add_participant, run_scheduler, scheduled_slot
+
+DATE_VALUE = date.fromisoformat(DATE)
+
+
+def overlaps(first: dict, second: dict) -> bool:
+    return (first["date"] == second["date"]
+            and first["start_time"] < second["end_time"] and second["start_time"] < first["end_time"])
+
+
+def test_later_run_does_not_double_book(start_app):
+    with start_app() as client:
+        participant_ids = [add_participant(client, f"P{i}") for i in range(3)]
+        first = add_meeting(client, "m0", participant_ids, minimum_participants=3)
+        assert run_scheduler(client)["scheduled_meetings"] == 1
+
+    # A fresh app only knows the first booking from the database
+    with start_app() as client:
+        late = add_meeting(client, "late", participant_ids, minimum_participants=3)
+        run = run_scheduler(client)
+        assert run["status"] == "completed"
+        assert run["scheduled_meetings"] == 1
+        assert not overlaps(scheduled_slot(client, first), scheduled_slot(client, late))
+
+
+def test_runs_without_free_time_left_leave_meetings_unscheduled(client):
+    participant_ids = [add_participant(client, f"P{i}", start_time=9, end_time=10) for i in range(2)]
+    first = add_meeting(client, "first", participant_ids)
+    assert run_scheduler(client)["scheduled_meetings"] == 1
+
+    second = add_meeting(client, "second", participant_ids)
+    run = run_scheduler(client)
+    assert run["status"] == "completed"
+    assert run["scheduled_meetings"] == 0
+    assert scheduled_slot(client, first) is not None
+    assert scheduled_slot(client, second) is None
+
+
+def test_participants_sharing_a_name_are_scheduled_apart(client):
+    afternoon = add_participant(client, "Alice", start_time=13, end_time=16, email="alice@example.com")
+    morning = add_participant(client, "Alice", start_time=9, end_time=12, email="alice.b@example.com")
+    bob = add_participant(client, "Bob", start_time=9, end_time=16)
+    afternoon_meeting = add_meeting(client, "m0", [afternoon, bob])
+    morning_meeting = add_meeting(client, "m1", [morning, bob])
+
+    assert run_scheduler(client)["scheduled_meetings"] == 2
+    assert scheduled_slot(client, afternoon_meeting)["start_time"] == 13
+    assert scheduled_slot(client, morning_meeting)["start_time"] == 9
+
+
+def test_writing_results_again_changes_nothing(client):
+    participant_ids = [add_participant(client, f"P{i}") for i in range(2)]
+    meeting_ids = [add_meeting(client, f"m{i}", participant_ids) for i in range(6)]
+    # Listed out of id order, each meeting with its own start time
+    results = {
+        str(meeting_id): MeetingOutput(
+            meeting_id=str(meeting_id), name=f"m{i}", scheduled=i != 3,
+            time_slot=TimeSlot(DATE, 9 + i, 10 + i) if i != 3 else None
+        )
+        for i, meeting_id in reversed(list(enumerate(meeting_ids)))
+    }
+
+    db = SessionLocal()
+    try:
+        assert process_scheduling_results(db, results) == 5
+        assert process_scheduling_results(db, results) == 0
+        assert db.query(ScheduledSlot).count() == 5
+    finally:
+        db.close()
+
+    for i, meeting_id in enumerate(meeting_ids):
+        slot = scheduled_slot(client, meeting_id)
+        if i == 3:
+            assert slot is None
+        else:
+            assert (slot["start_time"], slot["end_time"]) == (9 + i, 10 + i)
+
+
+def test_concurrent_runs_claim_each_meeting_once(database):
+    db = SessionLocal()
+    try:
+        participants = [Participant(name=f"P{i}", email=f"p{i}@example.com", is_active=True) for i in range(2)]
+        meetings = [Meeting(name=f"m{i}", date=DATE_VALUE, duration=1, minimum_participants=2) for i in range(40)]
+        db.add_all(participants + meetings)
+        db.flush()
+        db.add_all(
+            MeetingParticipant(meeting_id=meeting.id, participant_id=participant.id)
+            for meeting in meetings
+            for participant in participants
+        )
+        meeting_ids = {str(meeting.id) for meeting in meetings}
+        db.commit()
+    finally:
+        db.close()
+
+    for _ in range(5):
+        db = SessionLocal()
+        try:
+            runs = [SchedulingRun(status=RUN_RUNNING) for _ in range(2)]
+            db.add_all(runs)
+            db.commit()
+            run_ids = [run.id for run in runs]
+        finally:
+            db.close()
+
+        # Both runs look for unclaimed meetings at the same time
+        barrier = threading.Barrier(len(run_ids))
+
+        def start(run_id):
+            barrier.wait()
+            return start_run(run_id, 0)[1]
+
+        with ThreadPoolExecutor(len(run_ids)) as pool:
+            claimed = [set(ids) for ids in pool.map(start, run_ids)]
+        assert not claimed[0] & claimed[1]
+        assert claimed[0] | claimed[1] == meeting_ids
+
+        # Finished runs hand their meetings back
+        for run_id in run_ids:
+            finish_run(run_id, {})
+        db = SessionLocal()
+        try:
+            assert db.query(MeetingClaim).count() == 0
+        finally:
+            db.close()
+
+
+def test_meeting_update_reschedules_only_on_real_changes(client):
+    participant_ids = [add_participant(client, f"P{i}") for i in range(3)]
+    meeting_id = add_meeting(client, "m0", participant_ids[:2])
+    assert run_scheduler(client)["scheduled_meetings"] == 1
+
+    def update(invited):
+        response = client.put(f"/meetings/{meeting_id}", json={
+            "name": "renamed", "date": "2024-07-22", "duration": 1,
+            "minimum_participants": 2, "participant_ids": invited
+        })
+        assert response.status_code == 200, response.text
+        return response.json()["scheduled_slot"]
+
+    # Unknown participant ids are skipped, so the invitees did not change
+    assert update(participant_ids[:2] + [9999]) is not None
+    assert update(participant_ids) is None
+
+
+def test_negotiated_runs_schedule_through_the_agents(start_app, monkeypatch):
+    monkeypatch.setattr(scheduling_runs, "SCHEDULER_SOLVER_MODE", SOLVER_NEGOTIATE)
+    monkeypatch.setattr(resident_scheduler, "SCHEDULER_SOLVER_MODE", SOLVER_NEGOTIATE)
+    with start_app() as client:
+        participant_ids = [add_participant(client, f"P{i}") for i in range(3)]
+        first = add_meeting(client, "first", participant_ids, minimum_participants=3)
+        second = add_meeting(client, "second", participant_ids, minimum_participants=3)
+        run = run_scheduler(client)
+        assert run["status"] == "completed"
+        assert run["scheduled_meetings"] == 2
+        assert not overlaps(scheduled_slot(client, first), scheduled_slot(client, second))
+
+
+def wait_for_resident_agents(participant_ids):
+    names = [agent_name(participant_id) for participant_id in participant_ids]
+    deadline = time.monotonic() + 5
+    while not resident.covers(names) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert resident.covers(names)
+
+
+@pytest.mark.parametrize("restarted", [False, True], ids=["restarting", "restarted"])
+def test_runs_survive_a_resident_playground_restart(database, monkeypatch, restarted):
+    monkeypatch.setattr(resident, "enabled", True)
+    update_run = scheduling_runs.update_run
+    restarted_runs = []
+
+    async def restart():
+        # As a Ceylon restart does: the playground is gone until the new one is up
+        playground, resident.playground = resident.playground, None
+        await playground.stop_resident()
+        if restarted:
+            await resident._start_playground()
+
+    def update_run_restarting(run_id, **values):
+        # Runs record their load time after checking for resident agents, before scheduling
+        if "load_seconds" in values and resident.running and not restarted_runs:
+            restarted_runs.append(run_id)
+            loop = resident.playground._resident_task.get_loop()
+            asyncio.run_coroutine_threadsafe(restart(), loop).result()
+        update_run(run_id, **values)
+
+    monkeypatch.setattr(scheduling_runs, "update_run", update_run_restarting)
+    with TestClient(app) as client:
+        participant_ids = [add_participant(client, f"P{i}") for i in range(2)]
+        wait_for_resident_agents(participant_ids)
+        meeting_id = add_meeting(client, "sync", participant_ids)
+        run_scheduler(client)
+
+        assert restarted_runs
+        run = client.get(f"/scheduling/runs/{restarted_runs[0]}").json()
+        assert run["status"] == "completed"
+        assert run["scheduled_meetings"] == 1
+        assert scheduled_slot(client, meeting_id) is not None
+        assert resident.running == restarted
+
+
+def test_resident_agents_see_changes_from_other_processes(database, monkeypatch):
+    monkeypatch.setattr(resident, "enabled", True)
+    with TestClient(app) as client:
+        participant_ids = [add_participant(client, f"P{i}", start_time=9, end_time=10) for i in range(2)]
+        wait_for_resident_agents(participant_ids)
+
+        # Written by another worker process, so no change event reaches this one
+        db = SessionLocal()
+        try:
+            db.add_all(
+                DbTimeSlot(date=DATE_VALUE, start_minute=13 * 60, end_minute=16 * 60, participant_id=participant_id)
+                for participant_id in participant_ids
+            )
+            bump_availability_version(db)
+            db.commit()
+        finally:
+            db.close()
+
+        meeting_id = add_meeting(client, "long", participant_ids, duration=2)
+        run = run_scheduler(client)
+        assert run["status"] == "completed"
+        assert resident.running
+        assert scheduled_slot(client, meeting_id)["start_time"] >= 13
+
+
+def test_resident_playground_does_not_start_on_a_port_in_use(database):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("0.0.0.0", 0))
+        sock.listen()
+        scheduler = ResidentScheduler(enabled=True, port=sock.getsockname()[1], transport=TRANSPORT_CEYLON)
+        asyncio.run(scheduler._start_playground())
+        assert not scheduler.running
@@ -0,0 +1,51 @@
+from backend.tests.api import add_meeting, add_participant, run_scheduler
+
+
+def status(client, **params):
+    return client.get("/scheduling/status", params=params)
+
+
+def test_status_is_not_modified_until_the_schedule_changes(client):
+    participant_ids = [add_participant(client, f"P{i}") for i in range(3)]
+    meeting_id = add_meeting(client, "m0", participant_ids)
+    assert run_scheduler(client)["scheduled_meetings"] == 1
+
+    response = status(client)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert response.json()[0]["participants"] == participant_ids
+    assert client.get("/scheduling/status", headers={"If-None-Match": etag}).status_code == 304
+
+    # Deleting an invitee changes the listed participants
+    assert client.delete(f"/participants/{participant_ids[2]}").status_code == 200
+    response = client.get("/scheduling/status", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    [result] = response.json()
+    assert result["meeting_id"] == meeting_id
+    assert result["participants"] == participant_ids[:2]
+
+    etag = response.headers["ETag"]
+    add_participant(client, "New")
+    assert client.get("/scheduling/status", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_status_pages_by_meeting_id(client):
+    participant_ids = [add_participant(client, f"P{i}") for i in range(2)]
+    meeting_ids = [add_meeting(client, f"m{i}", participant_ids) for i in range(5)]
+
+    seen, after_id = [], 0
+    while True:
+        response = status(client, after_id=after_id, limit=2)
+        assert response.status_code == 200
+        page = [result["meeting_id"] for result in response.json()]
+        if not page:
+            break
+        assert len(page) <= 2
+        seen.extend(page)
+        after_id = page[-1]
+
+    assert seen == meeting_ids
+    assert [result["meeting_id"] for result in status(client).json()] == meeting_ids
+    # Each page has its own ETag
+    assert status(client, after_id=0, limit=2).headers["ETag"] != status(client, after_id=2, limit=2).headers["ETag"]
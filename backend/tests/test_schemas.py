@@ -0,0 +1,44 @@
+import pytest
+from pydantic import ValidationError
+
+from backend.app.schemas.bulk_import import ImportRow
+from backend.app.schemas.meeting import MeetingCreate
+from backend.app.schemas.time_slot import TimeSlotCreate
+
+
+def time_slot(start_time: float, end_time: float) -> dict:
+    return {"date": "2024-07-22", "start_time": start_time, "end_time": end_time, "participant_id": 1}
+
+
+def test_time_slot_accepts_the_whole_day():
+    slot = TimeSlotCreate(**time_slot(0, 24))
+    assert (slot.start_time, slot.end_time) == (0, 24)
+
+
+@pytest.mark.parametrize("start_time, end_time", [(-1, 9), (9, 25), (10, 9), (9, 9)])
+def test_time_slot_rejects_invalid_hours(start_time, end_time):
+    with pytest.raises(ValidationError):
+        TimeSlotCreate(**time_slot(start_time, end_time))
+
+
+# Agents send dates as unsigned 16-bit days since 1970
+@pytest.mark.parametrize("date", ["1969-12-31", "2149-06-07"])
+def test_dates_the_agents_cannot_send_are_rejected(date):
+    with pytest.raises(ValidationError):
+        TimeSlotCreate(**{**time_slot(9, 10), "date": date})
+    with pytest.raises(ValidationError):
+        MeetingCreate(name="m", date=date, duration=1)
+    with pytest.raises(ValidationError):
+        ImportRow(name="p", email="p@example.com", date=date, start_time=9, end_time=10)
+
+
+@pytest.mark.parametrize("workday_start, workday_end", [(9.1, 17), (9, 16.95), (-1, 17), (17, 9)])
+def test_meeting_rejects_invalid_working_hours(workday_start, workday_end):
+    with pytest.raises(ValidationError):
+        MeetingCreate(name="m", date="2024-07-22", duration=1,
+                      workday_start=workday_start, workday_end=workday_end)
+
+
+def test_meeting_accepts_quarter_hours():
+    meeting = MeetingCreate(name="m", date="2024-07-22", duration=1, workday_start=8.75, workday_end=17.25)
+    assert (meeting.workday_start, meeting.workday_end) == (8.75, 17.25)
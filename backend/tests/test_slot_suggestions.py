@@ -0,0 +1,66 @@
+from backend.app.agents.participant_agent import TimeSlot
+from backend.app.agents.scheduling_playground import MeetingOutput
+from backend.app.database import SessionLocal
+from backend.app.services.availability_cache import availability_cache
+from backend.app.services.scheduling_runs import process_scheduling_results
+from backend.tests.api import DATE, add_meeting, add_participant, run_scheduler
+
+
+def suggest(client, participant_ids, duration=1, **params) -> list:
+    response = client.get("/scheduling/suggest", params={
+        "participant_ids": participant_ids, "duration": duration, "date_from": DATE, **params
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_suggestions_stay_within_working_hours(client):
+    participant_ids = [add_participant(client, f"P{i}", start_time=0, end_time=24) for i in range(2)]
+
+    suggestions = suggest(client, participant_ids, k=50)
+    assert suggestions[0]["start_time"] == 9
+    assert all(9 <= slot["start_time"] and slot["end_time"] <= 17 for slot in suggestions)
+
+    evening = suggest(client, participant_ids, workday_start=20, workday_end=24)
+    assert evening[0]["start_time"] == 20
+
+    response = client.get("/scheduling/suggest", params={
+        "participant_ids": participant_ids, "duration": 1, "date_from": DATE, "workday_start": 17, "workday_end": 9
+    })
+    assert response.status_code == 400
+
+
+def test_only_booking_changes_drop_cached_free_time(client):
+    participant_ids = [add_participant(client, f"P{i}") for i in range(2)]
+    other_id = add_participant(client, "Other")
+    assert suggest(client, participant_ids)[0]["start_time"] == 9
+    suggest(client, [other_id])
+
+    # A new meeting books nothing yet
+    meeting_id = add_meeting(client, "m0", participant_ids)
+    assert len(availability_cache) == 3
+
+    assert run_scheduler(client)["scheduled_meetings"] == 1
+    assert len(availability_cache) == 1
+    assert suggest(client, participant_ids)[0]["start_time"] == 10
+
+    assert client.delete(f"/meetings/{meeting_id}").status_code == 200
+    assert suggest(client, participant_ids)[0]["start_time"] == 9
+
+
+def test_changes_made_by_another_process_drop_cached_free_time(client):
+    participant_ids = [add_participant(client, f"P{i}") for i in range(2)]
+    assert suggest(client, participant_ids)[0]["start_time"] == 9
+
+    # Another worker process books 9:00-10:00; this one hears no change event
+    db = SessionLocal()
+    try:
+        process_scheduling_results(db, {
+            str(add_meeting(client, "m0", participant_ids)): MeetingOutput(
+                meeting_id="0", name="m0", scheduled=True, time_slot=TimeSlot(DATE, 9, 10)
+            )
+        })
+    finally:
+        db.close()
+
+    assert suggest(client, participant_ids)[0]["start_time"] == 10
@@ -0,0 +1,12 @@
+from backend.app.agents.participant_agent import BatchAvailabilityRequest, CandidateWindow
+
+
+def test_batch_request_round_trips_more_windows_than_fit_in_16_bits():
+    windows = [CandidateWindow(str(i), "2024-07-22", 9, 10.5) for i in range(70000)]
+    request = BatchAvailabilityRequest(windows, resolution=30)
+
+    unpacked = BatchAvailabilityRequest.unpack(memoryview(request.pack()))
+
+    assert unpacked.resolution == 30
+    assert len(unpacked.windows) == len(windows)
+    assert unpacked.windows[-1] == windows[-1]
@@ -25,8 +25,8 @@ export function AvailabilityForm({ participantId }: AvailabilityFormProps) {
   const [loading, setLoading] = useState(true)
   const [submitting, setSubmitting] = useState(false)
   const [date, setDate] = useState<Date>(new Date())
-  const [startTime, setStartTime] = useState("540") // 9:00 AM in minutes
-  const [endTime, setEndTime] = useState("1020") // 5:00 PM in minutes
+  const [startTime, setStartTime] = useState("9") // 9:00 AM in hours
+  const [endTime, setEndTime] = useState("17") // 5:00 PM in hours
   const router = useRouter()
   const { toast } = useToast()
 
@@ -65,10 +65,10 @@ export function AvailabilityForm({ participantId }: AvailabilityFormProps) {
       return
     }
 
-    const startMinutes = Number.parseInt(startTime)
-    const endMinutes = Number.parseInt(endTime)
+    const startHours = Number.parseFloat(startTime)
+    const endHours = Number.parseFloat(endTime)
 
-    if (startMinutes >= endMinutes) {
+    if (startHours >= endHours) {
       toast({
         title: "Error",
         description: "End time must be after start time",
@@ -81,8 +81,8 @@ export function AvailabilityForm({ participantId }: AvailabilityFormProps) {
     try {
       const newTimeSlot = await addParticipantTimeSlot(participantId, {
         date: format(date, "yyyy-MM-dd"),
-        start_time: startMinutes,
-        end_time: endMinutes,
+        start_time: startHours,
+        end_time: endHours,
       })
 
       setTimeSlots([...timeSlots, newTimeSlot])
@@ -101,7 +101,7 @@ export function AvailabilityForm({ participantId }: AvailabilityFormProps) {
     }
   }
 
-  // Generate time options in 30-minute increments
+  // Generate time options in 30-minute increments, valued in hours like the API
   const timeOptions = []
   for (let i = 0; i < 24 * 60; i += 30) {
     const hours = Math.floor(i / 60)
@@ -110,7 +110,7 @@ export function AvailabilityForm({ participantId }: AvailabilityFormProps) {
     const formattedHours = hours % 12 || 12
     const formattedMinutes = minutes.toString().padStart(2, "0")
     const label = `${formattedHours}:${formattedMinutes} ${period}`
-    timeOptions.push({ value: i.toString(), label })
+    timeOptions.push({ value: (i / 60).toString(), label })
   }
 
   return (
@@ -128,10 +128,8 @@ export function MeetingCalendar() {
               {getMeetingsForDay(day).map((meeting) => {
                 if (!meeting.scheduled_slot) return null
 
-                const startMinutes = meeting.scheduled_slot.start_time
-                const endMinutes = meeting.scheduled_slot.end_time
-                const startHour = startMinutes / 60
-                const duration = (endMinutes - startMinutes) / 60
+                const startHour = meeting.scheduled_slot.start_time
+                const duration = meeting.scheduled_slot.end_time - startHour
 
                 // Calculate position and height
                 const top = (startHour - 8) * 80 // 8 AM is the start time, each hour is 80px
@@ -156,8 +154,8 @@ export function MeetingCalendar() {
 
               {/* Render available slots */}
               {getAvailableSlotsForDay(day).map((slot) => {
-                const startHour = slot.start_time / 60
-                const duration = (slot.end_time - slot.start_time) / 60
+                const startHour = slot.start_time
+                const duration = slot.end_time - startHour
 
                 // Calculate position and height
                 const top = (startHour - 8) * 80 // 8 AM is the start time, each hour is 80px
@@ -5,9 +5,11 @@ export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs))
 }
 
+// Times come from the API in hours, e.g. 9.5 for 9:30 AM
 export function formatTime(time: number): string {
-  const hours = Math.floor(time / 60)
-  const minutes = time % 60
+  const totalMinutes = Math.round(time * 60)
+  const hours = Math.floor(totalMinutes / 60)
+  const minutes = totalMinutes % 60
   const ampm = hours >= 12 ? "PM" : "AM"
   const formattedHours = hours % 12 || 12
   const formattedMinutes = minutes.toString().padStart(2, "0")